@@ -0,0 +1,97 @@
+"""
+Memory held by the AST of a sheet.
+
+Parses a sheet of generated rulesets and reports the memory the StyleSheet
+keeps alive, per 10k rulesets, with the slotted nodes of pqss.parse.ast and
+with the same tree rebuilt from dict-backed nodes, as they were before
+__slots__. Tokens and literals are shared by both trees.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_ast_memory [rulesets]
+"""
+import gc
+import sys
+import tracemalloc
+
+from pqss.lex import new_lexer
+from pqss.parse import Parser
+from pqss.parse.ast import Node
+
+RULESET = """
+QPushButton#btn{idx} {{
+    width: $a + {idx};
+    background-color: red; // comment
+    height: 12px;
+    &:hover {{ height: 14px; }}
+}}
+"""
+
+
+def make_source(rulesets: int) -> str:
+    return '$a : 5;\n' + ''.join(RULESET.format(idx=i) for i in range(rulesets))
+
+
+def _slots_of(cls):
+    return [name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ())]
+
+
+def copy_nodes(value, dict_backed: bool, classes={}):
+    """
+    copy the nodes and lists of a tree, sharing its tokens and values
+    :param dict_backed: copy into plain objects with the same fields, each in a __dict__
+    """
+    if isinstance(value, list):
+        return [copy_nodes(item, dict_backed) for item in value]
+    if not isinstance(value, Node):
+        return value
+    cls = type(value)
+    if dict_backed:
+        if cls not in classes:
+            classes[cls] = type(cls.__name__, (Node,), {})
+        node = classes[cls]()
+    else:
+        node = cls.__new__(cls)
+    for name in _slots_of(cls):
+        if hasattr(value, name):
+            setattr(node, name, copy_nodes(getattr(value, name), dict_backed))
+    return node
+
+
+def traced(fn):
+    """result of fn, and the memory it keeps allocated"""
+    gc.collect()
+    before = tracemalloc.get_traced_memory()[0]
+    result = fn()
+    gc.collect()
+    return result, tracemalloc.get_traced_memory()[0] - before
+
+
+def count_nodes(value) -> int:
+    if isinstance(value, list):
+        return sum(count_nodes(item) for item in value)
+    if isinstance(value, Node):
+        return 1 + sum(count_nodes(getattr(value, name)) for name in _slots_of(type(value)) if hasattr(value, name))
+    return 0
+
+
+def main():
+    rulesets = int(sys.argv[1]) if len(sys.argv) > 1 else 10000
+    src_code = make_source(rulesets)
+    scale = 10000 / rulesets / 2 ** 20
+
+    tracemalloc.start()
+    style_sheet, total = traced(lambda: Parser(new_lexer(src_code)).parse_program())
+    _, slotted_nodes = traced(lambda: copy_nodes(style_sheet, False))
+    _, dict_nodes = traced(lambda: copy_nodes(style_sheet, True))
+    tracemalloc.stop()
+    shared = total - slotted_nodes
+
+    print(f'{rulesets} rulesets, {count_nodes(style_sheet)} nodes, {len(src_code)} chars, per 10k rulesets:')
+    print(f'{"tokens and values":>20}: {shared * scale:8.2f} MiB')
+    print(f'{"slotted nodes":>20}: {slotted_nodes * scale:8.2f} MiB, AST {total * scale:8.2f} MiB')
+    print(f'{"dict-backed nodes":>20}: {dict_nodes * scale:8.2f} MiB, AST {(shared + dict_nodes) * scale:8.2f} MiB')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,56 @@
+"""
+Expansion of mixins included many times with the same arguments.
+
+Compiles a component library where every ruleset includes a few mixins, and
+reports the time per 1k rulesets with the hits and misses of the cache of
+each mixin.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_mixins [rulesets]
+"""
+import sys
+import timeit
+
+from pqss.env import Environment
+from pqss.lex import new_lexer
+from pqss.parse import Parser
+
+MIXINS = """
+$radius : 4;
+$accent : #3070FF;
+$bg : #FFFFFF;
+@mixin rounded($r) { border-radius: $r; border-width: 1; }
+@mixin button($bg, $pad) { background-color: $bg; padding: $pad; color: $accent; margin: $pad * 2; }
+@mixin sized($w, $h) { min-width: $w; min-height: $h; max-width: $w * 4; max-height: $h * 2; }
+"""
+
+RULESET = """
+QPushButton#btn{idx} {{
+    @include rounded($radius)
+    @include button($bg, {pad})
+    @include sized(80, 24)
+}}
+"""
+
+
+def make_source(rulesets: int) -> str:
+    return MIXINS + ''.join(RULESET.format(idx=i, pad=i % 3 + 1) for i in range(rulesets)) + '\n'
+
+
+def main():
+    rulesets = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    src_code = make_source(rulesets)
+    style_sheet = Parser(new_lexer(src_code)).parse_program()
+    number = 5
+
+    environment = Environment()
+    seconds = timeit.timeit(lambda: style_sheet.eval(environment), number=number)
+    print(f'{rulesets} rulesets, eval: {seconds / number / rulesets * 1e6:8.2f} ms per 1k rulesets')
+    for name in ('rounded', 'button', 'sized'):
+        cache = environment.get(name).cache
+        print(f'{name:>10}: {cache.hits} hits, {cache.misses} misses, {len(cache)} expansions')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,35 @@
+"""
+Flattening of deeply nested rulesets.
+
+Compiles chains of rulesets nested depth levels deep, each with a few
+declarations and a &:hover child, and reports the time per ruleset for each
+depth: flattening is linear when the time per ruleset stays flat.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_nesting [depth ...]
+"""
+import sys
+import timeit
+
+from pqss.env import Environment
+from pqss.lex import new_lexer
+from pqss.parse import Parser
+
+LEVEL = 'QFrame#f{idx} {{ width: {idx}; height: 2; min-width: 3; &:hover {{ width: 4; }} '
+
+
+def make_source(depth: int) -> str:
+    return ''.join(LEVEL.format(idx=i + 1) for i in range(depth)) + '}' * depth + '\nQDial { }\n'
+
+
+def main():
+    depths = [int(arg) for arg in sys.argv[1:]] or [10, 50, 200]
+    for depth in depths:
+        style_sheet = Parser(new_lexer(make_source(depth))).parse_program()
+        seconds = min(timeit.repeat(lambda: style_sheet.eval(Environment()), number=1, repeat=5))
+        print(f'depth {depth:4}: {seconds / depth / 2 * 1e6:8.2f} us per ruleset')
+
+
+if __name__ == '__main__':
+    main()
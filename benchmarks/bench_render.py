@@ -0,0 +1,64 @@
+"""
+Switching the accent color of a theme.
+
+Compares compiling the whole sheet again with another $accent against calling
+the function compile_render built once, where only the rulesets reading
+$accent are evaluated, then building a set of theme variants at once with
+compile_variants.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_render [rulesets]
+"""
+import sys
+import timeit
+
+import pqss
+
+RULESET = """
+QPushButton#btn{idx} {{
+    width: $a + {idx};
+    background-color: red; // comment
+    height: 12px;
+}}
+"""
+
+ACCENT = """
+QLabel#label{idx} {{ color: $accent; }}
+"""
+
+
+def make_source(rulesets: int) -> str:
+    return '$a : 5;\n$accent : #FF0000;\n' + ''.join(
+        ACCENT.format(idx=i) if i % 20 == 0 else RULESET.format(idx=i) for i in range(rulesets))
+
+
+def main():
+    rulesets = int(sys.argv[1]) if len(sys.argv) > 1 else 1000
+    src_code = make_source(rulesets)
+    number = 10
+
+    recompile = timeit.timeit(lambda: pqss.compile_string(src_code.replace('#FF0000', '#00FF00')), number=number)
+    build = timeit.timeit(lambda: pqss.compile_render(src_code, ['accent']), number=1)
+    render = pqss.compile_render(src_code, ['accent'])
+    assert render(accent='#00FF00') == pqss.compile_string(src_code.replace('#FF0000', '#00FF00'))
+    call = timeit.timeit(lambda: render(accent='#00FF00'), number=number * 100)
+
+    print(f'{rulesets} rulesets, {rulesets // 20} reading $accent:')
+    print(f'{"recompile":>16}: {recompile / number * 1e3:10.3f} ms')
+    print(f'{"compile_render":>16}: {build * 1e3:10.3f} ms, once')
+    print(f'{"render":>16}: {call / number / 100 * 1e3:10.3f} ms')
+
+    accents = [f'#{i:02X}{i:02X}FF' for i in range(number)]
+    variants = [{'accent': accent, 'a': i % 2 + 1} for i, accent in enumerate(accents)]
+    separately = timeit.timeit(
+        lambda: [pqss.compile_string(src_code.replace('#FF0000', v['accent']).replace('$a : 5', f'$a : {v["a"]}'))
+                 for v in variants], number=1)
+    batch = timeit.timeit(lambda: pqss.compile_variants(src_code, variants), number=1)
+    print(f'{number} variants of $accent and $a:')
+    print(f'{"separately":>16}: {separately * 1e3:10.3f} ms')
+    print(f'{"compile_variants":>16}: {batch * 1e3:10.3f} ms')
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,70 @@
+"""
+Variable reads, by slot against by name.
+
+Compiles a sheet of many global variables read by rulesets and by a mixin
+expanded with other arguments on every include, once with the identifiers
+bound to their slots by the resolver, and once with the bindings cleared so
+that every read looks its name up, and reports the best time per 1k rulesets.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_scopes [rulesets]
+"""
+import sys
+import timeit
+
+from pqss.env import Environment
+from pqss.lex import new_lexer
+from pqss.parse import Parser
+from pqss.parse.ast import Identifier
+from pqss.parse.astcache import _slots_of
+
+VARIABLES = 200
+
+MIXIN = """
+@mixin box($w, $h, $m) {{ min-width: $w + $v1; min-height: $h + $v2; margin: $m; max-width: $w + $v3; max-height: $h + $v4; padding: $m + $v5; }}
+"""
+
+RULESET = """
+QWidget#w{idx} {{
+    width: $v{a}; height: $v{b} + $v{c}; border-width: $v{a} * 2;
+    @include box({idx}, $v{b}, $v{c})
+}}
+"""
+
+
+def make_source(rulesets: int) -> str:
+    variables = ''.join(f'$v{i} : {i + 1};\n' for i in range(VARIABLES))
+    return (variables + MIXIN.format() +
+            ''.join(RULESET.format(idx=i + 1, a=i % VARIABLES, b=i * 7 % VARIABLES, c=i * 13 % VARIABLES)
+                    for i in range(rulesets)) + '\n')
+
+
+def unbind(node):
+    """clear the slots of the identifiers of a node"""
+    if isinstance(node, list):
+        for item in node:
+            unbind(item)
+    elif isinstance(node, Identifier):
+        node.depth = node.slot = None
+    elif hasattr(type(node), '__slots__'):
+        for name in _slots_of(type(node)):
+            if hasattr(node, name):
+                unbind(getattr(node, name))
+
+
+def main():
+    rulesets = int(sys.argv[1]) if len(sys.argv) > 1 else 2000
+    src_code = make_source(rulesets)
+    repeat = 7
+
+    for label in ('slots', 'names'):
+        style_sheet = Parser(new_lexer(src_code)).parse_program()
+        if label == 'names':
+            unbind(style_sheet)
+        seconds = min(timeit.repeat(lambda: style_sheet.eval(Environment()), number=1, repeat=repeat))
+        print(f'{rulesets} rulesets, {label}: {seconds / rulesets * 1e6:8.2f} ms per 1k rulesets')
+
+
+if __name__ == '__main__':
+    main()
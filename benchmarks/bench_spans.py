@@ -0,0 +1,98 @@
+"""
+Cost of source positions while lexing.
+
+Compares building tokens without positions, with the start offset tokens
+carry now, and with eagerly tracked line/column, then the one-off cost of
+resolving a location through LineIndex when a diagnostic is produced.
+Every case is timed over several interleaved runs, each repeating it for
+at least 0.2 seconds, and the minimum and median time of one call are
+reported along with the overhead of the minimum over lexing without
+positions.
+
+Run from the root of the repository:
+
+    python -m benchmarks.bench_spans [rulesets] [runs]
+"""
+import statistics
+import sys
+import timeit
+
+from pqss.lex import Token, TokenType, Scanner, LineIndex
+
+RULESET = """
+QPushButton#btn{idx} {{
+    width: $a + {idx};
+    background-color: red; // comment
+    height: 12px;
+}}
+"""
+
+
+def make_source(rulesets: int) -> str:
+    return '$a : 5;\n' + ''.join(RULESET.format(idx=i) for i in range(rulesets))
+
+
+def lex_without_position(src_code):
+    return [Token(t, lit) for t, start, end, lit in _lexemes(src_code)]
+
+
+def lex_with_offset(src_code):
+    return [Token(t, lit, start) for t, start, end, lit in _lexemes(src_code)]
+
+
+def lex_with_line_column(src_code):
+    toks = []
+    line, line_start, last = 1, 0, 0
+    for t, start, end, lit in _lexemes(src_code):
+        newlines = src_code.count('\n', last, start)
+        if newlines:
+            line += newlines
+            line_start = src_code.rfind('\n', last, start) + 1
+        last = start
+        toks.append((Token(t, lit, start), line, start - line_start + 1))
+    return toks
+
+
+def _lexemes(src_code):
+    for lexeme in Scanner(src_code).lexemes():
+        yield lexeme
+        if lexeme[0] is TokenType.EOF:
+            return
+
+
+def locate_once(src_code):
+    return LineIndex(src_code).location(len(src_code) // 2)
+
+
+def measure(fns, src_code, runs: int) -> dict:
+    """
+    seconds of one call of each fn, for each run. The runs of the fns are
+    interleaved, so that a drift of the machine's speed affects them alike.
+    """
+    timers = {fn: timeit.Timer(lambda fn=fn: fn(src_code)) for fn in fns}
+    numbers = {fn: timer.autorange()[0] for fn, timer in timers.items()}
+    times = {fn: [] for fn in fns}
+    for _ in range(runs):
+        for fn, timer in timers.items():
+            times[fn].append(timer.timeit(numbers[fn]) / numbers[fn])
+    return times
+
+
+def main():
+    rulesets = int(sys.argv[1]) if len(sys.argv) > 1 else 5000
+    runs = int(sys.argv[2]) if len(sys.argv) > 2 else 7
+    src_code = make_source(rulesets)
+    print(f'{rulesets} rulesets, {src_code.count(chr(10))} lines, {len(src_code)} chars, {runs} runs')
+    print(f'{"":>24}  {"min":>9}     {"median":>9}     overhead')
+    times = measure([lex_without_position, lex_with_offset, lex_with_line_column, locate_once], src_code, runs)
+    baseline = min(times[lex_without_position])
+    for fn, seconds in times.items():
+        best, median = min(seconds), statistics.median(seconds)
+        line = f'{fn.__name__:>24}: {best * 1000:9.3f} ms {median * 1000:9.3f} ms'
+        if fn in (lex_with_offset, lex_with_line_column):
+            line += f' {(best / baseline - 1) * 100:+7.1f} %'
+        print(line)
+
+
+if __name__ == '__main__':
+    main()
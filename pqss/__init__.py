@@ -1,2 +1,4 @@
-from .main import parse
+__version__ = '0.0.8'
 
+from .main import parse, compile_file, compile_string, compile_to, iter_compile, compile_render, compile_variants
+from .qss import optimize_qss
@@ -0,0 +1,5 @@
+import sys
+
+from pqss.cli import main
+
+sys.exit(main())
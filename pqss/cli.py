@@ -0,0 +1,189 @@
+import argparse
+import os
+import sys
+from concurrent.futures import ProcessPoolExecutor
+
+from pqss.lex import PQSSException, LEXER_ENGINES
+from pqss.qss import QssOptimizer, shard_qss
+from pqss.util.path_util import find_sources, output_stem, write_if_changed
+from .main import compile_file
+from .watch import Watcher
+
+
+def _parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='pqss', description='Compile PQSS to QSS.',
+        epilog='Given several inputs, or a directory, every PQSS file is compiled into the '
+               'directory of -o, or of --shard, mirroring the tree of its input. '
+               'See also: pqss watch --help.')
+    parser.add_argument('inputs', nargs='*', metavar='INPUT',
+                        help='PQSS file, or directory to compile the PQSS files of, recursively')
+    parser.add_argument('-f', '--file', action='append', default=[], help='PQSS file to compile, may be repeated')
+    output = parser.add_mutually_exclusive_group()
+    output.add_argument('-o', '--output',
+                        help='QSS file to write, the standard output by default; '
+                             'the directory to write into for several inputs')
+    output.add_argument('--shard', metavar='DIR',
+                        help='write the QSS into DIR as a core for the application and a shard for each '
+                             'widget class and object name, listed by DIR/manifest.json')
+    parser.add_argument('-I', '--include', action='append', default=[], metavar='DIR',
+                        help='directory to search imported files in, may be repeated')
+    parser.add_argument('-j', '--jobs', type=int, default=1, metavar='N',
+                        help='number of processes compiling the files, 1 by default')
+    parser.add_argument('--cache', metavar='DIR',
+                        help='directory of compiled QSS kept between runs, reused while the file and '
+                             'everything it imports keep their content')
+    parser.add_argument('--engine', choices=sorted(LEXER_ENGINES), default='scanner', help='lexer engine')
+    parser.add_argument('--optimize', action='store_true',
+                        help='drop redundant declarations, merge longhands into shorthands and group '
+                             'the rulesets with identical declarations, '
+                             'reporting the bytes saved on the standard error')
+    return parser
+
+
+def _plan(inputs: list[str], directory: str, shard: bool) -> list[tuple[str, str]]:
+    """
+    the file to compile and its destination under directory, for every input
+    file and every PQSS file of an input directory
+    :raise ValueError: two files compile to the same destination; a file given twice is compiled once
+    """
+    plan = []
+    for path in inputs:
+        if os.path.isdir(path):
+            pairs = [(os.path.join(path, source), source) for source in find_sources(path)]
+        else:
+            pairs = [(path, os.path.basename(path))]
+        for source, relative in pairs:
+            stem = output_stem(relative)
+            plan.append((source, os.path.join(directory, stem if shard else stem + '.qss')))
+
+    unique = []
+    destinations = {}
+    for source, destination in plan:
+        other = destinations.setdefault(os.path.normpath(destination), source)
+        if other is source:
+            unique.append((source, destination))
+        elif os.path.realpath(other) != os.path.realpath(source):
+            raise ValueError(f'{other} and {source} both compile to {destination}')
+    return unique
+
+
+def _compile_one(source: str, output: str | None, shard: str | None, engine: str,
+                 include_paths: list[str], optimize: bool,
+                 output_cache: str | None = None) -> tuple[str | None, str | None]:
+    """
+    compile a PQSS file into output, the standard output when None, or into the shards of a directory.
+    Files holding the same QSS already are left untouched.
+    :return: the error, and the report of the optimizer; any error is returned, never raised,
+        so that one file cannot abort the others
+    """
+    optimizer = QssOptimizer() if optimize else None
+    try:
+        qss = compile_file(source, engine, include_paths, output_cache=output_cache)
+        if shard is not None:
+            # rulesets are merged within a shard, never across shards
+            shard_qss(qss).write(shard, optimizer)
+        else:
+            if optimizer is not None:
+                qss = optimizer.optimize(qss)
+            if output is None:
+                sys.stdout.write(qss)
+            else:
+                directory = os.path.dirname(output)
+                if directory:
+                    os.makedirs(directory, exist_ok=True)
+                write_if_changed(output, qss)
+    except Exception as e:
+        return _describe(source, e), None
+    return None, optimizer.report() if optimizer is not None else None
+
+
+def _describe(source: str, error: BaseException) -> str:
+    """the message of an error compiling source, prefixed with source unless it names a file already"""
+    if isinstance(error, PQSSException) and error.path or isinstance(error, OSError) and error.filename:
+        return str(error)
+    return f'{source}: {str(error) or type(error).__name__}'
+
+
+def _watch_parser() -> argparse.ArgumentParser:
+    parser = argparse.ArgumentParser(
+        prog='pqss watch', description='Compile the PQSS files of a directory, then recompile the '
+                                       'ones depending on a file whenever it changes.')
+    parser.add_argument('directory', help='directory of the PQSS files, watched recursively')
+    parser.add_argument('-o', '--output', required=True, metavar='DIR',
+                        help='directory to write the QSS into, mirroring the tree of the PQSS files')
+    parser.add_argument('-I', '--include', action='append', default=[], metavar='DIR',
+                        help='directory to search imported files in, may be repeated')
+    parser.add_argument('--engine', choices=sorted(LEXER_ENGINES), default='scanner', help='lexer engine')
+    parser.add_argument('--optimize', action='store_true', help='optimize the QSS written')
+    parser.add_argument('--poll', action='store_true', help='poll the files for changes instead of using inotify')
+    parser.add_argument('--interval', type=float, default=0.5, metavar='SECONDS',
+                        help='seconds between polls, 0.5 by default')
+    return parser
+
+
+def watch(argv: list[str]) -> int:
+    parser = _watch_parser()
+    args = parser.parse_args(argv)
+    if not os.path.isdir(args.directory):
+        parser.error(f'{args.directory} is not a directory')
+    watcher = Watcher(args.directory, args.output, args.include, args.engine, args.optimize,
+                      args.poll, args.interval)
+    try:
+        watcher.run()
+    except KeyboardInterrupt:
+        pass
+    return 0
+
+
+def main(argv: list[str] | None = None) -> int:
+    if argv is None:
+        argv = sys.argv[1:]
+    if argv[:1] == ['watch']:
+        return watch(argv[1:])
+    parser = _parser()
+    args = parser.parse_args(argv)
+    inputs = args.file + args.inputs
+    if not inputs:
+        parser.error('no PQSS file to compile')
+    if args.jobs < 1:
+        parser.error('-j must be at least 1')
+
+    if len(inputs) == 1 and not os.path.isdir(inputs[0]):
+        plan = [(inputs[0], args.shard if args.shard is not None else args.output)]
+    elif args.output is None and args.shard is None:
+        parser.error('several files are compiled into the directory of -o or --shard')
+    else:
+        try:
+            plan = _plan(inputs, args.shard if args.shard is not None else args.output, args.shard is not None)
+        except ValueError as e:
+            print(f'pqss: {e}', file=sys.stderr)
+            return 1
+
+    tasks = [(source, None if args.shard is not None else destination,
+              destination if args.shard is not None else None,
+              args.engine, args.include, args.optimize, args.cache)
+             for source, destination in plan]
+    if args.jobs > 1 and len(tasks) > 1:
+        with ProcessPoolExecutor(max_workers=min(args.jobs, len(tasks))) as executor:
+            futures = [executor.submit(_compile_one, *task) for task in tasks]
+            results = []
+            for (source, *_), future in zip(tasks, futures):
+                try:
+                    results.append(future.result())
+                except Exception as e:
+                    # e.g. BrokenProcessPool, the worker died
+                    results.append((_describe(source, e), None))
+    else:
+        results = [_compile_one(*task) for task in tasks]
+
+    failed = 0
+    for (source, _), (error, report) in zip(plan, results):
+        if error is not None:
+            failed += 1
+            print(f'pqss: {error}', file=sys.stderr)
+        elif report is not None:
+            print(f'{source}: {report}', file=sys.stderr)
+    if failed and len(plan) > 1:
+        print(f'pqss: {failed} of {len(plan)} files failed', file=sys.stderr)
+    return 1 if failed else 0
@@ -0,0 +1,110 @@
+class Slots:
+    """Slots of the variable and mixin names of a global scope
+
+    Names are numbered in the order they are first bound. A table is made for
+    each compile and shared by the sheets it imports, so the global scope of an
+    evaluation only spans the names of the sheets compiled together.
+    """
+
+    __slots__ = ('_slots',)
+
+    def __init__(self):
+        self._slots: dict[str, int] = {}
+
+    def slot_of(self, name: str) -> int:
+        """slot of a name, numbering it when it is new"""
+        slot = self._slots.get(name)
+        if slot is None:
+            slot = self._slots.setdefault(name, len(self._slots))
+        return slot
+
+    def get(self, name: str) -> int | None:
+        """slot of a name, None when it has none"""
+        return self._slots.get(name)
+
+    def items(self):
+        return self._slots.items()
+
+    def __len__(self):
+        return len(self._slots)
+
+
+class Environment:
+    """Scope of the variables and mixins a sheet evaluates with
+
+    The values of a scope are in a list. The global scope, which has no parent,
+    keeps a value at the slot of its name in its Slots; the scope of a mixin
+    expansion keeps its parameters in their order. Identifiers bound by the
+    resolver read a slot of either directly, with load, and the others look
+    their name up with get.
+    """
+
+    __slots__ = ('parent', 'root', 'names', 'values', 'slots')
+
+    def __init__(self, parent: 'Environment | None' = None, names: list[str] | tuple[str, ...] | None = None,
+                 values: list | None = None, slots: Slots | None = None):
+        """
+        :param parent: scope the names missing from this one are looked up in
+        :param names: names of the values of a local scope, None for a global scope
+        :param slots: slots of the names of a global scope, those of the first sheet it evaluates if None
+        """
+        self.parent = parent
+        self.root: Environment = self if parent is None else parent.root
+        """global scope of the chain"""
+        self.names = names
+        self.values: list = [] if values is None else values
+        self.slots: Slots | None = slots
+        """slots of the names of a global scope"""
+
+    def bind(self, slots: Slots):
+        """number the names of a global scope with slots, moving the values set so far"""
+        if self.slots is slots:
+            return
+        old, values = self.slots, self.values
+        self.slots = slots
+        self.values = []
+        if old is not None:
+            for name, slot in old.items():
+                if slot < len(values) and values[slot] is not None:
+                    _put(self.values, slots.slot_of(name), values[slot])
+
+    def get(self, name: str):
+        if self.names is None:
+            slot = self.slots.get(name) if self.slots is not None else None
+            if slot is not None and slot < len(self.values):
+                val = self.values[slot]
+                if val is not None:
+                    return val
+        elif name in self.names:
+            return self.values[self.names.index(name)]
+        if self.parent is not None:
+            return self.parent.get(name)
+        return None
+
+    def set(self, name: str, val):
+        if self.names is None:
+            if self.slots is None:
+                self.slots = Slots()
+            _put(self.values, self.slots.slot_of(name), val)
+        elif name in self.names:
+            self.values[self.names.index(name)] = val
+        else:
+            self.names = [*self.names, name]
+            self.values.append(val)
+
+    def load(self, depth: int, slot: int):
+        """value at a slot of the global scope for depth 0, of this scope for depth 1"""
+        if depth:
+            return self.values[slot]
+        values = self.root.values
+        return values[slot] if slot < len(values) else None
+
+    def store(self, depth: int, slot: int, val):
+        """set the value at a slot of the global scope for depth 0, of this scope for depth 1"""
+        _put(self.values if depth else self.root.values, slot, val)
+
+
+def _put(values: list, slot: int, val):
+    if slot >= len(values):
+        values.extend([None] * (slot + 1 - len(values)))
+    values[slot] = val
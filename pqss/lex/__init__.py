@@ -1,2 +1,6 @@
 from .token import *
 from .lexer import *
+from .scanner import Scanner, LEXER_ENGINES, new_lexer
+from .stream import TokenStream, TokenCursor, tokenize
+from .exceptions import PQSSException, TokenUnKnownException
+from .source import LineIndex, is_ascii, as_source
@@ -101,16 +101,31 @@ keywords = {
 }
 """ Keywords of PQSS"""
 
-colors = ['red',
-          'blue',
-          'white',
-          'yellow',
-          'green',
-          'gray',
-          'black',
-          'orange',
-          'grown']
-"""The string for color """
+colors = ['aliceblue', 'antiquewhite', 'aqua', 'aquamarine', 'azure', 'beige', 'bisque', 'black',
+          'blanchedalmond', 'blue', 'blueviolet', 'brown', 'burlywood', 'cadetblue',
+          'chartreuse', 'chocolate', 'coral', 'cornflowerblue', 'cornsilk', 'crimson', 'cyan',
+          'darkblue', 'darkcyan', 'darkgoldenrod', 'darkgray', 'darkgreen', 'darkgrey',
+          'darkkhaki', 'darkmagenta', 'darkolivegreen', 'darkorange', 'darkorchid', 'darkred',
+          'darksalmon', 'darkseagreen', 'darkslateblue', 'darkslategray', 'darkslategrey',
+          'darkturquoise', 'darkviolet', 'deeppink', 'deepskyblue', 'dimgray', 'dimgrey',
+          'dodgerblue', 'firebrick', 'floralwhite', 'forestgreen', 'fuchsia', 'gainsboro',
+          'ghostwhite', 'gold', 'goldenrod', 'gray', 'grey', 'green', 'greenyellow', 'honeydew',
+          'hotpink', 'indianred', 'indigo', 'ivory', 'khaki', 'lavender', 'lavenderblush',
+          'lawngreen', 'lemonchiffon', 'lightblue', 'lightcoral', 'lightcyan',
+          'lightgoldenrodyellow', 'lightgray', 'lightgreen', 'lightgrey', 'lightpink',
+          'lightsalmon', 'lightseagreen', 'lightskyblue', 'lightslategray', 'lightslategrey',
+          'lightsteelblue', 'lightyellow', 'lime', 'limegreen', 'linen', 'magenta', 'maroon',
+          'mediumaquamarine', 'mediumblue', 'mediumorchid', 'mediumpurple', 'mediumseagreen',
+          'mediumslateblue', 'mediumspringgreen', 'mediumturquoise', 'mediumvioletred',
+          'midnightblue', 'mintcream', 'mistyrose', 'moccasin', 'navajowhite', 'navy', 'oldlace',
+          'olive', 'olivedrab', 'orange', 'orangered', 'orchid', 'palegoldenrod', 'palegreen',
+          'paleturquoise', 'palevioletred', 'papayawhip', 'peachpuff', 'peru', 'pink', 'plum',
+          'powderblue', 'purple', 'red', 'rosybrown', 'royalblue', 'saddlebrown', 'salmon',
+          'sandybrown', 'seagreen', 'seashell', 'sienna', 'silver', 'skyblue', 'slateblue',
+          'slategray', 'slategrey', 'snow', 'springgreen', 'steelblue', 'tan', 'teal', 'thistle',
+          'tomato', 'transparent', 'turquoise', 'violet', 'wheat', 'white', 'whitesmoke',
+          'yellow', 'yellowgreen']
+"""Named colors of Qt, the SVG color keywords and transparent"""
 
 properties = ['alternate-background-color',
               'background',
@@ -191,3 +206,24 @@ properties = ['alternate-background-color',
               'top',
               'width']
 """Qss properties"""
+
+units = ['px', 'pt', 'em', 'ex']
+"""Units of length in QSS"""
+
+builtins = ['rgb', 'rgba', 'lighten', 'darken', 'mix', 'alpha']
+"""Builtin functions of PQSS"""
+
+
+def _build_word_classes():
+    # Lexer tries units, colors, properties, keywords then builtins,
+    # so fill in backwards and let a more preferred class take over the word
+    classes = dict.fromkeys(builtins, TokenType.BUILTIN)
+    classes.update(keywords)
+    classes.update(dict.fromkeys(properties, TokenType.PROPERTY))
+    classes.update(dict.fromkeys(colors, TokenType.COLOR))
+    classes.update(dict.fromkeys(units, TokenType.UNIT))
+    return classes
+
+
+word_classes = _build_word_classes()
+"""Class of every word in the vocabulary of PQSS, as a TokenType"""
@@ -1,3 +1,32 @@
 
-class TokenUnKnownException(Exception):
+class PQSSException(Exception):
+    """Error in PQSS code, at an offset of the source"""
+
+    def __init__(self, message: str, offset: int | None = None):
+        super().__init__(message)
+        self.message = message
+        self.offset = offset
+        self.path: str | None = None
+        self.line: int | None = None
+        self.column: int | None = None
+
+    def locate(self, line_index, path: str | None = None):
+        """
+        resolve the offset to line and column, only the first source located against counts
+        :param line_index: LineIndex of the source the offset belongs to
+        :param path: path of the source
+        """
+        if self.line is None and self.offset is not None:
+            self.line, self.column = line_index.location(self.offset)
+            self.path = path
+        return self
+
+    def __str__(self):
+        if self.line is None:
+            return self.message
+        where = f'{self.path}:' if self.path else ''
+        return f'{where}{self.line}:{self.column}: {self.message}'
+
+
+class TokenUnKnownException(PQSSException):
     pass
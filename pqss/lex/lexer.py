@@ -1,7 +1,7 @@
 import logging
 import re
 
-from .token import Token, TokenType, lookup_keyword, is_color, is_property
+from .token import Token, TokenType, lookup_keyword, is_color, is_property, is_unit, is_builtin
 from .utils import is_letter
 from ..util.char_util import is_digit, is_blank_char
 from .exceptions import TokenUnKnownException
@@ -19,6 +19,9 @@ class Lexer:
         :param src_code:  PQSS code
         """
         self.is_enter_selectors = False
+        self.call_depth = 0
+        """depth of the parentheses of the builtin call being read, 0 outside of any"""
+        self._after_builtin = False
 
         self.inserted_tok = None
         self.inserted = None
@@ -54,6 +57,7 @@ class Lexer:
         self._skip_blank_and_comment()
 
         lexeme = self._cur_char
+        start = self._cur_pos if lexeme != EOF else len(self._src_code)
         tok = None
 
         if lexeme == EOF:
@@ -125,7 +129,7 @@ class Lexer:
             tok = Token(TokenType.TYPE_SELECTOR, lexeme)
             self.is_enter_selectors = True
         elif lexeme == '#':
-            if self.is_value():
+            if self.call_depth or self.is_value():
                 lexeme = self.read_word()
                 tok = Token(TokenType.COLOR, lexeme)
             else:
@@ -140,7 +144,7 @@ class Lexer:
             raise NotImplementedError()
 
         elif is_letter(lexeme):
-            if self.peek_word() in ['px']:
+            if is_unit(self.peek_word()):
                 tok = Token(TokenType.UNIT, self.read_word())
             elif self.is_color():
                 lexeme = self.read_word()
@@ -161,15 +165,25 @@ class Lexer:
                 self.is_enter_selectors = True
                 self.insert_union_selector_if_needed()
         else:
-            raise TokenUnKnownException(f'Token {lexeme} does unknown!!!')
+            raise TokenUnKnownException(f'Token {lexeme} does unknown!!!', start)
 
+        tok.start = start
+        self._track_call(tok.token_type)
         self.read_char()
         return tok
 
+    def _track_call(self, token_type: TokenType):
+        """follow the parentheses of builtin calls, a # in the arguments starts a color"""
+        if token_type is TokenType.LEFT_PAREN and (self._after_builtin or self.call_depth):
+            self.call_depth += 1
+        elif token_type is TokenType.RIGHT_PAREN and self.call_depth:
+            self.call_depth -= 1
+        self._after_builtin = token_type is TokenType.BUILTIN
+
     def insert_union_selector_if_needed(self):
         if not is_blank_char(self._peek_char) and self._peek_char not in ['>', '{']:
             self.inserted = True
-            self.inserted_tok = Token(TokenType.UNION_SELECTOR, '')
+            self.inserted_tok = Token(TokenType.UNION_SELECTOR, '', self._peek_pos)
 
     def read_identifier(self):
         """read a valid identifier"""
@@ -217,7 +231,7 @@ class Lexer:
 
         token_type = lookup_keyword(lexeme)
         if token_type is None:
-            raise TokenUnKnownException(f'Token {lexeme} does not a valid keyword!!!')
+            raise TokenUnKnownException(f'Token {lexeme} does not a valid keyword!!!', pos)
         return Token(token_type, lexeme)
 
     def read_selector(self):
@@ -327,8 +341,10 @@ class Lexer:
 
         while self._peek_char != quote:
             self.read_char()
+        lexeme = self._src_code[pos: self._peek_pos]
 
-        return self._src_code[pos: self._peek_pos]
+        self.read_char()  # closing quote
+        return lexeme
 
     def is_color(self):
         pos = self._cur_pos
@@ -371,7 +387,7 @@ class Lexer:
         self._peek_pos = pos + 1
         self._peek_char = self._src_code[self._peek_pos]
 
-        return lexeme in ['rgb', 'rgba']
+        return is_builtin(lexeme)
 
     def is_infix(self):
         i = 0
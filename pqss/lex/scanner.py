@@ -0,0 +1,302 @@
+import re
+
+from .token import Token, TokenType, lookup_keyword, classify_word, is_property
+from .lexer import Lexer
+from .exceptions import TokenUnKnownException
+from .constants import EOF
+
+_SINGLE_CHAR_TOKENS = {
+    ':': TokenType.ASSIGN,
+    '(': TokenType.LEFT_PAREN,
+    ')': TokenType.RIGHT_PAREN,
+    '{': TokenType.LEFT_BRACE,
+    '}': TokenType.RIGHT_BRACE,
+    ';': TokenType.SEMICOLON,
+    ',': TokenType.COMMA,
+    '+': TokenType.PLUS,
+    '-': TokenType.SUB,
+    '/': TokenType.DIV,
+    '<': TokenType.LT,
+    '&': TokenType.PARENT_REFERENCE,
+}
+"""lexemes made of one char whose type never depends on context"""
+
+# kinds of lexeme, told apart by their first char
+_WORD = 1
+_DIGIT = 2
+_DOLLAR = 3
+_STAR = 4
+_GT = 5
+_EQ = 6
+_QUOTE = 7
+_KEYWORD = 8
+_DOT = 9
+_HASH = 10
+
+_FIRST_CHAR_KINDS = {
+    **dict.fromkeys('ABCDEFGHIJKLMNOPQRSTUVWXYZabcdefghijklmnopqrstuvwxyz_', _WORD),
+    **dict.fromkeys('0123456789', _DIGIT),
+    '$': _DOLLAR,
+    '*': _STAR,
+    '>': _GT,
+    '=': _EQ,
+    '"': _QUOTE,
+    "'": _QUOTE,
+    '!': _KEYWORD,
+    '@': _KEYWORD,
+    '.': _DOT,
+    '#': _HASH,
+}
+
+
+class _Syntax:
+    """Compiled patterns and dispatch tables for one type of source, str or bytes"""
+
+    def __init__(self, encode, key, decode):
+        """
+        :param encode: turn a str pattern into the source type
+        :param key: turn a char into what indexing the source returns
+        :param decode: turn a slice of the source into str
+        """
+        self.decode = decode
+        self.blank = re.compile(encode(r'[ \t\n\r]*'))
+        self.word = re.compile(encode(r'[A-Za-z0-9_-]*'))
+        self.digits = re.compile(encode(r'[0-9]*'))
+        self.value = re.compile(encode(r'[^ \t\n\r;]*;'))
+        self.infix = re.compile(encode(r'[ \t\n\r]*[0-9]'))
+        self.call = re.compile(encode(r'[ \t\n\r]*\('))
+        self.eq = re.compile(encode(r'='))
+        self.attrib = re.compile(encode(r'\[[^\]]*'))
+        self.line_comment = re.compile(encode(r'//[^\n]*\n?'))
+        self.block_comment = re.compile(encode(r'/\*'))
+        self.nested_comment = re.compile(encode(r'(?=(/\*|\*/))'))
+        self.comment_open = encode('/*')
+        self.closing_quote = {key(quote): re.compile(encode(quote)) for quote in '"\''}
+        self.single_chars = {key(ch): (token_type, ch) for ch, token_type in _SINGLE_CHAR_TOKENS.items()}
+        self.kinds = {key(ch): kind for ch, kind in _FIRST_CHAR_KINDS.items()}
+        self.no_union_follow = frozenset(key(ch) for ch in ' \t\n\r>{')
+        """chars after a selector that do not start a union selector"""
+
+
+_STR_SYNTAX = _Syntax(str, str, str)
+_BYTES_SYNTAX = _Syntax(lambda s: s.encode('ascii'), ord, lambda b: str(b, 'ascii'))
+
+
+def _skip_blank_and_comment(syn: _Syntax, src, pos: int) -> int:
+    """skip blanks, at most one comment, then blanks again, like Lexer"""
+    pos = syn.blank.match(src, pos).end()
+    m = syn.line_comment.match(src, pos)
+    if m:
+        pos = m.end()
+    elif syn.block_comment.match(src, pos):
+        depth = 1
+        for m in syn.nested_comment.finditer(src, pos + 1):
+            depth += 1 if m.group(1) == syn.comment_open else -1
+            if depth == 0:
+                pos = m.start() + 2
+                break
+        else:
+            pos = len(src)
+    return syn.blank.match(src, pos).end()
+
+
+class Scanner:
+    """Single pass lexer of PQSS
+
+    Produces the same Token stream as :class:`Lexer`, but dispatches on the
+    first char of a lexeme and reads every word once, classifying it by table
+    lookups instead of re-reading it for each candidate type.
+
+    Besides str, the source may be an ASCII bytes-like object such as an mmap,
+    which is scanned in place; only the lexemes are decoded.
+    """
+
+    def __init__(self, src_code, pos: int = 0):
+        """
+        :param src_code:  PQSS code, str or ASCII bytes-like
+        :param pos: offset to start scanning at, which must not be inside a lexeme
+        """
+        self.is_enter_selectors = False
+
+        self._src_code = src_code
+        self._syntax = _STR_SYNTAX if isinstance(src_code, str) else _BYTES_SYNTAX
+        self._pos: int = pos
+        self._lexemes = self._scan()
+
+    def next_token(self) -> Token:
+        """parse a lexeme to Token"""
+        token_type, start, _, literal = next(self._lexemes)
+        return Token(token_type, literal, start)
+
+    def lexemes(self):
+        """
+        iterate the remaining lexemes without building Token objects
+        :return: iterator of (token_type, start, end, literal), where start and end
+            are offsets of the lexeme in the source
+        """
+        return self._lexemes
+
+    def is_end(self):
+        return self._pos >= len(self._src_code)
+
+    def _scan(self):
+        syn = self._syntax
+        decode = syn.decode
+        src = self._src_code
+        n = len(src)
+        pos = self._pos
+        # one copy of each word, properties and selector names repeat all over a sheet
+        words = {}
+        # depth of the parentheses of the builtin call being scanned, as Lexer.call_depth
+        call_depth = 0
+        after_builtin = False
+
+        while True:
+            pos = _skip_blank_and_comment(syn, src, pos)
+            if pos >= n:
+                self._pos = n
+                yield TokenType.EOF, n, n, EOF
+                continue
+
+            ch = src[pos]
+            start = pos
+            end = pos + 1
+            stop = None
+            union = False
+
+            single = syn.single_chars.get(ch)
+            kind = syn.kinds.get(ch)
+            if single is not None:
+                if single[0] is TokenType.LEFT_BRACE:
+                    self.is_enter_selectors = False
+                elif single[0] is TokenType.LEFT_PAREN and (after_builtin or call_depth):
+                    call_depth += 1
+                elif single[0] is TokenType.RIGHT_PAREN and call_depth:
+                    call_depth -= 1
+                token_type, literal = single
+
+            elif kind == _WORD:
+                end = syn.word.match(src, end).end()
+                word = decode(src[pos:end])
+                word = words.setdefault(word, word)
+                word_class = classify_word(word)
+
+                if word_class is TokenType.UNIT or word_class is TokenType.COLOR:
+                    token_type, literal = word_class, word
+                elif end < n and word_class is TokenType.PROPERTY:
+                    token_type, literal = word_class, word
+                elif end >= n and is_property(word[:-1]):
+                    # Lexer.is_property misses the last char of a word ending the source
+                    token_type = TokenType.PROPERTY
+                    literal = word if word_class is TokenType.PROPERTY else None
+                elif lookup_keyword(word[:-1]):
+                    # Lexer.is_keyword checks the word without its last char
+                    token_type = lookup_keyword(word)
+                    if token_type is None:
+                        raise TokenUnKnownException(f'Token {word} does not a valid keyword!!!', pos)
+                    literal = word
+                elif word_class is TokenType.BUILTIN:
+                    token_type, literal = word_class, word
+                elif syn.call.match(src, end):
+                    token_type, literal = TokenType.IDENTIFIER, word
+                else:
+                    m = syn.attrib.match(src, end)
+                    if m:
+                        if m.end() >= n:
+                            raise TokenUnKnownException(f'Token {decode(src[pos:])} does not closed!!!', pos)
+                        end = m.end() + 1
+                        token_type, literal = TokenType.PROPERTY_SELECTOR, decode(src[pos:end])
+                    else:
+                        token_type, literal = TokenType.CLASS_SELECTOR, word
+                    self.is_enter_selectors = True
+                    union = True
+
+            elif kind == _DIGIT:
+                end = syn.digits.match(src, end).end()
+                token_type, literal = TokenType.NUMBER, decode(src[pos:end])
+
+            elif kind == _DOLLAR:
+                end = syn.word.match(src, end).end()
+                token_type, literal = TokenType.IDENTIFIER, decode(src[pos:end])
+
+            elif kind == _STAR:
+                if syn.infix.match(src, end):
+                    token_type, literal = TokenType.MUL, '*'
+                else:
+                    token_type, literal = TokenType.UNIVERSAL_SELECTOR, '*'
+                    self.is_enter_selectors = True
+                    union = True
+
+            elif kind == _GT:
+                if self.is_enter_selectors:
+                    token_type, literal = TokenType.CHILD_SELECTOR, '>'
+                else:
+                    token_type, literal = TokenType.GT, '>'
+
+            elif kind == _EQ:
+                end = min(pos + 2, n)
+                token_type, literal = TokenType.EQ, '=='
+
+            elif kind == _QUOTE:
+                start = end
+                if end == n:
+                    token_type, literal = TokenType.STRING, ''
+                else:
+                    m = syn.closing_quote[ch].search(src, end)
+                    if m is None:
+                        raise TokenUnKnownException(f'Token {decode(src[pos:])} does not closed!!!', pos)
+                    close = m.start()
+                    token_type, literal = TokenType.STRING, decode(src[end:close])
+                    stop = close
+                    end = close + 1
+
+            elif kind == _KEYWORD:
+                if syn.eq.match(src, end):
+                    end += 1
+                    token_type, literal = TokenType.EQ, '!='
+                else:
+                    end = syn.word.match(src, end).end()
+                    literal = decode(src[pos:end])
+                    token_type = lookup_keyword(literal)
+                    if token_type is None:
+                        raise TokenUnKnownException(f'Token {literal} does not a valid keyword!!!', pos)
+
+            elif kind == _HASH and (call_depth or syn.value.match(src, pos)):
+                end = syn.word.match(src, end).end()
+                token_type, literal = TokenType.COLOR, decode(src[pos:end])
+
+            elif kind == _DOT or kind == _HASH:
+                # the char after the prefix is always part of the selector
+                end = syn.word.match(src, min(pos + 2, n)).end()
+                token_type = TokenType.TYPE_SELECTOR if kind == _DOT else TokenType.ID_SELECTOR
+                literal = decode(src[pos:end])
+                self.is_enter_selectors = True
+
+            else:
+                raise TokenUnKnownException(f'Token {decode(src[pos:end])} does unknown!!!', pos)
+
+            self._pos = end
+            after_builtin = token_type is TokenType.BUILTIN
+            yield token_type, start, end if stop is None else stop, literal
+            if union and (end >= n or src[end] not in syn.no_union_follow):
+                yield TokenType.UNION_SELECTOR, end, end, ''
+            pos = end
+
+
+LEXER_ENGINES = {
+    'classic': Lexer,
+    'scanner': Scanner,
+}
+"""Lexer implementations, selectable by name"""
+
+
+def new_lexer(src_code: str, engine: str = 'scanner'):
+    """
+    :param src_code: PQSS code
+    :param engine: name of the lexer implementation in LEXER_ENGINES
+    :return: a lexer over src_code
+    """
+    lexer_cls = LEXER_ENGINES.get(engine)
+    if lexer_cls is None:
+        raise ValueError(f'Lexer engine {engine} does not exist!!!')
+    return lexer_cls(src_code)
@@ -0,0 +1,51 @@
+import re
+from array import array
+from bisect import bisect_right
+
+_NEWLINE_STR_RE = re.compile('\n')
+_NEWLINE_BYTES_RE = re.compile(b'\n')
+_NON_ASCII_RE = re.compile(rb'[\x80-\xff]')
+
+
+def is_ascii(data) -> bool:
+    """check if a bytes-like source, such as an mmap, is pure ASCII without copying it"""
+    return not _NON_ASCII_RE.search(data)
+
+
+def as_source(data):
+    """
+    :param data: content of a PQSS file, bytes-like
+    :return: data itself if it is ASCII, so the scanner can read it in place, otherwise the decoded str
+    """
+    return data if is_ascii(data) else str(data, 'utf-8')
+
+
+class LineIndex:
+    """Line starts of a source, to turn offsets into line and column
+
+    Nothing is tracked while lexing; the index is built by one scan the first
+    time a location is asked, then every lookup is a binary search.
+    """
+
+    def __init__(self, src_code):
+        """
+        :param src_code: PQSS code, str or bytes-like
+        """
+        self.src_code = src_code
+        self._line_starts: array | None = None
+
+    def _build(self) -> array:
+        newline = _NEWLINE_STR_RE if isinstance(self.src_code, str) else _NEWLINE_BYTES_RE
+        line_starts = array('i', [0])
+        line_starts.extend(m.end() for m in newline.finditer(self.src_code))
+        return line_starts
+
+    def location(self, offset: int) -> tuple[int, int]:
+        """
+        :param offset: offset in the source
+        :return: line and column of the offset, both start from 1
+        """
+        if self._line_starts is None:
+            self._line_starts = self._build()
+        line = bisect_right(self._line_starts, offset) - 1
+        return line + 1, offset - self._line_starts[line] + 1
@@ -0,0 +1,98 @@
+from array import array
+
+from .token import Token, TokenType
+from .scanner import Scanner
+
+_TYPE_CODES = {token_type: token_type.value for token_type in TokenType}
+_TYPES_BY_CODE = {token_type.value: token_type for token_type in TokenType}
+
+
+class TokenStream:
+    """Compact Token sequence of a PQSS source
+
+    Tokens are kept as parallel arrays of type codes and start/end offsets into
+    the source; the few literals that are not a slice of the source (``==``,
+    ``!=``, EOF, ...) are kept aside. Token objects are only built on access.
+    The source must stay alive, e.g. an mmap stay open, while the stream is read.
+    """
+
+    def __init__(self, src_code):
+        """
+        :param src_code: PQSS code the offsets point into, str or ASCII bytes-like
+        """
+        self.src_code = src_code
+        self.types = array('i')
+        self.starts = array('i')
+        self.ends = array('i')
+        self.literals: dict[int, object] = {}
+        """literals of the tokens which are not a slice of the source, by index"""
+        self._decode = str if isinstance(src_code, str) else lambda b: str(b, 'ascii')
+
+    def __len__(self):
+        return len(self.types)
+
+    def __getitem__(self, idx: int) -> Token:
+        return self.token(idx)
+
+    def token_type(self, idx: int) -> TokenType:
+        """type of the idx-th token, without building the Token"""
+        return _TYPES_BY_CODE[self.types[idx]]
+
+    def literal(self, idx: int):
+        """literal of the idx-th token, without building the Token"""
+        if idx in self.literals:
+            return self.literals[idx]
+        return self._decode(self.src_code[self.starts[idx]:self.ends[idx]])
+
+    def token(self, idx: int) -> Token:
+        """build the idx-th Token"""
+        return Token(self.token_type(idx), self.literal(idx), self.starts[idx])
+
+    def cursor(self):
+        return TokenCursor(self)
+
+
+class TokenCursor:
+    """Index-based reader of a TokenStream, a drop-in lexer for Parser"""
+    __slots__ = ('stream', 'index')
+
+    def __init__(self, stream: TokenStream):
+        self.stream = stream
+        self.index = 0
+
+    def next_token(self) -> Token:
+        """return the token at the cursor and move forward, stay on EOF at the end"""
+        tok = self.stream.token(self.index)
+        if self.index < len(self.stream) - 1:
+            self.index += 1
+        return tok
+
+    def peek(self, offset: int = 0) -> Token:
+        """look at the token offset places after the cursor without moving"""
+        return self.stream.token(min(self.index + offset, len(self.stream) - 1))
+
+    def is_end(self):
+        return self.index >= len(self.stream) - 1
+
+
+def tokenize(src_code) -> TokenStream:
+    """
+    lex the whole source into a TokenStream, which ends with the EOF token
+    :param src_code: PQSS code, str or ASCII bytes-like
+    """
+    stream = TokenStream(src_code)
+    types = stream.types
+    starts = stream.starts
+    ends = stream.ends
+    literals = stream.literals
+    codes = _TYPE_CODES
+
+    for token_type, start, end, literal in Scanner(src_code).lexemes():
+        if token_type is TokenType.EQ or token_type is TokenType.EOF or literal is None:
+            literals[len(types)] = literal
+        types.append(codes[token_type])
+        starts.append(start)
+        ends.append(end)
+        if token_type is TokenType.EOF:
+            break
+    return stream
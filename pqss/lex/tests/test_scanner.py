@@ -0,0 +1,91 @@
+import pytest
+
+from pqss.lex import TokenType, Token, Lexer, Scanner, new_lexer, TokenUnKnownException
+
+
+def tokens_of(lexer, limit=500):
+    toks = []
+    for _ in range(limit):
+        tok = lexer.next_token()
+        toks.append((tok.token_type, tok.literal, lexer.is_enter_selectors, lexer.is_end()))
+        if tok.token_type == TokenType.EOF:
+            break
+    return toks
+
+
+def same_tokens_test(src_code: str):
+    assert tokens_of(Scanner(src_code)) == tokens_of(Lexer(src_code))
+
+
+def test_same_as_lexer():
+    same_tokens_test('$a:5')
+    same_tokens_test('@extend @mixin @include')
+    same_tokens_test("""
+        $number : 5;
+        MyClass {
+            width : $number;
+        }""")
+    same_tokens_test('$a : 5; * { width: $a; &:hover { width: $a + 3 * 5; } }')
+    same_tokens_test('QWidget > QPushButton, #id.cls *{width: 5px;} // end\n')
+    same_tokens_test('QWidget[color=danger] {width: 5px;}')
+    same_tokens_test('QWidget#container QPushButton {color: #FF0000; height: 12px;}')
+    same_tokens_test('/* a /* nested */ comment */ $color: rgba(255, 255, 255, 1);')
+    same_tokens_test('@mixin error($a) {width:$a;} QPushButton { @include error(5) }')
+    same_tokens_test('@import "./main.pqss"')
+    same_tokens_test('5==5; 5!=5; 5>5; 5<5; -15; 2 * (1 + 3);')
+    same_tokens_test('QCheckBox { &::indicator { background-color: yellow; } }')
+
+
+def test_buffer_sources():
+    src_code = '@import "./main.pqss" $a : 5; QWidget#container > QPushButton {width: $a * 2; color: #FF0000;}'
+    tokens = tokens_of(Scanner(src_code))
+    for buffer in (src_code.encode(), bytearray(src_code.encode()), memoryview(src_code.encode())):
+        assert tokens_of(Scanner(buffer)) == tokens
+
+
+def test_colors_in_builtin_calls():
+    src_code = 'QLabel { color: mix(lighten(#336699, 10), #F00, (1 + 2)); } #ok { width: 1; }'
+    same_tokens_test(src_code)
+    scanner = Scanner(src_code)
+    toks = [scanner.next_token() for _ in range(24)]
+    colors = [tok.literal for tok in toks if tok.token_type == TokenType.COLOR]
+    assert colors == ['#336699', '#F00']
+    # past the call, a # starts an object name again
+    assert Token(TokenType.ID_SELECTOR, '#ok') in toks
+
+
+def test_union_selector():
+    scanner = Scanner('QWidget#container {')
+    assert scanner.next_token() == Token(TokenType.CLASS_SELECTOR, 'QWidget')
+    assert scanner.next_token() == Token(TokenType.UNION_SELECTOR, '')
+    assert scanner.next_token() == Token(TokenType.ID_SELECTOR, '#container')
+    assert scanner.next_token() == Token(TokenType.LEFT_BRACE, '{')
+
+
+def test_new_lexer():
+    assert type(new_lexer('')) is Scanner
+    assert type(new_lexer('', 'classic')) is Lexer
+    with pytest.raises(ValueError):
+        new_lexer('', 'unknown')
+
+
+def test_unknown_token():
+    scanner = Scanner('~')
+    with pytest.raises(TokenUnKnownException):
+        scanner.next_token()
+    # placeholder selectors are not supported yet
+    scanner = Scanner('QLabel {}\n%error {}')
+    with pytest.raises(TokenUnKnownException) as e:
+        while not scanner.is_end():
+            scanner.next_token()
+    assert e.value.offset == 10
+
+
+def test_word_classes():
+    same_tokens_test('QLabel { font-size: 12pt; margin: 1em; color: darkslategray; width: 3px; }')
+    scanner = Scanner('12pt tomato rgba margin-top ')
+    assert scanner.next_token() == Token(TokenType.NUMBER, '12')
+    assert scanner.next_token() == Token(TokenType.UNIT, 'pt')
+    assert scanner.next_token() == Token(TokenType.COLOR, 'tomato')
+    assert scanner.next_token() == Token(TokenType.BUILTIN, 'rgba')
+    assert scanner.next_token() == Token(TokenType.PROPERTY, 'margin-top')
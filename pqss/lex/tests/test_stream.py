@@ -0,0 +1,67 @@
+from pqss.lex import TokenType, Token, Scanner, LineIndex, tokenize
+from pqss.parse.parser import Parser
+
+SOURCE = '''
+    $a : 5; // comment
+    QWidget#container > QPushButton[flat="true"] {
+        width: $a + 3 * 5;
+        color: #FF0000;
+    }
+    5==5; 5!=5;
+    @import "./main.pqss"'''
+
+
+def scanner_tokens(src_code):
+    scanner = Scanner(src_code)
+    toks = [scanner.next_token()]
+    while toks[-1].token_type != TokenType.EOF:
+        toks.append(scanner.next_token())
+    return toks
+
+
+def test_same_as_scanner():
+    stream = tokenize(SOURCE)
+    assert [stream[i] for i in range(len(stream))] == scanner_tokens(SOURCE)
+    assert stream.token_type(len(stream) - 1) == TokenType.EOF
+
+
+def test_bytes_source():
+    for src_code in (SOURCE.encode(), bytearray(SOURCE.encode()), memoryview(SOURCE.encode())):
+        stream = tokenize(src_code)
+        assert [stream[i] for i in range(len(stream))] == scanner_tokens(SOURCE)
+
+
+def test_offsets():
+    stream = tokenize('$a : 5;')
+    assert list(stream.starts) == [0, 3, 5, 6, 7]
+    assert list(stream.ends) == [2, 4, 6, 7, 7]
+    assert stream.literal(0) == '$a'
+
+
+def test_cursor():
+    cursor = tokenize('$a : 5;').cursor()
+    assert cursor.peek(2) == Token(TokenType.NUMBER, '5')
+    assert cursor.next_token() == Token(TokenType.IDENTIFIER, '$a')
+    assert cursor.peek() == Token(TokenType.ASSIGN, ':')
+    while not cursor.is_end():
+        cursor.next_token()
+    assert cursor.next_token().token_type == TokenType.EOF
+    assert cursor.next_token().token_type == TokenType.EOF
+
+
+def test_parse_stream():
+    src_code = '$a : 5; QPushButton { width: $a; }'
+    style_sheet = Parser(tokenize(src_code)).parse_program()
+    assert len(style_sheet.statements) == 2
+    assert style_sheet.statements[1].rules[0].property.literal == 'width'
+
+
+def test_line_index():
+    src_code = '$a : 5;\nQWidget {\n\n  width: $a;\n}'
+    index = LineIndex(src_code)
+    stream = tokenize(src_code)
+    locations = [index.location(stream.starts[i]) for i in range(len(stream))]
+    assert locations[:5] == [(1, 1), (1, 4), (1, 6), (1, 7), (2, 1)]
+    assert locations[6] == (4, 3)
+    assert index.location(len(src_code)) == (5, 2)
+    assert LineIndex(src_code.encode()).location(stream.starts[6]) == (4, 3)
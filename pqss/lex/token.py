@@ -1,7 +1,6 @@
 from .constants import (
-    colors,
-    properties,
     keywords,
+    word_classes,
     TokenType
 )
 """
@@ -9,14 +8,32 @@ from .constants import (
 """
 
 
+def classify_word(lexeme: str) -> TokenType | None:
+    """
+        :param lexeme literal string
+        :return the class of a word of the PQSS vocabulary as TokenType, or None
+    """
+    return word_classes.get(lexeme)
+
+
 def is_property(lexeme: str):
     """check if a literal is a QSS property"""
-    return lexeme in properties
+    return word_classes.get(lexeme) is TokenType.PROPERTY
 
 
 def is_color(lexeme: str):
     """check if a literal is a color string"""
-    return lexeme in colors
+    return word_classes.get(lexeme) is TokenType.COLOR
+
+
+def is_unit(lexeme: str):
+    """check if a literal is a unit of length"""
+    return word_classes.get(lexeme) is TokenType.UNIT
+
+
+def is_builtin(lexeme: str):
+    """check if a literal is a builtin function"""
+    return word_classes.get(lexeme) is TokenType.BUILTIN
 
 
 def lookup_keyword(lexeme):
@@ -29,9 +46,15 @@ def lookup_keyword(lexeme):
 
 class Token:
     """Token Entry"""
-    def __init__(self, token_type: TokenType | None, lexeme):
+    __slots__ = ('token_type', 'literal', 'start')
+
+    def __init__(self, token_type: TokenType | None, lexeme, start: int | None = None):
+        """
+        :param start: offset of the lexeme in the source, resolved to a line by LineIndex
+        """
         self.token_type = token_type
         self.literal = lexeme
+        self.start = start
 
     def __eq__(self, other):
         return (type(other) is Token
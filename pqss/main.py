@@ -1,18 +1,249 @@
+import mmap
 import os.path
+from concurrent.futures import ProcessPoolExecutor
+from contextlib import contextmanager
+from functools import wraps
+from io import StringIO
+from typing import Callable, Iterable, Mapping, TextIO
 
 from pqss.lex import *
 from pqss.env import *
 from pqss.parse import *
 
+_style_sheet_cache = StyleSheetCache()
+"""imported files parsed by earlier compiles"""
 
-def parse(source: str) -> str:
+
+def parse(source: str, engine: str = 'scanner', include_paths: list[str] | None = None,
+          jobs: int | None = None, cache_dir: str | None = None, output_cache: str | None = None) -> str:
+    """compile a PQSS file if source is a path of file, otherwise compile source itself"""
+    if os.path.isfile(source):
+        return compile_file(source, engine, include_paths, jobs, cache_dir, output_cache)
+    return compile_string(source, engine, include_paths, jobs, cache_dir, output_cache)
+
+
+def compile_to(source: str, stream: TextIO, engine: str = 'scanner', include_paths: list[str] | None = None,
+               jobs: int | None = None, cache_dir: str | None = None, output_cache: str | None = None):
+    """
+    compile a PQSS file if source is a path of file, otherwise compile source itself,
+    writing the QSS into a text stream as it is produced, e.g. straight into a file.
+    The stream holds the QSS produced so far when an error is raised.
+    With an output cache, the QSS is written once compiled.
+    """
+    if os.path.isfile(source):
+        _compile_file(source, stream, engine, include_paths, jobs, cache_dir, output_cache)
+    else:
+        _compile(source, stream, engine, None, include_paths, jobs, cache_dir, output_cache)
+
+
+def iter_compile(source: str, engine: str = 'scanner', include_paths: list[str] | None = None):
+    """
+    compile a PQSS file if source is a path of file, otherwise compile source itself,
+    one top-level statement at a time: each is lexed, parsed and evaluated, its QSS
+    yielded, and its AST dropped unless kept by the Environment, as a mixin is.
+    Memory stays bounded by the largest statement rather than the whole source.
+    :return: iterator of QSS chunks
+    """
     if os.path.isfile(source):
-        source = read_file(source)
+        with _open_source(source, engine) as (src_code, path):
+            yield from _iter_compile(src_code, engine, path, include_paths)
+    else:
+        yield from _iter_compile(source, engine, None, include_paths)
+
+
+def compile_render(source: str, variables: Iterable[str] | None = None, engine: str = 'scanner',
+                   include_paths: list[str] | None = None) -> Callable[..., str]:
+    """
+    compile a PQSS file if source is a path of file, otherwise compile source itself,
+    into a function rendering its QSS with other values of its variables:
+
+        render = compile_render('theme.pqss', ['accent'])
+        render(accent='#ff0000')
 
-    compiler = Parser(Lexer(source))
-    style_sheet = compiler.parse_program()
-    qss = style_sheet.eval(Environment())
-    return qss
+    An argument overrides every assignment of the variable in the sheet, the
+    variables not given keep their values. The QSS independent of the variables
+    is rendered once, by compile_render, and the rest at every call.
+    :param variables: names of the variables render takes, without $.
+                      All the variables the sheet assigns by default
+    :return: render(**variables) -> str
+    """
+    if os.path.isfile(source):
+        return _build(source, engine, include_paths, lambda style_sheet, path: build_render(style_sheet, variables, path))
+    render = _build(source, engine, include_paths, lambda style_sheet, path: build_render(style_sheet, variables))
+
+    @wraps(render)
+    def render_located(**variables) -> str:
+        try:
+            return render(**variables)
+        except PQSSException as e:
+            raise e.locate(LineIndex(source), None)
+
+    return render_located
+
+
+def compile_variants(source: str, variants: Iterable[Mapping[str, object]], engine: str = 'scanner',
+                     include_paths: list[str] | None = None, output_cache: str | None = None) -> list[str]:
+    """
+    compile a PQSS file if source is a path of file, otherwise compile source itself,
+    once for each set of variables, as compile_render(source)(**variables) would:
+
+        light, dark = compile_variants('theme.pqss', [{'bg': '#FFFFFF'}, {'bg': '#202020'}])
+
+    The QSS independent of the variables of all the sets is rendered once, and
+    the QSS depending on some only once for each distinct set of their values.
+    :param variants: sets of variables, by name without $
+    :param output_cache: directory of compiled QSS kept between runs, see OutputCache
+    :return: QSS of each set
+    """
+    if output_cache is None:
+        return _build(source, engine, include_paths,
+                      lambda style_sheet, path: render_variants(style_sheet, variants, path))
+
+    variants = list(variants)
+    cache = OutputCache(output_cache)
+    if os.path.isfile(source):
+        with open(source, 'rb') as f:
+            src_code, path = f.read(), source
+    else:
+        src_code, path = source, None
+    keys = [cache.key(src_code, path, include_paths, variables) for variables in variants]
+    results = [cache.get(key) for key in keys]
+    missing = [idx for idx, qss in enumerate(results) if qss is None]
+    if missing:
+        resolver = ImportResolver(include_paths, StyleSheetCache(), engine)
+        compiled = _build(source, engine, include_paths,
+                          lambda style_sheet, path: render_variants(style_sheet, [variants[idx] for idx in missing],
+                                                                    path), resolver)
+        digests = resolver.digests()
+        for idx, qss in zip(missing, compiled):
+            results[idx] = qss
+            if digests is not None:
+                cache.put(keys[idx], digests, qss, resolver.shadows)
+    return results
+
+
+def _build(source: str, engine: str, include_paths: list[str] | None, build: Callable,
+           resolver: ImportResolver | None = None):
+    """
+    parse a PQSS file or code and its imports, then build from the StyleSheet, locating the errors
+    :param build: build(style_sheet, path of the file or None)
+    :param resolver: resolver of the imports, with a cache of its own
+    """
+    # the StyleSheets are optimized for open variables, none can be shared with other compiles
+    if resolver is None:
+        resolver = ImportResolver(include_paths, StyleSheetCache(), engine)
+    if os.path.isfile(source):
+        with _open_source(source, engine) as (src_code, path):
+            style_sheet = resolver.parse(src_code, path)
+        return build(style_sheet, path)
+
+    style_sheet = resolver.parse(source)
+    try:
+        return build(style_sheet, None)
+    except PQSSException as e:
+        raise e.locate(LineIndex(source), None)
+
+
+def compile_string(source: str, engine: str = 'scanner', include_paths: list[str] | None = None,
+                   jobs: int | None = None, cache_dir: str | None = None, output_cache: str | None = None) -> str:
+    """
+    compile PQSS code to QSS
+    :param include_paths: directories to search imported files in
+    :param jobs: number of processes parsing the imported files, in parallel when more than 1
+    :param cache_dir: directory of parsed sources kept between runs, by content hash
+    :param output_cache: directory of compiled QSS kept between runs, see OutputCache
+    """
+    out = StringIO()
+    _compile(source, out, engine, None, include_paths, jobs, cache_dir, output_cache)
+    return out.getvalue()
+
+
+def compile_file(path: str, engine: str = 'scanner', include_paths: list[str] | None = None,
+                 jobs: int | None = None, cache_dir: str | None = None, output_cache: str | None = None) -> str:
+    """
+    compile a PQSS file to QSS.
+    The file is memory-mapped, and ASCII content is lexed straight from the
+    map by the scanner without being decoded as a whole.
+    :param include_paths: directories to search imported files in, after the directory of the file
+    :param jobs: number of processes parsing the imported files, in parallel when more than 1
+    :param cache_dir: directory of parsed sources kept between runs, by content hash
+    :param output_cache: directory of compiled QSS kept between runs, see OutputCache
+    """
+    out = StringIO()
+    _compile_file(path, out, engine, include_paths, jobs, cache_dir, output_cache)
+    return out.getvalue()
+
+
+def _compile_file(path: str, out: TextIO, engine: str, include_paths: list[str] | None,
+                  jobs: int | None, cache_dir: str | None, output_cache: str | None = None):
+    with _open_source(path, engine) as (src_code, path):
+        _compile(src_code, out, engine, path, include_paths, jobs, cache_dir, output_cache)
+
+
+@contextmanager
+def _open_source(path: str, engine: str):
+    """
+    the content of a PQSS file and its real path. ASCII content read by the scanner
+    is a read-only mmap of the file, valid until the context exits.
+    """
+    path = os.path.realpath(path)
+    with open(path, 'rb') as f:
+        if os.fstat(f.fileno()).st_size == 0:
+            yield '', path
+            return
+        with mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ) as buf:
+            if engine == 'scanner' and is_ascii(buf):
+                yield buf, path
+            else:
+                yield str(buf, 'utf-8'), path
+
+
+def _compile(source, out: TextIO, engine: str, path: str | None, include_paths: list[str] | None,
+             jobs: int | None = None, cache_dir: str | None = None,
+             output_cache: str | None = None) -> ImportResolver | None:
+    """:return: the resolver of the imports, None on a hit of the output cache"""
+    if output_cache is not None:
+        cache = OutputCache(output_cache)
+        key = cache.key(source, path, include_paths)
+        qss = cache.get(key)
+        if qss is None:
+            compiled = StringIO()
+            resolver = _compile(source, compiled, engine, path, include_paths, jobs, cache_dir)
+            qss = compiled.getvalue()
+            digests = resolver.digests()
+            if digests is not None:
+                cache.put(key, digests, qss, resolver.shadows)
+        out.write(qss)
+        return None
+
+    ast_cache = ASTCache(cache_dir) if cache_dir is not None else None
+    resolver = ImportResolver(include_paths, _style_sheet_cache, engine, ast_cache)
+    if jobs is not None and jobs > 1:
+        with ProcessPoolExecutor(max_workers=jobs) as executor:
+            style_sheet = resolver.parse(source, path, executor)
+    else:
+        style_sheet = resolver.parse(source, path)
+    optimize(style_sheet)
+    try:
+        style_sheet.emit(Environment(), out)
+    except PQSSException as e:
+        raise e.locate(LineIndex(source), path)
+    return resolver
+
+
+def _iter_compile(source, engine: str, path: str | None, include_paths: list[str] | None):
+    resolver = ImportResolver(include_paths, _style_sheet_cache, engine)
+    environment = Environment(slots=resolver.slots)
+    optimizer = Optimizer()
+    for stmt in resolver.iter_parse(source, path):
+        optimizer.statement(stmt)
+        out = StringIO()
+        try:
+            stmt.emit(environment, out)
+        except PQSSException as e:
+            raise e.locate(LineIndex(source), path)
+        if out.tell():
+            yield out.getvalue()
 
 
 def read_file(p: str):
@@ -20,4 +251,3 @@ def read_file(p: str):
     with open(p, 'r') as f:
         res = f.read()
     return res
-
@@ -1 +1,9 @@
-from .parser import *
\ No newline at end of file
+from .parser import *
+from .importer import ImportResolver, StyleSheetCache
+from .incremental import IncrementalParser
+from .astcache import ASTCache, dump_style_sheet, load_style_sheet
+from .outputcache import OutputCache
+from .optimizer import Optimizer, optimize
+from .colors import RGBA, parse_color
+from .render import build_render, render_variants
+from .exceptions import *
@@ -4,9 +4,11 @@ from .var import *
 from .identifier import *
 from .color import Color
 from .builtin import Builtin
-from .mixin import Mixin
+from .mixin import Mixin, MixinCache
 from .include import Include
+from .imports import Import
 from .integer import IntegerLiteral
+from .constant import Constant
 from .boolean import Boolean
 from .selector import Selector
 from .rule import Rule
@@ -1,48 +1,71 @@
 import abc
+from io import StringIO
+from typing import TextIO
 
 from pqss.lex import TokenType, Token
 from pqss.env import *
 
 
 class Node:
+    __slots__ = ()
+
     @abc.abstractmethod
     def eval(self, environment: Environment):
         pass
 
+    def emit(self, environment: Environment, out: TextIO):
+        """evaluate the node, writing its QSS into a text stream"""
+        result = self.eval(environment)
+        if result is not None:
+            out.write(str(result))
+
 
 class BlankNode(Node):
+    __slots__ = ()
 
     def eval(self, environment: Environment):
         return ''
 
 
 class Statement(Node):
+    __slots__ = ()
+
     @abc.abstractmethod
     def stmt_node(self):
         pass
 
 
 class Expression(Node):
+    __slots__ = ()
+
     @abc.abstractmethod
     def expr_node(self):
         pass
 
 
 class StyleSheet(Node):
+    __slots__ = ('statements', 'imports', 'slots')
+
     def __init__(self):
         self.statements: list[Statement] = []
+        self.imports: list[Statement] = []
+        """Import statements of the sheet in source order, top-level or nested"""
+        self.slots: Slots | None = None
+        """slots of the global names its identifiers are bound to, shared with the sheets it imports"""
 
     def eval(self, environment: Environment):
-        qss = ''
-        for stmt in self.statements:
-            result = stmt.eval(environment)
-            if result is not None:
-                qss = qss + str(result)
+        return emit_to_str(self, environment)
 
-        return qss
+    def emit(self, environment: Environment, out: TextIO):
+        if self.slots is not None:
+            environment.root.bind(self.slots)
+        for stmt in self.statements:
+            stmt.emit(environment, out)
 
 
 class ExpressionStatement(Statement):
+    __slots__ = ('expr',)
+
     def __init__(self):
         self.expr: Expression | None = None
 
@@ -54,6 +77,8 @@ class ExpressionStatement(Statement):
 
 
 class PrefixExpression(Expression):
+    __slots__ = ('token', 'operator', 'right')
+
     def eval(self, environment: Environment):
         right = self.right.eval(environment)
         if self.token.token_type == TokenType.SUB:
@@ -69,6 +94,8 @@ class PrefixExpression(Expression):
 
 
 class InfixExpression(Expression):
+    __slots__ = ('token', 'left', 'operator', 'right')
+
     def eval(self, environment: Environment):
         left = self.left.eval(environment)
         right = self.right.eval(environment)
@@ -96,12 +123,16 @@ class InfixExpression(Expression):
 
 
 class BlockStatement(Statement):
+    __slots__ = ('token', 'statements')
+
     def eval(self, environment: Environment):
-        res = '{'
+        return emit_to_str(self, environment)
+
+    def emit(self, environment: Environment, out: TextIO):
+        out.write('{')
         for stmt in self.statements:
-            res += str(stmt.eval(environment))
-        res += '}'
-        return res
+            out.write(str(stmt.eval(environment)))
+        out.write('}')
 
     def __init__(self, token: Token | None):
         self.token = token
@@ -112,6 +143,8 @@ class BlockStatement(Statement):
 
 
 class IfStatement(Statement):
+    __slots__ = ('token', 'condition', 'consequence', 'alternative')
+
     def eval(self, environment: Environment):
         pass
 
@@ -125,3 +158,10 @@ class IfStatement(Statement):
 
     def stmt_node(self):
         pass
+
+
+def emit_to_str(node: Node, environment: Environment) -> str:
+    """the QSS a node emits, as one string"""
+    out = StringIO()
+    node.emit(environment, out)
+    return out.getvalue()
@@ -7,6 +7,8 @@ from .ast import (
 
 
 class Boolean(Expression):
+    __slots__ = ('token', 'value')
+
     def eval(self, environment: Environment):
         return self.value
 
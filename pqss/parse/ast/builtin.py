@@ -3,16 +3,19 @@ from .ast import (
 )
 from pqss.env import Environment
 from pqss.lex import Token
+from ..colors import BUILTINS
+from ..exceptions import BuiltinArgumentException
 
 
 class Builtin(Expression):
+    __slots__ = ('token', 'args')
+
     def eval(self, environment: Environment):
-        res = self.token.literal
-        res += '('
-        for arg in self.args:
-            res += str(arg.eval(environment)) + ','
-        res = res[:-1] + ');'
-        return res
+        args = [arg.eval(environment) for arg in self.args]
+        try:
+            return BUILTINS[self.token.literal](*args)
+        except TypeError as e:
+            raise BuiltinArgumentException(f'Bad arguments to {self.token.literal}(): {e}', self.token.start) from None
 
     def __init__(self, token: Token, args: list[Expression] | None = None):
         self.token = token
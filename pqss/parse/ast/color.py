@@ -3,11 +3,15 @@ from .ast import (
 )
 from pqss.env import Environment
 from pqss.lex import Token
+from ..colors import parse_color
 
 
 class Color(Expression):
+    __slots__ = ('token',)
+
     def eval(self, environment: Environment):
-        return self.token.literal
+        color = parse_color(self.token.literal)
+        return self.token.literal if color is None else color
 
     def __init__(self, token: Token):
         self.token: Token | None = token
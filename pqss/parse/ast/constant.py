@@ -0,0 +1,21 @@
+
+from pqss.env import Environment
+from pqss.lex import Token
+from .ast import (
+    Expression
+)
+
+
+class Constant(Expression):
+    """Value of an expression computed before evaluation"""
+    __slots__ = ('token', 'value')
+
+    def eval(self, environment: Environment):
+        return self.value
+
+    def expr_node(self):
+        pass
+
+    def __init__(self, token: Token | None, value):
+        self.token = token
+        self.value = value
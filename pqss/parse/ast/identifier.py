@@ -6,8 +6,20 @@ from pqss.lex import Token
 
 
 class Identifier(Expression):
+    __slots__ = ('token', 'value', 'depth', 'slot')
+
     def eval(self, environment: Environment):
-        val = environment.get(self.token.literal)
+        slot = self.slot
+        if slot is None:
+            val = environment.get(self.token.literal)
+        elif self.depth:
+            val = environment.values[slot]
+        else:
+            try:
+                val = environment.root.values[slot]
+            except IndexError:
+                # nothing was ever set at the slot
+                val = None
         if val:
             return val
         else:
@@ -17,6 +29,9 @@ class Identifier(Expression):
     def __init__(self, token: Token, value):
         self.token: Token | None = token
         self.value: str = ''
+        self.depth: int | None = None
+        self.slot: int | None = None
+        """slot of the variable in the scope at depth, bound by pqss.parse.resolver"""
 
     def token_literal(self) -> str:
         return self.token.literal
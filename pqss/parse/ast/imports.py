@@ -0,0 +1,39 @@
+
+from typing import TextIO
+
+from pqss.env import Environment
+from pqss.lex import Token, LineIndex, PQSSException
+from .ast import (
+    Statement,
+    StyleSheet,
+    emit_to_str,
+)
+
+
+class Import(Statement):
+    __slots__ = ('token', 'name', 'offset', 'path', 'style_sheet')
+
+    def eval(self, environment: Environment):
+        return emit_to_str(self, environment)
+
+    def emit(self, environment: Environment, out: TextIO):
+        try:
+            self.style_sheet.emit(environment, out)
+        except PQSSException as e:
+            if e.line is None and self.path is not None:
+                with open(self.path, 'rb') as f:
+                    e.locate(LineIndex(f.read()), self.path)
+            raise
+
+    def __init__(self, token: Token, name: str | None = None, offset: int | None = None):
+        self.token = token
+        self.name = name
+        self.offset = offset
+        """offset of the imported name in the importing file"""
+        self.path: str | None = None
+        """real path of the imported file, set by ImportResolver"""
+        self.style_sheet: StyleSheet | None = None
+        """parsed imported file, set by ImportResolver"""
+
+    def stmt_node(self):
+        pass
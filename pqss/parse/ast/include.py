@@ -1,37 +1,30 @@
 
+from typing import TextIO
+
 from pqss.env import Environment
 from pqss.lex import Token
 from .ast import (
     Statement,
     Expression,
-    BlockStatement
+    BlockStatement,
+    emit_to_str,
 )
+from ..exceptions import MixinNotExistsException
 
 
 class Include(Statement):
+    __slots__ = ('token', 'mixin_name', 'args')
+
     def eval(self, environment: Environment):
+        return emit_to_str(self, environment)
+
+    def emit(self, environment: Environment, out: TextIO,
+             selectors: list[str] | None = None, children: list[str] | None = None):
+        """see Ruleset.emit_declarations"""
         mixin = environment.get(self.mixin_name)
         if not mixin:
-            raise "Mixin not exists!!!"
-        params = mixin.params
-        body = mixin.body
-
-        return self.do_eval(params, body, environment)
-
-    def do_eval(self, params, body, environment: Environment):
-        bloc_env = Environment()
-        bloc_env.parent = environment
-        idx = 0
-        while idx < len(params):
-            key = params[idx].token.literal
-            val = self.args[idx].eval(bloc_env)
-            bloc_env.set(key, val)
-
-            idx += 1
-
-        s = body.eval(bloc_env)
-        res = s[1:-1] if len(s) > 2 else ''
-        return res
+            raise MixinNotExistsException(f'Mixin {self.mixin_name} does not exist!!!', self.token.start)
+        mixin.expand(self.args, environment, out, selectors, children)
 
     def __init__(self, token: Token, mixin_name: str | None = None, args: list[Expression] | None = None):
         self.token = token
@@ -7,6 +7,8 @@ from .ast import (
 
 
 class IntegerLiteral(Expression):
+    __slots__ = ('token', 'value')
+
     def expr_node(self):
         pass
 
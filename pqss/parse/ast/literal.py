@@ -6,6 +6,8 @@ from pqss.lex import Token
 
 
 class Literal(Expression):
+    __slots__ = ('token',)
+
     def eval(self, environment: Environment):
         return self.token.literal
 
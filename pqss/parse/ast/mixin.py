@@ -1,14 +1,21 @@
+from io import StringIO
+from typing import TextIO
 
-from pqss.env import Environment
+from pqss.env import Environment, Slots
 from pqss.lex import Token
 from .ast import (
+    Node,
     Statement,
-    BlockStatement
+    Expression,
+    BlockStatement,
 )
 from .identifier import Identifier
+from .include import Include
 
 
 class Mixin(Statement):
+    __slots__ = ('token', 'name', 'params', 'body', '_cache')
+
     def eval(self, environment: Environment):
         environment.set(self.name, self)
 
@@ -20,3 +27,149 @@ class Mixin(Statement):
         self.name: str = name
         self.params: list[Identifier] = []
         self.body: BlockStatement | None = None
+        self._cache: MixinCache | None = None
+
+    @property
+    def cache(self) -> 'MixinCache':
+        """expansions of the mixin, made on the first include"""
+        if self._cache is None:
+            self._cache = MixinCache(self)
+        return self._cache
+
+    def expand(self, args: list[Expression], environment: Environment, out: TextIO,
+               selectors: list[str] | None = None, children: list[str] | None = None):
+        """
+        write the declarations of the mixin included with args, taken from its
+        cache when an earlier include expanded it the same way
+        :param selectors: qualified selectors of the including ruleset, its child rulesets are nested in them
+        :param children: the QSS of its child rulesets is appended to it, written in place when None
+        """
+        # the arguments are evaluated in the scope of the include
+        args = [args[idx].eval(environment) for idx in range(len(self.params))]
+        cache = self._cache
+        if cache is None:
+            cache = self.cache
+        values = list(args)
+        if cache.reads or cache.includes:
+            values.extend(cache.outer_values(environment))
+        # True == 1.0, but they are written differently
+        key = (*values, *map(type, values))
+        if cache.nests and selectors is not None:
+            key += tuple(selectors)
+        try:
+            expansion = cache.get(key)
+        except TypeError:
+            # an expansion reading an unhashable value is never cached
+            key = expansion = None
+        if expansion is None:
+            # the body of a mixin is a Ruleset without selectors, its declarations go in place
+            qss = StringIO()
+            nested = []
+            # the parameters are the slots of the scope of the expansion
+            bloc_env = Environment(environment.root, cache.params, args)
+            self.body.emit_declarations(bloc_env, qss, selectors, nested)
+            child_qss = StringIO()
+            child_qss.write(''.join(nested))
+            self.body._emit_child_rulesets(bloc_env, child_qss, selectors)
+            expansion = qss.getvalue(), child_qss.getvalue()
+            if key is not None:
+                cache.put(key, expansion)
+        qss, child_qss = expansion
+        out.write(qss)
+        if child_qss:
+            if children is not None:
+                children.append(child_qss)
+            else:
+                out.write(child_qss)
+
+
+class MixinCache:
+    """QSS of the expansions of a mixin
+
+    An expansion is keyed by the values of the arguments, and by the values of
+    what the body reads from the global scope: the variables other than
+    the parameters, and the mixins it includes, with what these read in turn.
+    The expansion of a body with child rulesets, or including other mixins, is
+    keyed by the selectors of the including ruleset too, its child rulesets
+    being nested in them.
+    """
+
+    maxsize = 256
+    """expansions kept by a mixin, the oldest are dropped first"""
+
+    def __init__(self, mixin: Mixin):
+        self.params: tuple[str, ...] = tuple(param.token.literal for param in mixin.params or ())
+        """names of the parameters, in the order of the slots of an expansion"""
+        params = set(self.params)
+        reads = set()
+        includes = set()
+        _collect(mixin.body, reads, includes)
+        self.reads: tuple[str, ...] = tuple(sorted(reads - params))
+        """variables the body reads from the global scope"""
+        self._slots: Slots | None = None
+        self._read_slots: tuple[int, ...] = ()
+        """slots of the reads in _slots, the slots of the last global scope read"""
+        self.includes: tuple[str, ...] = tuple(sorted(includes))
+        """mixins the body includes"""
+        self.nests = bool(mixin.body is not None and mixin.body.child_rulesets or self.includes)
+        """whether an expansion may write child rulesets"""
+        self.hits = 0
+        self.misses = 0
+        self._entries: dict[tuple, tuple[str, str]] = {}
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key: tuple) -> tuple[str, str] | None:
+        """the declarations and the child rulesets of an expansion"""
+        expansion = self._entries.get(key)
+        if expansion is None:
+            self.misses += 1
+        else:
+            self.hits += 1
+        return expansion
+
+    def put(self, key: tuple, expansion: tuple[str, str]):
+        if len(self._entries) >= self.maxsize:
+            del self._entries[next(iter(self._entries))]
+        self._entries[key] = expansion
+
+    def outer_values(self, environment: Environment, _seen: set[int] | None = None) -> list:
+        """values an expansion reads from the global scope of the include, environment"""
+        environment = environment.root
+        slots = environment.slots
+        if slots is None:
+            values = [environment.get(name) for name in self.reads]
+        else:
+            if slots is not self._slots:
+                self._slots = slots
+                self._read_slots = tuple(slots.slot_of(name) for name in self.reads)
+            values = [environment.load(0, slot) for slot in self._read_slots]
+        for name in self.includes:
+            mixin = environment.get(name)
+            values.append(mixin)
+            if _seen is None:
+                _seen = set()
+            if isinstance(mixin, Mixin) and id(mixin) not in _seen:
+                _seen.add(id(mixin))
+                values.extend(mixin.cache.outer_values(environment, _seen))
+        return values
+
+
+def _collect(node, reads: set[str], includes: set[str]):
+    """add the variables a node reads, and the mixins it includes"""
+    if isinstance(node, list):
+        for item in node:
+            _collect(item, reads, includes)
+        return
+    if not isinstance(node, Node):
+        return
+    if isinstance(node, Identifier):
+        reads.add(node.token.literal)
+        return
+    if isinstance(node, Include):
+        includes.add(node.mixin_name)
+    for cls in type(node).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(node, name):
+                _collect(getattr(node, name), reads, includes)
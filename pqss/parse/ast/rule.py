@@ -10,6 +10,8 @@ from .unit import Unit
 
 
 class Rule(Statement):
+    __slots__ = ('property', 'value', 'unit')
+
     def eval(self, environment: Environment):
         return f'{self.property.literal}:{self.value.eval(environment)}{self.unit.eval(environment)};'
 
@@ -1,74 +1,109 @@
 
+from typing import TextIO
+
 from pqss.env import Environment
 from pqss.lex import Token, TokenType
 from .ast import (
     Statement,
     Expression,
+    emit_to_str,
 )
 from .selector import Selector
 from .rule import Rule
 from .include import Include
-from ... import util
 
 
 class Ruleset(Statement):
+    __slots__ = ('selectors', 'rules', 'child_rulesets', 'includes')
+
     def eval(self, environment: Environment):
-        res = self._eval_selectors(environment)
-        res += '{'
+        return emit_to_str(self, environment)
+
+    def emit(self, environment: Environment, out: TextIO):
+        self._emit(environment, out, None)
+
+    def _emit(self, environment: Environment, out: TextIO, parents: list[str] | None):
+        """
+        :param parents: qualified selectors of the parent ruleset, None at the top level
+        """
+        selectors = self.qualified_selectors(environment, parents)
+        out.write(', '.join(selectors))
+        out.write('{')
+        children = []
+        self.emit_declarations(environment, out, selectors, children)
+        out.write('}')
+
+        out.write(''.join(children))
+        self._emit_child_rulesets(environment, out, selectors)
+
+    def emit_declarations(self, environment: Environment, out: TextIO,
+                          selectors: list[str] | None = None, children: list[str] | None = None):
+        """
+        write the rules and included mixins of the ruleset, without braces
+        :param selectors: qualified selectors of the ruleset, the child rulesets of included mixins are nested in them
+        :param children: the QSS of the child rulesets of included mixins is appended to it,
+                         to be written after the block; written in place when None
+        """
         for rule in self.rules:
-            res += rule.eval(environment)
+            rule.emit(environment, out)
         for inc in self.includes:
-            res += inc.eval(environment)
-        res += '}'
-
-        res += self._eval_child_rulesets(environment)
-
-        return res
-
-    def _eval_selectors(self, environment):
-        res = ''
-        idx = 0
-        while idx < len(self.selectors):
-            selector = self.selectors[idx]
-            res += selector.eval(environment)
-            if idx < len(self.selectors) - 1:
-                peek = self.selectors[idx + 1]
-                if util.expect_token_type(peek.token, TokenType.UNION_SELECTOR):
-                    idx += 1
-                else:
-                    res += ' '
-            idx += 1
-
-        return res
-
-    def _eval_child_rulesets(self, environment):
-        if len(self.child_rulesets) == 0:
-            return ''
-
-        res = ''
-
-        idx = 0
-        while idx < len(self.selectors) - 1:
-            selector = self.selectors[idx]
-            res += selector.eval(environment)
-            if idx < len(self.selectors) - 1:
-                peek = self.selectors[idx + 1]
-                if util.expect_token_type(peek.token, TokenType.UNION_SELECTOR):
-                    idx += 1
-                else:
-                    res += ' '
-            idx += 1
-
-        for ruleset in self.child_rulesets:
-            val = ruleset.eval(environment)
-
-            if val.find('&') != -1:
-                val = val.replace('&', self.selectors[-1].eval(environment))
-                res += ' ' + val
+            inc.emit(environment, out, selectors, children)
+
+    def qualified_selectors(self, environment: Environment, parents: list[str] | None = None) -> list[str]:
+        """
+        selectors of the ruleset between commas, nested in each selector of its
+        parent: & stands for the parent selector, and a selector without & is a
+        descendant of it
+        :param parents: qualified selectors of the parent ruleset, None at the top level
+        """
+        groups = self._selector_groups(environment)
+        if parents is None:
+            return ['&'.join(parts) for parts in groups]
+        return [parent.join(parts) if len(parts) > 1 else f'{parent} {parts[0]}'
+                for parent in parents for parts in groups]
+
+    def _selector_groups(self, environment: Environment) -> list[list[str]]:
+        """text of each selector between commas, split at its &"""
+        groups = []
+        parts = []
+        text = []
+        glued = True
+        for selector in self.selectors:
+            token_type = selector.token.token_type
+            if token_type is TokenType.UNION_SELECTOR:
+                glued = True
+            elif token_type is TokenType.COMMA:
+                parts.append(''.join(text))
+                groups.append(parts)
+                parts = []
+                text = []
+                glued = True
+            elif token_type is TokenType.PARENT_REFERENCE:
+                if not glued:
+                    text.append(' ')
+                parts.append(''.join(text))
+                text = []
+                glued = False
+            elif token_type is TokenType.ASSIGN:
+                # the : of a pseudo-state or sub-control, lexed apart in a nested selector
+                text.append(selector.eval(environment))
+                glued = True
             else:
-                res += self.selectors[-1].eval(environment) + ' ' + val
-
-        return res
+                if not glued:
+                    text.append(' ')
+                text.append(selector.eval(environment))
+                glued = False
+        parts.append(''.join(text))
+        groups.append(parts)
+        return groups
+
+    def _emit_child_rulesets(self, environment: Environment, out: TextIO, selectors: list[str] | None = None):
+        """
+        :param selectors: qualified selectors of the ruleset, None for a ruleset without
+                          selectors, whose children are written as top-level rulesets
+        """
+        for ruleset in self.child_rulesets:
+            ruleset._emit(environment, out, selectors)
 
     def __init__(self):
         self.selectors: list[Selector] | None = []
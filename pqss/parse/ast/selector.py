@@ -7,6 +7,8 @@ from .ast import (
 
 
 class Selector(Statement):
+    __slots__ = ('token',)
+
     def eval(self, environment: Environment):
         return self.token.literal
 
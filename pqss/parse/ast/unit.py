@@ -7,6 +7,8 @@ from .ast import (
 
 
 class Unit(Expression):
+    __slots__ = ('token',)
+
     def eval(self, environment: Environment):
         return self.token.literal
 
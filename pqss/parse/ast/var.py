@@ -9,9 +9,14 @@ from .identifier import Identifier
 
 
 class VarStatement(Statement):
+    __slots__ = ('token', 'name', 'value')
+
     def eval(self, environment: Environment):
-        environment.set(self.name.token.literal,
-                        self.value.eval(environment))
+        name = self.name
+        if name.slot is None:
+            environment.set(name.token.literal, self.value.eval(environment))
+        else:
+            environment.store(name.depth, name.slot, self.value.eval(environment))
 
     def __init__(self):
         self.token: Token | None = None  # TODO May be not needed
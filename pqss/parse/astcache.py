@@ -0,0 +1,244 @@
+import gc
+import marshal
+import os
+import sys
+import tempfile
+from contextlib import contextmanager
+from functools import cache
+
+import pqss
+from pqss.lex import Token, TokenType
+from pqss.env import Slots
+from pqss.parse.ast import Node, StyleSheet, Import, Mixin, Identifier
+from pqss.parse.colors import RGBA
+
+FORMAT_VERSION = 4
+"""version of the layout written by dump_style_sheet"""
+
+COMPILER_VERSION = f'{pqss.__version__}-{FORMAT_VERSION}'
+"""an AST cached by another compiler version is never loaded"""
+
+_TOKEN = -1
+"""shape of a Token entry in the object table"""
+
+# kinds of field in a shape
+_VALUE = 0
+_REF = 1
+_REFS = 2
+
+_TYPES_BY_CODE = {token_type.value: token_type for token_type in TokenType}
+
+_SKIPPED_FIELDS = {
+    StyleSheet: ('slots',),
+    Import: ('path', 'style_sheet'),
+    Mixin: ('_cache',),
+}
+"""fields set by linking or evaluation, not by parsing"""
+
+
+def _node_classes() -> dict[str, type]:
+    classes = {}
+    pending = [Node]
+    while pending:
+        cls = pending.pop()
+        classes[cls.__name__] = cls
+        pending.extend(cls.__subclasses__())
+    return classes
+
+
+@contextmanager
+def _gc_paused():
+    """
+    nothing built while dumping or loading a table can be garbage, so spare the
+    collector its passes over a heap that only grows
+    """
+    enabled = gc.isenabled()
+    gc.disable()
+    try:
+        yield
+    finally:
+        if enabled:
+            gc.enable()
+
+
+@cache
+def _slots_of(cls: type) -> tuple[str, ...]:
+    """fields of a node class, which are its slots and those of its bases"""
+    return tuple(name for klass in reversed(cls.__mro__) for name in getattr(klass, '__slots__', ()))
+
+
+def dump_style_sheet(style_sheet: StyleSheet) -> bytes:
+    """
+    serialise a parsed StyleSheet into a flat table of nodes and tokens.
+    Import statements are dumped unlinked.
+
+    The table is in post-order, every entry only refers to entries before it. An
+    entry is (shape, *field values) for a node, or (-1, type code, literal, start)
+    for a Token. A shape is (class name, field names, field kinds), telling for
+    each field whether it is a plain value, the index of an entry, a list of
+    indexes, or a list of plain values and 1-tuples of an index.
+    """
+    objects = []
+    shapes = []
+    shape_ids = {}
+    refs = {}
+
+    def ref(obj) -> int:
+        idx = refs.get(id(obj))
+        if idx is not None:
+            return idx
+        if type(obj) is Token:
+            entry = (_TOKEN, obj.token_type.value, encode(obj.literal), obj.start)
+        else:
+            cls = type(obj)
+            skipped = _SKIPPED_FIELDS.get(cls, ())
+            fields = tuple(name for name in _slots_of(cls) if name not in skipped and hasattr(obj, name))
+            kinds = []
+            values = []
+            for name in fields:
+                kind, value = encode_field(getattr(obj, name))
+                kinds.append(kind)
+                values.append(value)
+            key = (cls, fields, tuple(kinds))
+            shape_id = shape_ids.get(key)
+            if shape_id is None:
+                shape_id = shape_ids[key] = len(shapes)
+                shapes.append((cls.__name__, fields, key[2]))
+            entry = (shape_id, *values)
+        idx = refs[id(obj)] = len(objects)
+        objects.append(entry)
+        return idx
+
+    def encode_field(value):
+        if isinstance(value, (Node, Token)):
+            return _REF, ref(value)
+        if isinstance(value, list) and all(isinstance(item, (Node, Token)) for item in value):
+            return _REFS, [ref(item) for item in value]
+        return _VALUE, encode(value)
+
+    def encode(value):
+        if isinstance(value, str):
+            # an interned string is written once, later occurrences are back references
+            return sys.intern(value)
+        if isinstance(value, RGBA):
+            # a packed color, folded by the optimizer, with its text as written
+            return None, int(value), value.text
+        if value is None or isinstance(value, (bool, int, float)):
+            return value
+        if isinstance(value, list):
+            return [encode(item) for item in value]
+        if isinstance(value, (Node, Token)):
+            return ref(value),
+        raise TypeError(f'Can not serialise {type(value).__name__} in a StyleSheet')
+
+    with _gc_paused():
+        root = ref(style_sheet)
+        return marshal.dumps((COMPILER_VERSION, shapes, objects, root))
+
+
+def load_style_sheet(data: bytes) -> StyleSheet:
+    """
+    rebuild a StyleSheet from dump_style_sheet output
+    :raise ValueError: data is not a StyleSheet dumped by this compiler version
+    """
+    with _gc_paused():
+        return _load(data)
+
+
+def _load(data: bytes) -> StyleSheet:
+    try:
+        version, shapes, entries, root = marshal.loads(data)
+    except (EOFError, TypeError, ValueError) as e:
+        raise ValueError('Invalid serialised StyleSheet') from e
+    if version != COMPILER_VERSION:
+        raise ValueError(f'StyleSheet serialised by compiler {version}, not {COMPILER_VERSION}')
+
+    known = _node_classes()
+    classes = []
+    fields = []
+    skipped = []
+    global_slots = []
+    for class_name, names, kinds in shapes:
+        cls = known[class_name]
+        classes.append(cls)
+        fields.append(tuple(zip(names, kinds)))
+        skipped.append(_SKIPPED_FIELDS.get(cls, ()))
+        global_slots.append(cls is Identifier)
+
+    objects = []
+    append = objects.append
+    types = _TYPES_BY_CODE
+    new = object.__new__
+    slots = Slots()
+
+    def decode(value):
+        if type(value) is tuple:
+            return objects[value[0]] if len(value) == 1 else RGBA(*value[1:])
+        if type(value) is list:
+            return [decode(item) for item in value]
+        return value
+
+    for entry in entries:
+        shape = entry[0]
+        if shape == _TOKEN:
+            append(Token(types[entry[1]], entry[2], entry[3]))
+            continue
+        node = new(classes[shape])
+        for (name, kind), value in zip(fields[shape], entry[1:]):
+            if kind == _REF:
+                setattr(node, name, objects[value])
+            elif kind == _REFS:
+                setattr(node, name, [objects[idx] for idx in value])
+            else:
+                setattr(node, name, decode(value))
+        for name in skipped[shape]:
+            setattr(node, name, None)
+        if global_slots[shape] and node.depth == 0:
+            # slots of the global scope are numbered by each compile, the loaded sheet has its own
+            node.slot = slots.slot_of(node.token.literal)
+        append(node)
+    style_sheet = objects[root]
+    style_sheet.slots = slots
+    return style_sheet
+
+
+class ASTCache:
+    """Parsed StyleSheets on disk, keyed by the content hash of their source
+
+    Entries of other compiler versions are ignored, and a damaged entry is
+    treated as missing.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: directory of the cache, created on the first write
+        """
+        self.directory = directory
+
+    def path_of(self, digest: str) -> str:
+        return os.path.join(self.directory, f'{digest}-{COMPILER_VERSION}.ast')
+
+    def get(self, digest: str) -> StyleSheet | None:
+        """
+        :param digest: content hash of the source
+        """
+        try:
+            with open(self.path_of(digest), 'rb') as f:
+                data = f.read()
+        except OSError:
+            return None
+        try:
+            return load_style_sheet(data)
+        except (ValueError, KeyError, IndexError):
+            return None
+
+    def put(self, digest: str, style_sheet: StyleSheet):
+        os.makedirs(self.directory, exist_ok=True)
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'wb') as f:
+                f.write(dump_style_sheet(style_sheet))
+            os.replace(tmp_path, self.path_of(digest))
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
@@ -0,0 +1,248 @@
+import colorsys
+from functools import lru_cache
+
+
+class RGBA:
+    """A color packed into 32 bits, as 0xRRGGBBAA
+
+    A color written in the sheet is written back as it was, e.g. #FF0000 or
+    red. One computed by a builtin is written in its shortest form: #RGB or
+    #RRGGBB when opaque, #AARRGGBB as Qt reads it otherwise. A color is no
+    number: it takes part in no arithmetic.
+    """
+
+    __slots__ = ('value', 'text')
+
+    def __init__(self, value: int, text: str | None = None):
+        """
+        :param text: the color as written in the sheet, None for a computed color
+        """
+        self.value = value
+        self.text = text
+
+    @classmethod
+    def from_channels(cls, red: int, green: int, blue: int, alpha: int = 255) -> 'RGBA':
+        return cls(red << 24 | green << 16 | blue << 8 | alpha)
+
+    @property
+    def channels(self) -> tuple[int, int, int, int]:
+        """red, green, blue and alpha, from 0 to 255"""
+        value = self.value
+        return value >> 24 & 0xFF, value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF
+
+    def __int__(self):
+        return self.value
+
+    def __eq__(self, other):
+        # the same color written differently is written differently
+        return isinstance(other, RGBA) and other.value == self.value and other.text == self.text
+
+    def __hash__(self):
+        return hash((self.value, self.text))
+
+    def __str__(self):
+        return self.text if self.text is not None else _format(self.value)
+
+    def __repr__(self):
+        if self.text is None:
+            return f'RGBA({str(self)!r})'
+        return f'RGBA({_format(self.value)!r}, {self.text!r})'
+
+
+NAMED_COLORS = {
+    'aliceblue': 0xF0F8FF, 'antiquewhite': 0xFAEBD7, 'aqua': 0x00FFFF, 'aquamarine': 0x7FFFD4,
+    'azure': 0xF0FFFF, 'beige': 0xF5F5DC, 'bisque': 0xFFE4C4, 'black': 0x000000,
+    'blanchedalmond': 0xFFEBCD, 'blue': 0x0000FF, 'blueviolet': 0x8A2BE2, 'brown': 0xA52A2A,
+    'burlywood': 0xDEB887, 'cadetblue': 0x5F9EA0, 'chartreuse': 0x7FFF00, 'chocolate': 0xD2691E,
+    'coral': 0xFF7F50, 'cornflowerblue': 0x6495ED, 'cornsilk': 0xFFF8DC, 'crimson': 0xDC143C,
+    'cyan': 0x00FFFF, 'darkblue': 0x00008B, 'darkcyan': 0x008B8B, 'darkgoldenrod': 0xB8860B,
+    'darkgray': 0xA9A9A9, 'darkgreen': 0x006400, 'darkgrey': 0xA9A9A9, 'darkkhaki': 0xBDB76B,
+    'darkmagenta': 0x8B008B, 'darkolivegreen': 0x556B2F, 'darkorange': 0xFF8C00, 'darkorchid': 0x9932CC,
+    'darkred': 0x8B0000, 'darksalmon': 0xE9967A, 'darkseagreen': 0x8FBC8F, 'darkslateblue': 0x483D8B,
+    'darkslategray': 0x2F4F4F, 'darkslategrey': 0x2F4F4F, 'darkturquoise': 0x00CED1, 'darkviolet': 0x9400D3,
+    'deeppink': 0xFF1493, 'deepskyblue': 0x00BFFF, 'dimgray': 0x696969, 'dimgrey': 0x696969,
+    'dodgerblue': 0x1E90FF, 'firebrick': 0xB22222, 'floralwhite': 0xFFFAF0, 'forestgreen': 0x228B22,
+    'fuchsia': 0xFF00FF, 'gainsboro': 0xDCDCDC, 'ghostwhite': 0xF8F8FF, 'gold': 0xFFD700,
+    'goldenrod': 0xDAA520, 'gray': 0x808080, 'grey': 0x808080, 'green': 0x008000,
+    'greenyellow': 0xADFF2F, 'honeydew': 0xF0FFF0, 'hotpink': 0xFF69B4, 'indianred': 0xCD5C5C,
+    'indigo': 0x4B0082, 'ivory': 0xFFFFF0, 'khaki': 0xF0E68C, 'lavender': 0xE6E6FA,
+    'lavenderblush': 0xFFF0F5, 'lawngreen': 0x7CFC00, 'lemonchiffon': 0xFFFACD, 'lightblue': 0xADD8E6,
+    'lightcoral': 0xF08080, 'lightcyan': 0xE0FFFF, 'lightgoldenrodyellow': 0xFAFAD2, 'lightgray': 0xD3D3D3,
+    'lightgreen': 0x90EE90, 'lightgrey': 0xD3D3D3, 'lightpink': 0xFFB6C1, 'lightsalmon': 0xFFA07A,
+    'lightseagreen': 0x20B2AA, 'lightskyblue': 0x87CEFA, 'lightslategray': 0x778899, 'lightslategrey': 0x778899,
+    'lightsteelblue': 0xB0C4DE, 'lightyellow': 0xFFFFE0, 'lime': 0x00FF00, 'limegreen': 0x32CD32,
+    'linen': 0xFAF0E6, 'magenta': 0xFF00FF, 'maroon': 0x800000, 'mediumaquamarine': 0x66CDAA,
+    'mediumblue': 0x0000CD, 'mediumorchid': 0xBA55D3, 'mediumpurple': 0x9370DB, 'mediumseagreen': 0x3CB371,
+    'mediumslateblue': 0x7B68EE, 'mediumspringgreen': 0x00FA9A, 'mediumturquoise': 0x48D1CC,
+    'mediumvioletred': 0xC71585, 'midnightblue': 0x191970, 'mintcream': 0xF5FFFA, 'mistyrose': 0xFFE4E1,
+    'moccasin': 0xFFE4B5, 'navajowhite': 0xFFDEAD, 'navy': 0x000080, 'oldlace': 0xFDF5E6,
+    'olive': 0x808000, 'olivedrab': 0x6B8E23, 'orange': 0xFFA500, 'orangered': 0xFF4500,
+    'orchid': 0xDA70D6, 'palegoldenrod': 0xEEE8AA, 'palegreen': 0x98FB98, 'paleturquoise': 0xAFEEEE,
+    'palevioletred': 0xDB7093, 'papayawhip': 0xFFEFD5, 'peachpuff': 0xFFDAB9, 'peru': 0xCD853F,
+    'pink': 0xFFC0CB, 'plum': 0xDDA0DD, 'powderblue': 0xB0E0E6, 'purple': 0x800080,
+    'red': 0xFF0000, 'rosybrown': 0xBC8F8F, 'royalblue': 0x4169E1, 'saddlebrown': 0x8B4513,
+    'salmon': 0xFA8072, 'sandybrown': 0xF4A460, 'seagreen': 0x2E8B57, 'seashell': 0xFFF5EE,
+    'sienna': 0xA0522D, 'silver': 0xC0C0C0, 'skyblue': 0x87CEEB, 'slateblue': 0x6A5ACD,
+    'slategray': 0x708090, 'slategrey': 0x708090, 'snow': 0xFFFAFA, 'springgreen': 0x00FF7F,
+    'steelblue': 0x4682B4, 'tan': 0xD2B48C, 'teal': 0x008080, 'thistle': 0xD8BFD8,
+    'tomato': 0xFF6347, 'turquoise': 0x40E0D0, 'violet': 0xEE82EE, 'wheat': 0xF5DEB3,
+    'white': 0xFFFFFF, 'whitesmoke': 0xF5F5F5, 'yellow': 0xFFFF00, 'yellowgreen': 0x9ACD32,
+}
+"""RGB of the named colors of Qt, the SVG color keywords, but transparent"""
+
+
+
+@lru_cache(maxsize=4096)
+def _format(value: int) -> str:
+    red, green, blue, alpha = value >> 24 & 0xFF, value >> 16 & 0xFF, value >> 8 & 0xFF, value & 0xFF
+    if alpha != 0xFF:
+        return f'#{alpha:02X}{red:02X}{green:02X}{blue:02X}'
+    if red % 17 == green % 17 == blue % 17 == 0:
+        return f'#{red // 17:X}{green // 17:X}{blue // 17:X}'
+    return f'#{red:02X}{green:02X}{blue:02X}'
+
+
+@lru_cache(maxsize=4096)
+def parse_color(text: str) -> RGBA | None:
+    """
+    the color of #RGB, #RRGGBB, #AARRGGBB or a color name, written as text,
+    None for any other text
+    """
+    if text.startswith('#'):
+        digits = text[1:]
+        try:
+            value = int(digits, 16)
+        except ValueError:
+            return None
+        if len(digits) == 3:
+            red, green, blue = (value >> 8) * 17, (value >> 4 & 0xF) * 17, (value & 0xF) * 17
+            return RGBA(red << 24 | green << 16 | blue << 8 | 0xFF, text)
+        if len(digits) == 6:
+            return RGBA(value << 8 | 0xFF, text)
+        if len(digits) == 8:
+            # Qt puts the alpha first
+            return RGBA((value & 0xFFFFFF) << 8 | value >> 24, text)
+        return None
+    name = text.lower()
+    if name == 'transparent':
+        return RGBA(0, text)
+    rgb = NAMED_COLORS.get(name)
+    return None if rgb is None else RGBA(rgb << 8 | 0xFF, text)
+
+
+def _channel(value) -> int | None:
+    """a channel from 0 to 255 given as a whole number, None for anything else"""
+    if type(value) in (int, float) and value == int(value) and 0 <= value <= 255:
+        return int(value)
+    return None
+
+
+def _color(value) -> RGBA:
+    if isinstance(value, RGBA):
+        return value
+    color = parse_color(value) if isinstance(value, str) else None
+    if color is None:
+        raise TypeError(f'{value!r} is not a color')
+    return color
+
+
+def _amount(value) -> float:
+    """a percentage, from 0 to 100"""
+    if type(value) not in (int, float):
+        raise TypeError(f'{value!r} is not a percentage')
+    return min(max(value, 0), 100) / 100
+
+
+def rgb(*args):
+    """
+    rgb(red, green, blue), folded into a color when the channels are whole
+    numbers from 0 to 255. Other arguments are left to Qt, as rgb(...)
+    """
+    channels = [_channel(arg) for arg in args]
+    if len(args) != 3 or None in channels:
+        return _call('rgb', args)
+    return RGBA.from_channels(*channels)
+
+
+def rgba(*args):
+    """
+    rgba(red, green, blue, alpha), folded into a color when the channels are
+    whole numbers from 0 to 255, as Qt reads them. Other arguments are left to
+    Qt, as rgba(...)
+    """
+    channels = [_channel(arg) for arg in args]
+    if len(args) != 4 or None in channels:
+        return _call('rgba', args)
+    return RGBA.from_channels(*channels)
+
+
+def _call(name: str, args) -> str:
+    return f'{name}({",".join(str(arg) for arg in args)})'
+
+
+def _to_hls(color: RGBA) -> tuple[float, float, float, int]:
+    red, green, blue, alpha = color.channels
+    return (*colorsys.rgb_to_hls(red / 255, green / 255, blue / 255), alpha)
+
+
+def _from_hls(hue: float, lightness: float, saturation: float, alpha: int) -> RGBA:
+    red, green, blue = colorsys.hls_to_rgb(hue, lightness, saturation)
+    return RGBA.from_channels(_round(red), _round(green), _round(blue), alpha)
+
+
+def _round(value: float) -> int:
+    return min(max(int(value * 255 + 0.5), 0), 255)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def lighten(color, amount) -> RGBA:
+    """lighten(color, amount): the color with its HSL lightness raised by amount percent"""
+    hue, lightness, saturation, alpha = _to_hls(_color(color))
+    return _from_hls(hue, min(lightness + _amount(amount), 1.0), saturation, alpha)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def darken(color, amount) -> RGBA:
+    """darken(color, amount): the color with its HSL lightness lowered by amount percent"""
+    hue, lightness, saturation, alpha = _to_hls(_color(color))
+    return _from_hls(hue, max(lightness - _amount(amount), 0.0), saturation, alpha)
+
+
+@lru_cache(maxsize=4096, typed=True)
+def mix(color1, color2, weight=50.0) -> RGBA:
+    """
+    mix(color1, color2, weight): weight percent of color1 mixed with color2,
+    the more opaque color weighing more, as in Sass
+    """
+    red1, green1, blue1, alpha1 = _color(color1).channels
+    red2, green2, blue2, alpha2 = _color(color2).channels
+    part = _amount(weight)
+    scaled = part * 2 - 1
+    opacity = (alpha1 - alpha2) / 255
+    if scaled * opacity == -1:
+        weight1 = (scaled + 1) / 2
+    else:
+        weight1 = ((scaled + opacity) / (1 + scaled * opacity) + 1) / 2
+    weight2 = 1 - weight1
+    return RGBA.from_channels(_round((red1 * weight1 + red2 * weight2) / 255),
+                              _round((green1 * weight1 + green2 * weight2) / 255),
+                              _round((blue1 * weight1 + blue2 * weight2) / 255),
+                              _round((alpha1 * part + alpha2 * (1 - part)) / 255))
+
+
+@lru_cache(maxsize=4096, typed=True)
+def alpha(color, opacity) -> RGBA:
+    """alpha(color, opacity): the color with an opacity of opacity percent"""
+    red, green, blue, _ = _color(color).channels
+    return RGBA.from_channels(red, green, blue, _round(_amount(opacity)))
+
+
+BUILTINS = {
+    'rgb': rgb,
+    'rgba': rgba,
+    'lighten': lighten,
+    'darken': darken,
+    'mix': mix,
+    'alpha': alpha,
+}
+"""implementation of each builtin function of PQSS"""
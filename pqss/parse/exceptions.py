@@ -0,0 +1,21 @@
+from pqss.lex.exceptions import PQSSException
+
+
+class ParseException(PQSSException):
+    pass
+
+
+class MixinNotExistsException(PQSSException):
+    pass
+
+
+class ImportNotFoundException(PQSSException):
+    pass
+
+
+class ImportCycleException(PQSSException):
+    pass
+
+
+class BuiltinArgumentException(PQSSException):
+    pass
@@ -0,0 +1,307 @@
+import hashlib
+import os
+from concurrent.futures import Executor, FIRST_COMPLETED, wait
+
+from pqss.env import Slots
+from pqss.lex import new_lexer, as_source, LineIndex, PQSSException
+from pqss.parse.ast import StyleSheet, Import
+from . import parser as _parser
+from .astcache import ASTCache, dump_style_sheet, load_style_sheet
+from .resolver import bind_slots
+from .exceptions import ImportNotFoundException, ImportCycleException
+
+
+class _CacheEntry:
+    __slots__ = ('mtime', 'digest', 'style_sheet')
+
+    def __init__(self, mtime: int, digest: str, style_sheet: StyleSheet):
+        self.mtime = mtime
+        self.digest = digest
+        self.style_sheet = style_sheet
+
+
+class StyleSheetCache:
+    """Parsed StyleSheets of files, shared by compiles
+
+    An entry is keyed by the real path of its file and stays valid while the
+    file keeps its mtime or, when only the mtime changed, its content hash.
+    A StyleSheet depends on its own file only: its Import statements are
+    linked to the imported StyleSheets again by every compile.
+    """
+
+    def __init__(self):
+        self._entries: dict[str, _CacheEntry] = {}
+
+    def get(self, path: str, mtime: int, data: bytes | None = None) -> StyleSheet | None:
+        """
+        :param path: real path of the file
+        :param mtime: current mtime of the file, in ns
+        :param data: current content of the file, checked against the hash on mtime mismatch
+        """
+        entry = self._entries.get(path)
+        if entry is None:
+            return None
+        if entry.mtime == mtime:
+            return entry.style_sheet
+        if data is not None and entry.digest == digest_of(data):
+            entry.mtime = mtime
+            return entry.style_sheet
+        return None
+
+    def put(self, path: str, mtime: int, digest: str, style_sheet: StyleSheet):
+        self._entries[path] = _CacheEntry(mtime, digest, style_sheet)
+
+    def digest(self, path: str) -> str | None:
+        entry = self._entries.get(path)
+        return entry.digest if entry is not None else None
+
+    def clear(self):
+        self._entries.clear()
+
+    def __len__(self):
+        return len(self._entries)
+
+
+def digest_of(data) -> str:
+    """content hash of a file"""
+    return hashlib.sha1(data).hexdigest()
+
+
+class ImportResolver:
+    """Locate, parse and link the files of @import statements for one compile
+
+    A name is searched relative to the importing file, or the current directory
+    for a source without path, then in each include path, then in the current
+    directory. Every file is parsed at most once per compile, and an import
+    cycle is reported instead of recursing forever.
+
+    Given an executor, e.g. a process pool, the imported files are parsed
+    concurrently before any of them is linked.
+
+    Given an ASTCache, a source whose content was parsed before, by any
+    process, is loaded from it instead of being lexed and parsed.
+
+    The identifiers of every sheet loaded are bound to the Slots of the
+    resolver, those of a cached sheet again when another compile bound them.
+    """
+
+    def __init__(self, include_paths: list[str] | None = None,
+                 cache: StyleSheetCache | None = None,
+                 engine: str = 'scanner',
+                 ast_cache: ASTCache | None = None,
+                 slots: Slots | None = None):
+        """
+        :param include_paths: directories searched after the directory of the importing file
+        :param cache: parsed StyleSheets shared with other compiles
+        :param engine: lexer engine for imported files
+        :param ast_cache: parsed StyleSheets on disk, keyed by content hash
+        :param slots: slots of the global names of the compile, new ones if None
+        """
+        self.include_paths: list[str] = list(include_paths or [])
+        self.cache = cache if cache is not None else StyleSheetCache()
+        self.engine = engine
+        self.ast_cache = ast_cache
+        self.slots = slots if slots is not None else Slots()
+        """slots of the global names of the sheets loaded"""
+        self.graph: dict[str | None, list[str]] = {}
+        """real paths imported by each file, None for a root without path"""
+        self.shadows: set[str] = set()
+        """real paths searched for the linked files before the ones found, a file created at any of
+        them would be imported instead"""
+        self.defer_links = False
+        """parse Import statements without linking them, as workers of a parallel parse do"""
+        self._loaded: dict[str, StyleSheet] = {}
+        self._chain: list[str | None] = []
+
+    def resolve(self, name: str, importer: str | None = None, missed: set[str] | None = None) -> str | None:
+        """
+        :param name: file name of an @import
+        :param importer: path of the importing file
+        :param missed: the real paths searched and not found are added to it
+        :return: real path of the imported file, or None if not found
+        """
+        cwd = os.getcwd()
+        base = os.path.dirname(importer) if importer else cwd
+        for directory in [base, *self.include_paths, cwd]:
+            candidate = os.path.join(directory, name)
+            if os.path.isfile(candidate):
+                return os.path.realpath(candidate)
+            if missed is not None:
+                missed.add(os.path.realpath(candidate))
+        return None
+
+    def parse(self, src_code, path: str | None = None, executor: Executor | None = None) -> StyleSheet:
+        """
+        parse a source, its @import statements are loaded through this resolver
+        :param src_code: PQSS code, str or ASCII bytes-like
+        :param path: path of the source
+        :param executor: parse the imported files concurrently in it
+        """
+        if executor is not None:
+            return self._parse_parallel(src_code, path, executor)
+
+        digest = None
+        if self.ast_cache is not None:
+            digest = digest_of(src_code.encode('utf-8') if isinstance(src_code, str) else src_code)
+            style_sheet = self.ast_cache.get(digest)
+            if style_sheet is not None:
+                bind_slots(style_sheet, self.slots)
+                self._link_all(style_sheet, path, src_code)
+                return style_sheet
+
+        self._chain.append(path)
+        try:
+            style_sheet = _parser.Parser(new_lexer(src_code, self.engine), path, self).parse_program()
+        except PQSSException as e:
+            raise e.locate(LineIndex(src_code), path)
+        finally:
+            self._chain.pop()
+
+        if digest is not None:
+            self.ast_cache.put(digest, style_sheet)
+        return style_sheet
+
+    def iter_parse(self, src_code, path: str | None = None):
+        """
+        parse a source one top-level statement at a time, its @import statements are
+        loaded through this resolver as they are reached
+        :return: iterator of the top-level statements
+        """
+        self._chain.append(path)
+        try:
+            parser = _parser.Parser(new_lexer(src_code, self.engine), path, self)
+            for _, stmt in parser.parse_top_level():
+                if stmt is not None:
+                    yield stmt
+        except PQSSException as e:
+            raise e.locate(LineIndex(src_code), path)
+        finally:
+            self._chain.pop()
+
+    def _parse_parallel(self, src_code, path: str | None, executor: Executor) -> StyleSheet:
+        defer_links, self.defer_links = self.defer_links, True
+        try:
+            style_sheet = self.parse(src_code, path)
+        finally:
+            self.defer_links = defer_links
+
+        self.prefetch(style_sheet, path, executor)
+        self._link_all(style_sheet, path, src_code)
+        return style_sheet
+
+    def _link_all(self, style_sheet: StyleSheet, path: str | None, src_code):
+        self._chain.append(path)
+        try:
+            for import_stmt in style_sheet.imports:
+                self.link(import_stmt, path)
+        except PQSSException as e:
+            raise e.locate(LineIndex(src_code), path)
+        finally:
+            self._chain.pop()
+
+    def prefetch(self, style_sheet: StyleSheet, path: str | None, executor: Executor):
+        """
+        parse the files imported by a StyleSheet, transitively, concurrently into the cache.
+        Names not found are left for link to report.
+        """
+        seen: set[str] = set()
+        pending = {}
+
+        def submit_imports(sheet: StyleSheet, importer: str | None):
+            for import_stmt in sheet.imports:
+                imported = self.resolve(import_stmt.name, importer)
+                if imported is None or imported in seen:
+                    continue
+                seen.add(imported)
+                cached = self.cache.get(imported, os.stat(imported).st_mtime_ns)
+                if cached is not None:
+                    submit_imports(cached, imported)
+                else:
+                    ast_dir = self.ast_cache.directory if self.ast_cache is not None else None
+                    pending[executor.submit(_parse_file, imported, self.engine, ast_dir)] = imported
+
+        submit_imports(style_sheet, path)
+        while pending:
+            done, _ = wait(pending, return_when=FIRST_COMPLETED)
+            for future in done:
+                imported = pending.pop(future)
+                mtime, digest, data = future.result()
+                sheet = load_style_sheet(data)
+                self.cache.put(imported, mtime, digest, sheet)
+                submit_imports(sheet, imported)
+
+    def digests(self) -> dict[str, str] | None:
+        """
+        content hash of every file linked so far, by real path,
+        None if a file was not parsed through the cache
+        """
+        digests = {}
+        for imports in self.graph.values():
+            for path in imports:
+                digest = self.cache.digest(path)
+                if digest is None:
+                    return None
+                digests[path] = digest
+        return digests
+
+    def link(self, import_stmt: Import, importer: str | None = None):
+        """point an Import statement to the StyleSheet of the file it refers to"""
+        if self.defer_links:
+            return
+        path = self.resolve(import_stmt.name, importer, self.shadows)
+        if path is None:
+            raise ImportNotFoundException(f'Import {import_stmt.name} does not exist!!!', import_stmt.offset)
+        if path in self._chain:
+            cycle = self._chain[self._chain.index(path):] + [path]
+            raise ImportCycleException(f'Import cycle {" -> ".join(cycle)}!!!', import_stmt.offset)
+
+        self.graph.setdefault(importer, []).append(path)
+        import_stmt.path = path
+        import_stmt.style_sheet = self.load(path)
+
+    def load(self, path: str) -> StyleSheet:
+        """the StyleSheet of a file, parsed at most once per compile and linked"""
+        style_sheet = self._loaded.get(path)
+        if style_sheet is not None:
+            return style_sheet
+
+        mtime = os.stat(path).st_mtime_ns
+        style_sheet = self.cache.get(path, mtime)
+        if style_sheet is None:
+            with open(path, 'rb') as f:
+                data = f.read()
+            style_sheet = self.cache.get(path, mtime, data)
+            if style_sheet is None:
+                style_sheet = self.parse(as_source(data), path)
+                self.cache.put(path, mtime, digest_of(data), style_sheet)
+                self._loaded[path] = style_sheet
+                return style_sheet
+
+        bind_slots(style_sheet, self.slots)
+        # the imported files of a cached StyleSheet may have changed since
+        self._chain.append(path)
+        try:
+            for import_stmt in style_sheet.imports:
+                self.link(import_stmt, path)
+        except PQSSException as e:
+            if e.line is None:
+                with open(path, 'rb') as f:
+                    e.locate(LineIndex(as_source(f.read())), path)
+            raise
+        finally:
+            self._chain.pop()
+        self._loaded[path] = style_sheet
+        return style_sheet
+
+
+def _parse_file(path: str, engine: str, ast_dir: str | None = None) -> tuple[int, str, bytes]:
+    """
+    parse a file without linking its imports, in a worker of ImportResolver.prefetch
+    :return: mtime and content hash of the file, and its StyleSheet serialised by dump_style_sheet
+    """
+    resolver = ImportResolver(engine=engine, ast_cache=ASTCache(ast_dir) if ast_dir is not None else None)
+    resolver.defer_links = True
+    mtime = os.stat(path).st_mtime_ns
+    with open(path, 'rb') as f:
+        data = f.read()
+    return mtime, digest_of(data), dump_style_sheet(resolver.parse(as_source(data), path))
@@ -0,0 +1,168 @@
+from bisect import bisect_left, bisect_right
+from io import StringIO
+
+from pqss.env import Environment, Slots
+from pqss.lex import Scanner, LineIndex, PQSSException
+from pqss.parse.ast import StyleSheet, Statement, Import
+from .parser import Parser
+from .importer import ImportResolver, StyleSheetCache
+
+
+class _Span:
+    """A top-level statement and where it is in the source"""
+    __slots__ = ('start', 'origin', 'statement', 'imports')
+
+    def __init__(self, start: int, statement: Statement | None, imports: list[Import]):
+        self.start = start
+        """offset of the first token of the statement in the current source"""
+        self.origin = start
+        """offset of the first token when the statement was parsed, which its tokens still carry"""
+        self.statement = statement
+        self.imports = imports
+
+
+class IncrementalParser:
+    """Parser of a PQSS source being edited
+
+    The source ranges of the top-level statements are kept between updates. An
+    edit re-lexes and re-parses from the statement before the changed range
+    until the parse lines up again with an old statement boundary past it; the
+    statements after that are reused, only their offsets are moved. Lexing
+    always uses the Scanner engine.
+    """
+
+    def __init__(self, code_path: str | None = None, include_paths: list[str] | None = None,
+                 cache: StyleSheetCache | None = None):
+        """
+        :param code_path: path of the source, @import names are resolved relative to it
+        :param include_paths: directories to search imported files in
+        :param cache: parsed StyleSheets of imported files shared with other compiles
+        """
+        self.code_path = code_path
+        self.include_paths = include_paths
+        self.cache = cache if cache is not None else StyleSheetCache()
+        self.slots = Slots()
+        """slots of the global names of the statements, kept by the statements reused"""
+        self.src_code = ''
+        self.reparsed = 0
+        """number of top-level statements parsed by the last update"""
+        self._spans: list[_Span] = []
+        self._starts: list[int] = []
+        self._tail = 0
+        """offset of the trailing token the parser leaves unparsed"""
+
+    @property
+    def style_sheet(self) -> StyleSheet:
+        style_sheet = StyleSheet()
+        style_sheet.statements = [span.statement for span in self._spans if span.statement is not None]
+        style_sheet.imports = [import_stmt for span in self._spans for import_stmt in span.imports]
+        style_sheet.slots = self.slots
+        return style_sheet
+
+    def parse(self, src_code: str) -> StyleSheet:
+        """
+        parse a new version of the source, reusing what did not change since the last one
+        """
+        old = self.src_code
+        limit = min(len(old), len(src_code))
+        prefix = _common_length(limit, lambda n: old[:n] == src_code[:n])
+        suffix = _common_length(limit - prefix, lambda n: old[len(old) - n:] == src_code[len(src_code) - n:])
+        return self.edit(prefix, len(old) - suffix, src_code[prefix:len(src_code) - suffix])
+
+    def edit(self, start: int, end: int, text: str) -> StyleSheet:
+        """
+        replace src_code[start:end] with text and parse again what it touched
+        """
+        src_code = self.src_code[:start] + text + self.src_code[end:]
+        delta = len(text) - (end - start)
+        edit_end = start + len(text)
+
+        # the statement before the changed one is parsed again too: its last
+        # tokens may have been lexed looking ahead into the changed range
+        first = max(0, bisect_right(self._starts, start) - 2)
+        parse_from = self._starts[first] if first > 0 else 0
+
+        resolver = ImportResolver(self.include_paths, self.cache, slots=self.slots)
+        parser = Parser(Scanner(src_code, parse_from), self.code_path, resolver)
+        parser.sqss = StyleSheet()
+
+        spans = self._spans[:first]
+        reused: list[_Span] = []
+        resolver._chain.append(self.code_path)
+        try:
+            for span in spans:
+                _link(resolver, span, self.code_path, 0)
+
+            for offset, stmt in parser.parse_top_level():
+                spans.append(_Span(offset, stmt, parser.sqss.imports))
+                parser.sqss.imports = []
+
+                following = parser.cur_token.start
+                idx = bisect_left(self._starts, following - delta)
+                if (following >= edit_end and idx < len(self._starts)
+                        and self._starts[idx] == following - delta and self._starts[idx] >= end):
+                    reused = self._spans[idx:]
+                    tail = self._tail + delta
+                    break
+            else:
+                tail = parser.cur_token.start
+
+            for span in reused:
+                _link(resolver, span, self.code_path, delta)
+        except PQSSException as e:
+            raise e.locate(LineIndex(src_code), self.code_path)
+        finally:
+            resolver._chain.pop()
+
+        for span in reused:
+            span.start += delta
+        self.reparsed = len(spans) - first
+        self.src_code = src_code
+        self._spans = spans + reused
+        self._starts = [span.start for span in self._spans]
+        self._tail = tail
+        return self.style_sheet
+
+    def eval(self, environment: Environment | None = None) -> str:
+        """compile the parsed source to QSS"""
+        if environment is None:
+            environment = Environment(slots=self.slots)
+        else:
+            environment.root.bind(self.slots)
+        out = StringIO()
+        for span in self._spans:
+            if span.statement is None:
+                continue
+            try:
+                span.statement.emit(environment, out)
+            except PQSSException as e:
+                raise _moved(e, span).locate(LineIndex(self.src_code), self.code_path)
+        return out.getvalue()
+
+
+def _link(resolver: ImportResolver, span: _Span, code_path: str | None, delta: int):
+    """link the Import statements of a span again, which is about to move by delta"""
+    for import_stmt in span.imports:
+        try:
+            resolver.link(import_stmt, code_path)
+        except PQSSException as e:
+            raise _moved(e, span, delta)
+
+
+def _moved(e: PQSSException, span: _Span, delta: int = 0) -> PQSSException:
+    """move the offset of an error raised by a statement to where the statement is (about to be) now"""
+    if e.line is None and e.offset is not None:
+        e.offset += span.start + delta - span.origin
+    return e
+
+
+def _common_length(limit: int, is_common) -> int:
+    """the largest n <= limit for which is_common(n) holds, is_common being monotonic"""
+    low, high = 0, limit
+    while low < high:
+        mid = (low + high + 1) // 2
+        if is_common(mid):
+            low = mid
+        else:
+            high = mid - 1
+    return low
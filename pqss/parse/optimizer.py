@@ -0,0 +1,126 @@
+from typing import Iterable
+
+from pqss.env import Environment
+from pqss.parse.ast import *
+
+_LEAVES = (Constant, IntegerLiteral, Boolean, Color)
+"""expressions whose value never depends on the Environment"""
+
+
+class Optimizer:
+    """Partial evaluation of a parsed StyleSheet, run between parsing and eval
+
+    Constant expressions are folded into Constant nodes, and a variable is
+    replaced by its value where the last assignment before the use, in
+    evaluation order, bound it to a constant. An @import may bind anything, so
+    it forgets every variable; a mixin body and the arguments of an @include
+    are evaluated in another scope, so they only get their constants folded.
+    Expressions that fail to evaluate are left as they are, to fail at eval.
+    """
+
+    def __init__(self, variables: Iterable[str] = ()):
+        """
+        :param variables: names of the variables left open, set at eval, which are never propagated
+        """
+        self.variables = frozenset(variables)
+        self.bindings: dict[str, object] = {}
+        """constant value of each variable at the statement being optimized"""
+        self._seen: set[int] = set()
+
+    def optimize(self, style_sheet: StyleSheet) -> StyleSheet:
+        """optimize a StyleSheet and the sheets it imports, in place"""
+        if id(style_sheet) in self._seen:
+            return style_sheet
+        self._seen.add(id(style_sheet))
+        style_sheet.statements = [self.statement(stmt) for stmt in style_sheet.statements]
+        return style_sheet
+
+    def statement(self, stmt: Statement) -> Statement:
+        """optimize the next top-level statement in evaluation order"""
+        if isinstance(stmt, VarStatement):
+            expr = stmt.value.expr if isinstance(stmt.value, ExpressionStatement) else None
+            name = stmt.name.token.literal
+            if expr is not None:
+                stmt.value.expr = expr = self.expression(expr, True)
+            if isinstance(expr, _LEAVES) and name not in self.variables:
+                self.bindings[name] = expr.eval(_EMPTY)
+            else:
+                self.bindings.pop(name, None)
+        elif isinstance(stmt, ExpressionStatement):
+            stmt.expr = self.expression(stmt.expr, True)
+        elif isinstance(stmt, Ruleset):
+            self.ruleset(stmt, True)
+        elif isinstance(stmt, Mixin):
+            self.bindings.pop(stmt.name, None)
+            if stmt.body is not None:
+                self.ruleset(stmt.body, False)
+        elif isinstance(stmt, Include):
+            self.include(stmt)
+        elif isinstance(stmt, Import):
+            if stmt.style_sheet is not None:
+                Optimizer(self.variables).optimize(stmt.style_sheet)
+            self.bindings.clear()
+        elif not isinstance(stmt, IfStatement):
+            # nothing is known of what other statements assign
+            self.bindings.clear()
+        return stmt
+
+    def ruleset(self, ruleset: Ruleset, propagate: bool):
+        """
+        :param propagate: replace the variables bound to constants
+        """
+        for rule in ruleset.rules:
+            if rule is not None:
+                rule.value = self.expression(rule.value, propagate)
+        for inc in ruleset.includes:
+            if inc is not None:
+                self.include(inc)
+        for child in ruleset.child_rulesets:
+            if child is not None:
+                self.ruleset(child, propagate)
+
+    def include(self, include: Include):
+        if include.args:
+            include.args = [self.expression(arg, False) for arg in include.args]
+
+    def expression(self, expr: Expression | None, propagate: bool) -> Expression | None:
+        """
+        fold an expression
+        :param propagate: replace the variables bound to constants
+        """
+        if isinstance(expr, Identifier):
+            name = expr.token.literal
+            if propagate and name in self.bindings:
+                value = self.bindings[name]
+                # Identifier.eval falls back to its own value when the variable is falsy
+                return Constant(expr.token, value if value else expr.value)
+            return expr
+
+        if isinstance(expr, PrefixExpression):
+            expr.right = self.expression(expr.right, propagate)
+            operands = [expr.right]
+        elif isinstance(expr, InfixExpression):
+            expr.left = self.expression(expr.left, propagate)
+            expr.right = self.expression(expr.right, propagate)
+            operands = [expr.left, expr.right]
+        elif isinstance(expr, Builtin) and expr.args is not None:
+            expr.args = [self.expression(arg, propagate) for arg in expr.args]
+            operands = expr.args
+        else:
+            return expr
+
+        if not all(isinstance(operand, _LEAVES) for operand in operands):
+            return expr
+        try:
+            return Constant(expr.token, expr.eval(_EMPTY))
+        except Exception:
+            return expr
+
+
+_EMPTY = Environment()
+"""Environment of constant expressions, which look nothing up"""
+
+
+def optimize(style_sheet: StyleSheet) -> StyleSheet:
+    """fold the constant expressions and variables of a StyleSheet, in place"""
+    return Optimizer().optimize(style_sheet)
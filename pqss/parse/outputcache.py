@@ -0,0 +1,95 @@
+import hashlib
+import json
+import os
+import tempfile
+from typing import Iterable, Mapping
+
+from .astcache import COMPILER_VERSION
+from .importer import digest_of
+
+
+class OutputCache:
+    """Compiled QSS on disk, keyed by the content of everything it compiles from
+
+    A compile is looked up by the key of its entry: the content and directory
+    of the source, the variables overriding its assignments, the include paths
+    and the compiler version. The key names the files the last compile of the
+    entry imported, transitively, and the QSS is keyed by the key along with
+    the content hash of each of these files, so a hit only needs them hashed,
+    never lexed, parsed nor evaluated. Reverting an imported file hits the QSS
+    compiled from it before. The key also names the paths searched for these
+    files before the ones found: once a file exists at any of them, it would
+    be imported instead, and the entry misses.
+
+    A damaged entry is treated as missing.
+    """
+
+    def __init__(self, directory: str):
+        """
+        :param directory: directory of the cache, created on the first write
+        """
+        self.directory = directory
+
+    @staticmethod
+    def key(src_code, path: str | None = None, include_paths: list[str] | None = None,
+            variables: Mapping[str, object] | None = None) -> str:
+        """
+        the key of a compile
+        :param src_code: PQSS code of the entry, str or bytes-like
+        :param path: path of the entry, imported names are resolved relative to its directory
+        :param variables: values overriding the assignments of variables, by name
+        """
+        base = os.path.dirname(os.path.realpath(path)) if path is not None else os.getcwd()
+        context = [COMPILER_VERSION, base, os.getcwd(), *(os.path.realpath(p) for p in include_paths or [])]
+        if variables:
+            # True == 1.0, but they are written differently
+            context += [f'{name}={type(value).__name__}:{value!r}' for name, value in sorted(variables.items())]
+        digest = hashlib.sha1(digest_of(src_code.encode('utf-8') if isinstance(src_code, str) else src_code)
+                              .encode())
+        digest.update('\0'.join(context).encode('utf-8'))
+        return digest.hexdigest()
+
+    def get(self, key: str) -> str | None:
+        """the QSS of a compile, None unless every file it imported still has the same content"""
+        try:
+            with open(self._path(key, '.deps'), 'r', encoding='utf-8') as f:
+                dependencies = json.load(f)
+            if any(os.path.isfile(path) for path in dependencies['shadows']):
+                return None
+            digests = {}
+            for path in dependencies['files']:
+                with open(path, 'rb') as f:
+                    digests[path] = digest_of(f.read())
+            with open(self._path(self._qss_key(key, digests), '.qss'), 'r', encoding='utf-8', newline='') as f:
+                return f.read()
+        except (OSError, ValueError, TypeError, KeyError):
+            return None
+
+    def put(self, key: str, digests: Mapping[str, str], qss: str, shadows: Iterable[str] = ()):
+        """
+        :param digests: content hash of every file the compile imported, transitively, by real path
+        :param shadows: paths searched for these files before the ones found, see ImportResolver.shadows
+        """
+        os.makedirs(self.directory, exist_ok=True)
+        self._write(self._path(self._qss_key(key, digests), '.qss'), qss)
+        self._write(self._path(key, '.deps'), json.dumps({'files': sorted(digests), 'shadows': sorted(shadows)}))
+
+    @staticmethod
+    def _qss_key(key: str, digests: Mapping[str, str]) -> str:
+        digest = hashlib.sha1(key.encode())
+        for path in sorted(digests):
+            digest.update(f'\0{path}\0{digests[path]}'.encode('utf-8'))
+        return digest.hexdigest()
+
+    def _path(self, key: str, suffix: str) -> str:
+        return os.path.join(self.directory, key + suffix)
+
+    def _write(self, path: str, text: str):
+        fd, tmp_path = tempfile.mkstemp(dir=self.directory, suffix='.tmp')
+        try:
+            with os.fdopen(fd, 'w', encoding='utf-8', newline='') as f:
+                f.write(text)
+            os.replace(tmp_path, path)
+        except BaseException:
+            os.unlink(tmp_path)
+            raise
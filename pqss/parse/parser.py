@@ -1,7 +1,11 @@
 from .. import util
+from . import importer
 
 from pqss.lex import *
 from pqss.parse.ast import *
+from pqss.env import Slots
+from .resolver import resolve
+from .exceptions import ParseException
 
 
 
@@ -29,11 +33,22 @@ precedences = {
 
 
 class Parser:
-    def __init__(self, lex: Lexer):
-        self.code_path: str | None = None
+    def __init__(self, lex: Lexer | TokenStream, code_path: str | None = None, resolver=None):
+        """
+        :param lex: lexer or TokenStream of the code
+        :param code_path: path of the code, @import names are resolved relative to it
+        :param resolver: ImportResolver loading the imported files, a new one if None
+        """
+        self.code_path: str | None = code_path
+        self.resolver = resolver
+        self.slots: Slots = resolver.slots if resolver is not None else Slots()
+        """slots of the global names, shared with the imported files"""
+
+        if isinstance(lex, TokenStream):
+            lex = lex.cursor()
 
         self.sqss: StyleSheet | None = None
-        self.lexer: Lexer = lex
+        self.lexer: Lexer | TokenCursor = lex
         self.cur_token: Token | None = None
         self.peek_token: Token | None = None
 
@@ -70,12 +85,27 @@ class Parser:
         self.sqss = StyleSheet()
         self.sqss.statements = []
 
+        for _, stmt in self.parse_top_level():
+            if stmt is not None:
+                self.sqss.statements.append(stmt)
+        return self.sqss
+
+    def parse_top_level(self):
+        """
+        parse the top-level statements one at a time, into self.sqss
+        :return: iterator of (start, statement), where start is the offset of the
+            first token of the statement, and statement may be None
+        """
+        if self.sqss is None:
+            self.sqss = StyleSheet()
+        self.sqss.slots = self.slots
         while self.peek_token.token_type is not TokenType.EOF:
+            start = self.cur_token.start
             stmt = self.parse_stmt()
             if stmt is not None:
-                self.sqss.statements.append(stmt)
+                resolve(stmt, self.slots)
             self.next_token()
-        return self.sqss
+            yield start, stmt
 
     def parse_stmt(self):
         if self.cur_token.token_type == TokenType.IDENTIFIER or self.cur_token.token_type == TokenType.PROPERTY and self.peek_token.token_type == TokenType.ASSIGN:
@@ -130,7 +160,8 @@ class Parser:
 
         prefix = self.prefix_parse_fns.get(self.cur_token.token_type)
         if not prefix:
-            raise "prefix parse handler does not exists"
+            raise ParseException(f'Token {self.cur_token.literal} can not begin an expression!!!',
+                                 self.cur_token.start)
         left_expr = prefix()
 
         while self.peek_token != TokenType.SEMICOLON and precedence < self.peek_precedence():
@@ -198,12 +229,16 @@ class Parser:
         return expr
 
     def parse_import(self):
+        import_stmt = Import(self.cur_token)
         self.next_token()
-        with open(self.cur_token.literal) as f:
-            lex = Lexer(f.read())
-            p = Parser(lex)
-            program = p.parse_program()
-            self.sqss.statements.extend(program.statements)
+        import_stmt.name = self.cur_token.literal
+        import_stmt.offset = self.cur_token.start
+
+        self.sqss.imports.append(import_stmt)
+        if self.resolver is None:
+            self.resolver = importer.ImportResolver(slots=self.slots)
+        self.resolver.link(import_stmt, self.code_path)
+        return import_stmt
 
     def parse_mixin(self):
         mixin_stmt = Mixin(self.cur_token)
@@ -0,0 +1,229 @@
+from io import StringIO
+from typing import Callable, Iterable, Iterator, Mapping
+
+from pqss.env import Environment, Slots
+from pqss.lex import LineIndex, PQSSException
+from .ast import *
+from .astcache import _slots_of
+from .colors import parse_color
+from .optimizer import Optimizer
+
+# kinds of step of a render function
+_TEXT = 0
+"""write QSS rendered in advance"""
+_SET = 1
+"""set a variable or mixin to a value known in advance"""
+_ASSIGN = 2
+"""evaluate the assignment of a variable, unless the variable is given"""
+_EMIT = 3
+"""evaluate a statement reading a variable that may be given"""
+
+_DEFAULT = object()
+"""value of a variable that is not given"""
+
+
+def build_render(style_sheet: StyleSheet, variables: Iterable[str] | None = None,
+                 path: str | None = None) -> Callable[..., str]:
+    """
+    compile a linked StyleSheet into a function rendering its QSS, called with
+    keyword arguments overriding the variables of the sheet: render(accent=...)
+    sets $accent and skips every assignment of $accent in the sheet.
+
+    The QSS of the statements reading none of the variables that may be given
+    is rendered once, here, and the function only evaluates the others. The
+    StyleSheet is optimized in place, leaving these variables open.
+    :param variables: names of the variables the function takes, without $.
+                      All the variables the sheet assigns by default
+    :param path: path of the file of the StyleSheet, to locate errors in
+    :return: render(**variables) -> str
+    """
+    names, steps = _build_steps(style_sheet, variables, path)
+
+    def render(**variables) -> str:
+        return _render(names, steps, style_sheet.slots, variables)
+
+    return render
+
+
+def render_variants(style_sheet: StyleSheet, variants: Iterable[Mapping[str, object]],
+                    path: str | None = None) -> list[str]:
+    """
+    QSS of a linked StyleSheet for each set of variables, as
+    build_render(style_sheet)(**variables) renders it.
+
+    The statements reading none of the variables of any set are rendered once
+    for all of them. A statement reading some is evaluated again only for the
+    sets giving these variables values no earlier set gave them.
+    :param variants: sets of variables, by name without $
+    :param path: path of the file of the StyleSheet, to locate errors in
+    """
+    variants = list(variants)
+    names, steps = _build_steps(style_sheet, {key for variant in variants for key in variant}, path)
+    shared = {}
+    return [_render(names, steps, style_sheet.slots, variant, shared) for variant in variants]
+
+
+def _build_steps(style_sheet: StyleSheet, variables: Iterable[str] | None,
+                 path: str | None) -> tuple[dict[str, str], list[tuple]]:
+    """
+    :return: name of the variable of each argument, and the steps rendering the sheet
+    """
+    statements = list(_flatten(style_sheet, path))
+    assigned = {}
+    for stmt, _ in statements:
+        if isinstance(stmt, VarStatement):
+            name = stmt.name.token.literal
+            assigned.setdefault(name.removeprefix('$'), name)
+    if variables is None:
+        names = assigned
+    else:
+        keys = (key.removeprefix('$') for key in variables)
+        names = {key: assigned.get(key, '$' + key) for key in keys}
+    Optimizer(names.values()).optimize(style_sheet)
+
+    environment = Environment(slots=style_sheet.slots)
+    given = set(names.values())
+    depends = {name: (name,) for name in given}
+    """given variables the value of each variable depends on, for those depending on any"""
+    steps = []
+    static = StringIO()
+
+    def flush():
+        if static.tell():
+            steps.append((_TEXT, static.getvalue()))
+            static.seek(0)
+            static.truncate()
+
+    def depends_of(node) -> tuple[str, ...]:
+        read = set()
+        _read_variables(node, depends, environment, read)
+        return tuple(sorted({var for name in read for var in depends[name]}))
+
+    for stmt, stmt_path in statements:
+        try:
+            if isinstance(stmt, VarStatement):
+                name = stmt.name.token.literal
+                stmt.eval(environment)
+                stmt_depends = depends_of(stmt.value)
+                if name in given and name not in stmt_depends:
+                    # the assignment is skipped only when the variable is given
+                    stmt_depends = tuple(sorted((name, *stmt_depends)))
+                if stmt_depends:
+                    depends[name] = stmt_depends
+                    steps.append((_ASSIGN, stmt, name, stmt_path))
+                else:
+                    depends.pop(name, None)
+                    steps.append((_SET, name, environment.get(name)))
+            elif isinstance(stmt, Mixin):
+                stmt.eval(environment)
+                depends.pop(stmt.name, None)
+                steps.append((_SET, stmt.name, stmt))
+            elif stmt_depends := depends_of(stmt):
+                flush()
+                steps.append((_EMIT, stmt, stmt_path, stmt_depends))
+            else:
+                stmt.emit(environment, static)
+        except PQSSException as e:
+            raise _locate(e, stmt_path)
+    flush()
+    return names, steps
+
+
+def _render(names: dict[str, str], steps: list[tuple], slots: Slots | None, variables: Mapping[str, object],
+            shared: dict | None = None) -> str:
+    """
+    :param slots: slots of the global names of the StyleSheet
+    :param shared: QSS of the statements reading given variables, by the values of
+                   these variables, kept between renderings
+    """
+    environment = Environment(slots=slots)
+    overridden = {}
+    for key, value in variables.items():
+        name = names.get(key)
+        if name is None:
+            raise TypeError(f"render() got an unexpected keyword argument '{key}'")
+        if type(value) is int:
+            # numbers of a sheet are floats
+            value = float(value)
+        elif type(value) is str:
+            # colors of a sheet are packed
+            value = parse_color(value) or value
+        environment.set(name, value)
+        overridden[name] = value
+    out = StringIO()
+    step = None
+    try:
+        for step in steps:
+            kind = step[0]
+            if kind == _TEXT:
+                out.write(step[1])
+            elif kind == _SET:
+                environment.set(step[1], step[2])
+            elif kind == _EMIT:
+                if shared is None:
+                    step[1].emit(environment, out)
+                    continue
+                values = (overridden.get(name, _DEFAULT) for name in step[3])
+                # True == 1.0, but they are written differently
+                key = (id(step), *((value, type(value)) for value in values))
+                try:
+                    qss = shared.get(key)
+                except TypeError:
+                    # a statement reading an unhashable value is never shared
+                    key = qss = None
+                if qss is None:
+                    qss = emit_to_str(step[1], environment)
+                    if key is not None:
+                        shared[key] = qss
+                out.write(qss)
+            elif step[2] not in overridden:
+                step[1].eval(environment)
+    except PQSSException as e:
+        raise _locate(e, step[3] if step[0] == _ASSIGN else step[2])
+    return out.getvalue()
+
+
+def _flatten(style_sheet: StyleSheet, path: str | None) -> Iterator[tuple[Statement, str | None]]:
+    """statements of a StyleSheet and the file of each, imported statements in place of their Import"""
+    for stmt in style_sheet.statements:
+        if isinstance(stmt, Import) and stmt.style_sheet is not None:
+            yield from _flatten(stmt.style_sheet, stmt.path)
+        else:
+            yield stmt, path
+
+
+def _read_variables(node, names, environment: Environment, read: set[str], _mixins: set[int] | None = None):
+    """
+    add to read the variables among names that evaluating a node may read,
+    through the mixins it includes too
+    """
+    if isinstance(node, list):
+        for item in node:
+            _read_variables(item, names, environment, read, _mixins)
+        return
+    if not isinstance(node, Node):
+        return
+    if isinstance(node, Identifier):
+        if node.token.literal in names:
+            read.add(node.token.literal)
+        return
+    if isinstance(node, Include):
+        if node.mixin_name in names:
+            read.add(node.mixin_name)
+        mixin = environment.get(node.mixin_name)
+        if _mixins is None:
+            _mixins = set()
+        # a missing mixin is reported when the statement is evaluated in advance
+        if isinstance(mixin, Mixin) and id(mixin) not in _mixins:
+            _mixins.add(id(mixin))
+            _read_variables(mixin.body, names, environment, read, _mixins)
+    for name in _slots_of(type(node)):
+        if hasattr(node, name):
+            _read_variables(getattr(node, name), names, environment, read, _mixins)
+
+
+def _locate(e: PQSSException, path: str | None) -> PQSSException:
+    if e.line is None and path is not None:
+        with open(path, 'rb') as f:
+            e.locate(LineIndex(f.read()), path)
+    return e
@@ -0,0 +1,51 @@
+from pqss.env import Slots
+from pqss.parse.ast import Node, StyleSheet, Identifier, Mixin, VarStatement, Import
+
+
+def resolve(node, slots: Slots, params: list[str] | None = None):
+    """
+    bind each Identifier under a parsed node to the slot of its variable, as
+    (depth, slot): depth 1 for a parameter of the mixin the node is in, read
+    from the scope of the expansion, depth 0 for a variable of the global scope,
+    numbered by slots.
+
+    Scoping is lexical, a mixin body reads its parameters and the global
+    variables, whatever the scope of the @include.
+    :param slots: slots of the global names of the compile
+    :param params: names of the parameters of the mixin the node is in
+    """
+    if isinstance(node, list):
+        for item in node:
+            resolve(item, slots, params)
+        return
+    if not isinstance(node, Node):
+        return
+    if isinstance(node, Identifier):
+        name = node.token.literal
+        if params is not None and name in params:
+            node.depth, node.slot = 1, params.index(name)
+        else:
+            node.depth, node.slot = 0, slots.slot_of(name)
+        return
+    if isinstance(node, Mixin):
+        resolve(node.body, slots, [param.token.literal for param in node.params or ()])
+        return
+    if isinstance(node, Import):
+        # the imported sheet is bound when it is loaded
+        return
+    if isinstance(node, VarStatement):
+        # a variable is assigned in the global scope
+        resolve(node.name, slots)
+        resolve(node.value, slots, params)
+        return
+    for cls in type(node).__mro__:
+        for name in getattr(cls, '__slots__', ()):
+            if hasattr(node, name):
+                resolve(getattr(node, name), slots, params)
+
+
+def bind_slots(style_sheet: StyleSheet, slots: Slots):
+    """bind the identifiers of a StyleSheet to the slots of another compile, unless they are already"""
+    if style_sheet.slots is not slots:
+        resolve(style_sheet.statements, slots)
+        style_sheet.slots = slots
@@ -0,0 +1,53 @@
+import marshal
+
+import pytest
+
+from pqss.env import Environment
+from pqss.lex import new_lexer
+from pqss.main import compile_file, _style_sheet_cache
+from pqss.parse import Parser, ASTCache, dump_style_sheet, load_style_sheet
+
+SOURCE = '''$w : 5;
+@mixin m($a) { width: $a; }
+QLabel { width: $w; &:hover { height: 3px; } }
+QFrame { @include m(7) }
+QPushButton > QWidget { height: 2; color: #FF0000; }
+'''
+
+
+def test_round_trip():
+    style_sheet = Parser(new_lexer(SOURCE)).parse_program()
+    loaded = load_style_sheet(dump_style_sheet(style_sheet))
+    assert loaded.eval(Environment()) == style_sheet.eval(Environment())
+    assert [type(stmt) for stmt in loaded.statements] == [type(stmt) for stmt in style_sheet.statements]
+    assert loaded.statements[2].selectors[0].token.start == SOURCE.index('QLabel')
+
+
+def test_other_version_or_damaged_entry(tmp_path):
+    cache = ASTCache(str(tmp_path))
+    cache.put('0' * 40, Parser(new_lexer(SOURCE)).parse_program())
+    assert cache.get('0' * 40) is not None
+
+    with open(cache.path_of('0' * 40), 'wb') as f:
+        f.write(marshal.dumps(('0.0.0-0', [], [], 0)))
+    assert cache.get('0' * 40) is None
+    with pytest.raises(ValueError):
+        load_style_sheet(b'not a style sheet')
+
+
+def test_compile_skips_parsing(tmp_path, monkeypatch):
+    (tmp_path / 'vars.pqss').write_text('$w : 5;')
+    main = tmp_path / 'main.pqss'
+    main.write_text('@import "vars.pqss"\nQLabel { width: $w; }')
+    cache_dir = str(tmp_path / 'cache')
+
+    _style_sheet_cache.clear()
+    qss = compile_file(str(main), cache_dir=cache_dir)
+    assert len(list((tmp_path / 'cache').iterdir())) == 2
+
+    def parse_program(self):
+        raise AssertionError('parsed a cached source')
+
+    _style_sheet_cache.clear()
+    monkeypatch.setattr(Parser, 'parse_program', parse_program)
+    assert compile_file(str(main), cache_dir=cache_dir) == qss
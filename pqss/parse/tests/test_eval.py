@@ -1,5 +1,9 @@
+import pytest
+
 from pqss.lex import Lexer
 from pqss.parse.ast import *
+from pqss.parse.colors import RGBA, parse_color
+from pqss.parse.exceptions import BuiltinArgumentException
 from pqss.parse.parser import Parser
 
 
@@ -46,9 +50,9 @@ def eval_env_test(src_code: str, pairs):
 def test_var():
     eval_env_test("$a: 5;", [('$a', 5)])
     eval_env_test("$a: 5; $b: $a;", [('$b', 5)])
-    eval_env_test("$color: red;", [('$color', 'red')])
-    eval_env_test("$color: #FF0000;", [('$color', '#FF0000')])
-    eval_env_test("$color: rgba(255, 255, 255, 1);", [('$color', 'rgba(255.0,255.0,255.0,1.0);')])
+    eval_env_test("$color: red;", [('$color', parse_color('red'))])
+    eval_env_test("$color: #FF0000;", [('$color', RGBA(0xFF0000FF, '#FF0000'))])
+    eval_env_test("$color: rgba(255, 255, 255, 1);", [('$color', RGBA(0xFFFFFF01))])
 
 
 def test_selector():
@@ -77,6 +81,112 @@ def test_include_parsing2():
                   'QPushButton{width:5.0;}')
 
 
+def test_mixin_child_rulesets():
+    # the child rulesets of a mixin follow the block of the including ruleset, nested in its selectors
+    eval_lex_test("""@mixin m($a) {width:$a; QLabel {height:$a;} &:hover {color:red;}}
+QWidget, QFrame { @include m(5) QDial { width: 1; } }
+QMenu { @include m(5) }
+""", 'QWidget, QFrame{width:5.0;}QWidget QLabel, QFrame QLabel{height:5.0;}'
+     'QWidget:hover, QFrame:hover{color:red;}QWidget QDial, QFrame QDial{width:1.0;}'
+     'QMenu{width:5.0;}QMenu QLabel{height:5.0;}QMenu:hover{color:red;}')
+
+
 def test_import():
     eval_lex_test('@import "D:\DEV\code\pqss\pqss\parse\\tests\code.pqss"',
                   'QPushButton{height:6.0;width:5.0;}')
+
+
+def test_mixin_cache():
+    src_code = """@mixin m($a) {width:$a; height:$b;}
+$b: 1;
+QLabel { @include m(5) }
+QFrame { @include m(5) }
+QDial { @include m(6) }
+$b: 2;
+QWidget { @include m(5) }
+ """
+
+    def cache_test(qss, environment):
+        assert qss == ('QLabel{width:5.0;height:1.0;}QFrame{width:5.0;height:1.0;}'
+                       'QDial{width:6.0;height:1.0;}QWidget{width:5.0;height:2.0;}')
+        cache = environment.get('m').cache
+        assert cache.reads == ('$b',)
+        assert (cache.hits, cache.misses, len(cache)) == (1, 3, 3)
+
+    eval_test(src_code, cache_test)
+
+
+def test_resolved_slots():
+    src_code = """$a: 1;
+@mixin m($a, $b) {width:$b; height:$a + $c;}
+$c: 2;
+QLabel { width: $a; @include m($a + 4, $c) }
+ """
+    program = Parser(Lexer(src_code)).parse_program()
+    var_a, mixin, _, label = program.statements
+    body = mixin.body.rules
+    # parameters are slots of the expansion, other variables of the global scope
+    assert (body[0].value.depth, body[0].value.slot) == (1, 1)
+    assert (body[1].value.left.depth, body[1].value.left.slot) == (1, 0)
+    slots = program.slots
+    assert (body[1].value.right.depth, body[1].value.right.slot) == (0, slots.get('$c'))
+    assert (label.rules[0].value.depth, label.rules[0].value.slot) == (0, slots.get('$a'))
+    assert var_a.name.slot == slots.get('$a')
+
+    environment = Environment()
+    assert program.eval(environment) == 'QLabel{width:1.0;width:2.0;height:7.0;}'
+    assert environment.get('$c') == 2.0
+    assert environment.load(0, slots.get('$a')) == 1.0
+
+
+def test_nested_selectors():
+    eval_lex_test('QLabel, QFrame { width: 1; &:hover { height: 2; QDial { width: 3; } } QTabBar { width: 4; } }',
+                  'QLabel, QFrame{width:1.0;}QLabel:hover, QFrame:hover{height:2.0;}'
+                  'QLabel:hover QDial, QFrame:hover QDial{width:3.0;}QLabel QTabBar, QFrame QTabBar{width:4.0;}')
+
+    def nested_test(qss, environment):
+        # a & in a selector is not a reference to the parent
+        assert qss == 'QLabel{width:1.0;}QLabel QDial[x="a&b"]{width:2.0;}QLabel > QFrame:hover{}QDial{}'
+
+    eval_test('QLabel { width: 1; QDial[x="a&b"] { width: 2; } & > QFrame:hover { } }\nQDial { }', nested_test)
+
+
+def test_colors():
+    # a color is written as it was, a computed one in its shortest form, never as a name
+    assert str(parse_color('#FF0000')) == '#FF0000' and str(parse_color('Blue')) == 'Blue'
+    assert str(RGBA(0xFFFFFFFF)) == '#FFF' and str(RGBA(0xFF0000FF)) == '#F00'
+    assert str(RGBA(0x3366CCFF)) == '#36C' and str(RGBA(0x123456FF)) == '#123456'
+    assert int(parse_color('#3366cc')) == int(parse_color('#36C')) == 0x3366CCFF
+    # Qt puts the alpha first
+    assert int(parse_color('#80FF0000')) == int(RGBA.from_channels(255, 0, 0, 128))
+    assert str(parse_color('transparent')) == 'transparent' and str(RGBA(0)) == '#00000000'
+    assert parse_color('#12345') is None and parse_color('QLabel') is None
+
+    def color_test(qss, environment):
+        assert qss == ('QLabel{color:#F00;background:#80000000;border-color:rgb(300.0,0.0,0.0);}'
+                       'QFrame{color:#85A3E0;background:#2952A3;selection-color:#800080;'
+                       'selection-background-color:#803366CC;}QDial{}')
+
+    eval_test("""$base: #3366CC;
+QLabel { color: rgb(255, 0, 0); background: rgba(0, 0, 0, 128); border-color: rgb(300, 0, 0); }
+QFrame { color: lighten($base, 20); background: darken($base, 10); selection-color: mix(red, blue);
+         selection-background-color: alpha($base, 50); }
+QDial { }""", color_test)
+
+    eval_lex_test('QLabel { color: mix(#FF0000, blue); background: lighten(#336699, 10); }',
+                  'QLabel{color:#800080;background:#407FBF;}')
+
+    # literals are kept as written
+    eval_lex_test('$c: blue;\nQLabel { color: $c; background: #FF0000; border-color: #f00; }',
+                  'QLabel{color:blue;background:#FF0000;border-color:#f00;}')
+
+    # a color is no number
+    with pytest.raises(TypeError):
+        eval_test('$c: #FF0000;\nQLabel { width: 1 - $c; }\nQDial { }', lambda qss, e: None)
+
+    try:
+        eval_test('QLabel { color: lighten(5, 10); }\nQDial { }', lambda qss, e: None)
+    except BuiltinArgumentException as e:
+        assert e.offset == 16
+    else:
+        assert False
@@ -0,0 +1,122 @@
+import os
+from concurrent.futures import ProcessPoolExecutor
+
+import pytest
+
+from pqss.env import Environment
+from pqss.parse import ImportResolver, StyleSheetCache, ImportCycleException, ImportNotFoundException
+
+
+def write(path, text):
+    path.parent.mkdir(parents=True, exist_ok=True)
+    path.write_text(text)
+    return str(path)
+
+
+def compile_test(resolver, path):
+    with open(path) as f:
+        style_sheet = resolver.parse(f.read(), os.path.realpath(path))
+    return style_sheet.eval(Environment())
+
+
+def test_import_relative_and_include_paths(tmp_path):
+    write(tmp_path / 'lib' / 'vars.pqss', '$w : 5;')
+    write(tmp_path / 'theme' / 'button.pqss', '@import "vars.pqss"\nQPushButton { width: $w; }')
+    main = write(tmp_path / 'theme' / 'main.pqss', '@import "button.pqss"')
+
+    resolver = ImportResolver([str(tmp_path / 'lib')])
+    assert compile_test(resolver, main) == 'QPushButton{width:5.0;}'
+
+
+def test_parse_once(tmp_path):
+    write(tmp_path / 'vars.pqss', '$w : 5;')
+    write(tmp_path / 'a.pqss', '@import "vars.pqss"\nQLabel { width: $w; }')
+    write(tmp_path / 'b.pqss', '@import "vars.pqss"\nQFrame { width: $w; }')
+    main = write(tmp_path / 'main.pqss', '@import "a.pqss"\n@import "b.pqss"')
+
+    cache = StyleSheetCache()
+    resolver = ImportResolver(cache=cache)
+    assert compile_test(resolver, main) == 'QLabel{width:5.0;}QFrame{width:5.0;}'
+    assert len(cache) == 3
+    vars_path = os.path.realpath(tmp_path / 'vars.pqss')
+    assert resolver.graph[os.path.realpath(tmp_path / 'a.pqss')] == [vars_path]
+    assert resolver.graph[os.path.realpath(tmp_path / 'b.pqss')] == [vars_path]
+
+
+def test_cache_between_compiles(tmp_path):
+    write(tmp_path / 'vars.pqss', '$w : 5;')
+    a = write(tmp_path / 'a.pqss', '@import "vars.pqss"\nQLabel { width: $w; }')
+    main = write(tmp_path / 'main.pqss', '@import "a.pqss"')
+
+    cache = StyleSheetCache()
+    assert compile_test(ImportResolver(cache=cache), main) == 'QLabel{width:5.0;}'
+    a_sheet = ImportResolver(cache=cache).load(os.path.realpath(a))
+
+    # same content with a new mtime is still a hit
+    os.utime(a, ns=(1, 1))
+    assert ImportResolver(cache=cache).load(os.path.realpath(a)) is a_sheet
+
+    # a changed import is parsed again and linked into the cached importer
+    write(tmp_path / 'vars.pqss', '$w : 7;')
+    os.utime(tmp_path / 'vars.pqss', ns=(2, 2))
+    assert compile_test(ImportResolver(cache=cache), main) == 'QLabel{width:7.0;}'
+    assert ImportResolver(cache=cache).load(os.path.realpath(a)) is a_sheet
+
+
+def test_import_cycle(tmp_path):
+    write(tmp_path / 'a.pqss', '@import "b.pqss"')
+    write(tmp_path / 'b.pqss', '@import "a.pqss"')
+    main = write(tmp_path / 'main.pqss', '$a : 1;\n@import "a.pqss"')
+
+    with pytest.raises(ImportCycleException) as e:
+        compile_test(ImportResolver(), main)
+    assert e.value.line == 1
+
+
+def test_import_not_found(tmp_path):
+    main = write(tmp_path / 'main.pqss', '$a : 1;\n@import "missing.pqss"')
+
+    with pytest.raises(ImportNotFoundException) as e:
+        compile_test(ImportResolver(), main)
+    assert (e.value.line, e.value.path) == (2, os.path.realpath(main))
+
+
+def test_slots_per_compile(tmp_path):
+    vars_path = write(tmp_path / 'vars.pqss', '$w : 5;')
+    a = write(tmp_path / 'a.pqss', '$x : 1; $y : 2;\n@import "vars.pqss"\nQLabel { width: $w + $x; }')
+    b = write(tmp_path / 'b.pqss', '@import "vars.pqss"\nQFrame { width: $w; }')
+
+    # the cached vars.pqss is bound to the slots of each compile importing it
+    cache = StyleSheetCache()
+    assert compile_test(ImportResolver(cache=cache), a) == 'QLabel{width:6.0;}'
+    resolver = ImportResolver(cache=cache)
+    environment = Environment()
+    with open(b) as f:
+        assert resolver.parse(f.read(), os.path.realpath(b)).eval(environment) == 'QFrame{width:5.0;}'
+    # the global scope only spans the names of the compile
+    assert len(resolver.slots) == len(environment.values) == 1
+    assert resolver.cache.get(os.path.realpath(vars_path), os.stat(vars_path).st_mtime_ns).slots is resolver.slots
+
+
+def test_parallel_parse(tmp_path):
+    write(tmp_path / 'vars.pqss', '$w : 5;')
+    write(tmp_path / 'a.pqss', '@import "vars.pqss"\nQLabel { width: $w; }')
+    write(tmp_path / 'b.pqss', '@import "vars.pqss"\nQFrame { width: $w; }')
+    main = write(tmp_path / 'main.pqss', '@import "a.pqss"\nQWidget { width: 1; }\n@import "b.pqss"')
+
+    cache = StyleSheetCache()
+    with ProcessPoolExecutor(2) as executor, open(main) as f:
+        style_sheet = ImportResolver(cache=cache).parse(f.read(), os.path.realpath(main), executor)
+    assert len(cache) == 3
+    assert style_sheet.eval(Environment()) == compile_test(ImportResolver(), main)
+
+
+def test_parallel_import_cycle(tmp_path):
+    write(tmp_path / 'a.pqss', '@import "b.pqss"')
+    write(tmp_path / 'b.pqss', '@import "a.pqss"')
+    main = write(tmp_path / 'main.pqss', '$a : 1;\n@import "a.pqss"')
+
+    with ProcessPoolExecutor(2) as executor, open(main) as f:
+        with pytest.raises(ImportCycleException) as e:
+            ImportResolver().parse(f.read(), os.path.realpath(main), executor)
+    assert (e.value.line, e.value.path) == (1, os.path.realpath(tmp_path / 'b.pqss'))
@@ -0,0 +1,46 @@
+import pytest
+
+from pqss.main import compile_string
+from pqss.parse import IncrementalParser, MixinNotExistsException
+
+SOURCE = '''$w : 5;
+@mixin m($a) { width: $a; }
+QLabel { width: $w; }
+QFrame { @include m(7) }
+QPushButton { height: 2; }
+'''
+
+
+def test_edit_reparses_touched_statements():
+    parser = IncrementalParser()
+    parser.parse(SOURCE)
+    assert parser.reparsed == 5
+
+    start = SOURCE.index('$w;')
+    style_sheet = parser.edit(start, start + 2, '$w + 1')
+    assert parser.reparsed == 2
+    assert len(style_sheet.statements) == 5
+    assert parser.eval() == compile_string(parser.src_code)
+
+
+def test_parse_diffs_against_last_source():
+    parser = IncrementalParser()
+    parser.parse(SOURCE)
+    src_code = SOURCE.replace('height: 2;', 'height: 3;')
+    parser.parse(src_code)
+    assert parser.reparsed == 2
+    assert parser.src_code == src_code
+    assert parser.eval() == compile_string(src_code)
+
+    parser.parse(SOURCE.replace('QLabel', 'QTabBar { width: 1; }\nQLabel'))
+    assert parser.eval() == compile_string(parser.src_code)
+
+
+def test_error_location_of_moved_statement():
+    parser = IncrementalParser()
+    parser.parse(SOURCE.replace('@include m(7)', '@include n(7)'))
+    parser.edit(0, 0, '$h : 1;\n\n')
+
+    with pytest.raises(MixinNotExistsException) as e:
+        parser.eval()
+    assert (e.value.line, e.value.column) == (6, 10)
@@ -0,0 +1,52 @@
+from pqss.env import Environment
+from pqss.main import compile_file
+from pqss.lex import new_lexer
+from pqss.parse import Parser, optimize
+from pqss.parse.ast import Constant, Identifier, VarStatement
+
+SOURCE = '''$a : 2;
+$b : $a + 3 * 5;
+@mixin m($a) { width: $a * 2; height: 1 + 1; }
+QLabel { width: $b; height: $c; }
+QFrame { @include m($a) }
+$a : 0;
+QTabBar { width: $a; }
+QDial { }
+'''
+
+
+def parse_program(src_code: str):
+    return Parser(new_lexer(src_code)).parse_program()
+
+
+def test_folds_constants_and_variables():
+    style_sheet = optimize(parse_program(SOURCE))
+    var_b = style_sheet.statements[1]
+    assert isinstance(var_b, VarStatement)
+    assert isinstance(var_b.value.expr, Constant)
+    assert var_b.value.expr.value == 17
+
+    label = style_sheet.statements[3]
+    assert isinstance(label.rules[0].value, Constant)
+    assert label.rules[0].value.value == 17
+    # $c is never assigned, nothing is known of it
+    assert not isinstance(label.rules[1].value, Constant)
+
+    # in a mixin, $a is the parameter, only the constants are folded
+    body = style_sheet.statements[2].body
+    assert not isinstance(body.rules[0].value, Constant)
+    assert isinstance(body.rules[1].value, Constant)
+    assert isinstance(style_sheet.statements[4].includes[0].args[0], Identifier)
+
+
+def test_output_is_unchanged():
+    expected = parse_program(SOURCE).eval(Environment())
+    assert optimize(parse_program(SOURCE)).eval(Environment()) == expected
+    assert 'QTabBar{width:;}' in expected
+
+
+def test_import_forgets_variables(tmp_path):
+    (tmp_path / 'vars.pqss').write_text('$a : 3;')
+    main = tmp_path / 'main.pqss'
+    main.write_text('$a : 1;\n@import "vars.pqss"\nQLabel { width: $a; }\nQDial { }\n')
+    assert compile_file(str(main)) == 'QLabel{width:3.0;}QDial{}'
@@ -0,0 +1,64 @@
+import os
+
+from pqss.main import compile_file, compile_variants
+from pqss.parse import Parser, OutputCache
+
+
+def no_parsing(monkeypatch):
+    def parse_program(self):
+        raise AssertionError('parsed a cached compile')
+
+    monkeypatch.setattr(Parser, 'parse_program', parse_program)
+
+
+def test_output_cache(tmp_path, monkeypatch):
+    variables = tmp_path / 'vars.pqss'
+    variables.write_text('$w : 5;\n')
+    main = tmp_path / 'main.pqss'
+    main.write_text('@import "vars.pqss"\nQLabel { width: $w; }\nQDial { }\n')
+    cache_dir = str(tmp_path / 'cache')
+
+    assert compile_file(str(main), output_cache=cache_dir) == 'QLabel{width:5.0;}QDial{}'
+    variables.write_text('$w : 6;\n')
+    assert compile_file(str(main), output_cache=cache_dir) == 'QLabel{width:6.0;}QDial{}'
+
+    # back to content compiled before: a hit on both files, nothing parsed
+    variables.write_text('$w : 5;\n')
+    with monkeypatch.context() as m:
+        no_parsing(m)
+        assert compile_file(str(main), output_cache=cache_dir) == 'QLabel{width:5.0;}QDial{}'
+
+    # an imported file removed is a miss, not a stale hit
+    os.remove(variables)
+    key = OutputCache.key(main.read_bytes(), str(main))
+    assert OutputCache(cache_dir).get(key) is None
+
+
+def test_output_cache_variants(tmp_path, monkeypatch):
+    main = tmp_path / 'theme.pqss'
+    main.write_text('$bg : 1;\nQLabel { width: $bg; }\nQDial { }\n')
+    cache_dir = str(tmp_path / 'cache')
+
+    light, dark = compile_variants(str(main), [{'bg': 2}, {'bg': 3}], output_cache=cache_dir)
+    assert (light, dark) == ('QLabel{width:2.0;}QDial{}', 'QLabel{width:3.0;}QDial{}')
+    with monkeypatch.context() as m:
+        no_parsing(m)
+        assert compile_variants(str(main), [{'bg': 3}, {'bg': 2}], output_cache=cache_dir) == [dark, light]
+    # True == 1, but they are written differently
+    assert compile_variants(str(main), [{'bg': True}, {'bg': 1}], output_cache=cache_dir) == \
+           ['QLabel{width:True;}QDial{}', 'QLabel{width:1.0;}QDial{}']
+
+
+def test_output_cache_shadowed_import(tmp_path):
+    (tmp_path / 'A').mkdir()
+    (tmp_path / 'I').mkdir()
+    (tmp_path / 'I' / 'v.pqss').write_text('$w : 5;\n')
+    main = tmp_path / 'A' / 'main.pqss'
+    main.write_text('@import "v.pqss"\nQLabel { width: $w; }\nQDial { }\n')
+    include_paths = [str(tmp_path / 'I')]
+    cache_dir = str(tmp_path / 'cache')
+
+    assert compile_file(str(main), include_paths=include_paths, output_cache=cache_dir) == 'QLabel{width:5.0;}QDial{}'
+    # found next to main.pqss first, before the include path
+    (tmp_path / 'A' / 'v.pqss').write_text('$w : 6;\n')
+    assert compile_file(str(main), include_paths=include_paths, output_cache=cache_dir) == 'QLabel{width:6.0;}QDial{}'
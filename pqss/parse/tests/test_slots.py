@@ -0,0 +1,14 @@
+from pqss.lex import Lexer
+from pqss.parse.ast import Node
+from pqss.parse.parser import Parser
+
+
+def test_nodes_are_slotted():
+    sqss = Parser(Lexer('$a : 5; QLabel { width: $a + 1; &:hover { height: 2px; } }')).parse_program()
+    stack = [sqss]
+    while stack:
+        node = stack.pop()
+        assert not hasattr(node, '__dict__'), type(node).__name__
+        for name in (name for cls in type(node).__mro__ for name in getattr(cls, '__slots__', ())):
+            value = getattr(node, name, None)
+            stack.extend(item for item in (value if isinstance(value, list) else [value]) if isinstance(item, Node))
@@ -0,0 +1,5 @@
+from .sheet import QssRuleset, parse_qss, write_qss
+from .merge import block_key, merge_rulesets
+from .optimizer import QssOptimizer, optimize_qss
+from .shard import QssShards, selector_root, shard_qss
+from .exceptions import QssSyntaxException
@@ -0,0 +1,5 @@
+from pqss.lex.exceptions import PQSSException
+
+
+class QssSyntaxException(PQSSException):
+    pass
@@ -0,0 +1,54 @@
+from .properties import family_of
+from .sheet import QssRuleset
+
+
+def block_key(declarations: list[tuple[str, str]]) -> tuple:
+    """
+    normalised declaration block: the order of the declarations only counts
+    when two of them are of the same family, as background and background-color
+    may set the same thing
+    """
+    families = {family_of(prop) for prop, _ in declarations}
+    return tuple(declarations) if len(families) < len(declarations) else tuple(sorted(declarations))
+
+
+def merge_rulesets(rulesets: list[QssRuleset]) -> list[QssRuleset]:
+    """
+    merge the rulesets with identical declaration blocks into one ruleset with
+    their selectors grouped, in place of the first of them.
+
+    A ruleset moves up to the group only when no ruleset in between sets a
+    property of the families its block sets, so that whatever overrode it, or
+    it overrode, still does: the cascade of every widget is the same. Families
+    are compared rather than longhands, since only the box shorthands are known
+    here, and background or font set their longhands as well.
+    """
+    merged = []
+    groups = {}
+    """index in merged of the last group of each block"""
+    selectors = {}
+    """selectors grouped by each ruleset of merged, by index"""
+    last_set = {}
+    """index in merged of the last ruleset setting a property of each family"""
+    for ruleset in rulesets:
+        if not ruleset.declarations:
+            merged.append(ruleset)
+            continue
+        key = block_key(ruleset.declarations)
+        families = {family_of(prop) for prop, _ in ruleset.declarations}
+        idx = groups.get(key)
+        if idx is not None and all(last_set[family] == idx for family in families):
+            group = selectors[idx]
+            if ruleset.selector not in group:
+                group.append(ruleset.selector)
+            continue
+        idx = groups[key] = len(merged)
+        selectors[idx] = [ruleset.selector]
+        for family in families:
+            last_set[family] = idx
+        merged.append(ruleset)
+
+    for idx, group in selectors.items():
+        if len(group) > 1:
+            merged[idx] = QssRuleset(', '.join(group), merged[idx].declarations)
+    return merged
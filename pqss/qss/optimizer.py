@@ -0,0 +1,151 @@
+from .merge import merge_rulesets
+from .properties import BOX_SHORTHANDS, longhands_of
+from .sheet import QssRuleset, parse_qss, write_qss
+
+_KEYWORDS = frozenset(('inherit', 'initial', 'unset'))
+"""values that can not stand for one side in a shorthand"""
+
+
+class QssOptimizer:
+    """Declaration-level optimization of compiled QSS
+
+    In each ruleset, a declaration is dropped when the declarations after it set
+    everything it sets, which removes duplicates and overridden declarations, a
+    shorthand overriding its longhands included. The four longhands of a box
+    property, such as margin-top, margin-right, margin-bottom and margin-left,
+    are then merged into their shorthand, and the values of a shorthand are
+    written in their shortest form. Empty rulesets are dropped, and the
+    rulesets left with identical declarations are grouped by merge_rulesets.
+
+    Properties outside of the shorthand families are only compared by name,
+    so background or font never override background-color or font-size here.
+    """
+
+    def __init__(self, merge: bool = True):
+        """
+        :param merge: group the selectors of the rulesets with identical declarations
+        """
+        self.merge = merge
+        self.bytes_before = 0
+        self.bytes_after = 0
+        self.declarations_dropped = 0
+        self.shorthands_merged = 0
+        self.rulesets_dropped = 0
+        self.rulesets_merged = 0
+
+    @property
+    def bytes_saved(self) -> int:
+        return self.bytes_before - self.bytes_after
+
+    def report(self) -> str:
+        """bytes saved by the QSS optimized so far, and how"""
+        ratio = self.bytes_saved / self.bytes_before * 100 if self.bytes_before else 0.0
+        return (f'{self.bytes_before} -> {self.bytes_after} bytes, {self.bytes_saved} saved ({ratio:.1f}%): '
+                f'{self.declarations_dropped} declarations dropped, {self.shorthands_merged} shorthands merged, '
+                f'{self.rulesets_dropped} empty rulesets dropped, {self.rulesets_merged} rulesets merged')
+
+    def optimize(self, qss: str) -> str:
+        """
+        optimize flat QSS
+        :raise QssSyntaxException: qss has nested or unbalanced braces
+        """
+        optimized = write_qss(self.optimize_rulesets(parse_qss(qss)))
+        self.bytes_before += len(qss.encode())
+        self.bytes_after += len(optimized.encode())
+        return optimized
+
+    def optimize_rulesets(self, rulesets: list[QssRuleset]) -> list[QssRuleset]:
+        """optimize the declarations of rulesets in place, drop the empty ones and merge the others"""
+        kept = []
+        for ruleset in rulesets:
+            ruleset.declarations = self.optimize_declarations(ruleset.declarations)
+            if ruleset.declarations:
+                kept.append(ruleset)
+        self.rulesets_dropped += len(rulesets) - len(kept)
+        if not self.merge:
+            return kept
+        merged = merge_rulesets(kept)
+        self.rulesets_merged += len(kept) - len(merged)
+        return merged
+
+    def optimize_declarations(self, declarations: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """declarations of a ruleset with the same effect, in fewer bytes"""
+        kept = []
+        later = set()
+        for prop, value in reversed(declarations):
+            longhands = longhands_of(prop)
+            if later.issuperset(longhands):
+                continue
+            later.update(longhands)
+            kept.append((prop, value))
+        self.declarations_dropped += len(declarations) - len(kept)
+        kept.reverse()
+        return self._merge_shorthands(kept)
+
+    def _merge_shorthands(self, declarations: list[tuple[str, str]]) -> list[tuple[str, str]]:
+        """
+        merge the four longhands of each box shorthand set by the declarations,
+        which set no longhand twice
+        """
+        index = {prop: idx for idx, (prop, _) in enumerate(declarations)}
+        merged = {}
+        for shorthand, longhands in BOX_SHORTHANDS.items():
+            positions = [index.get(longhand) for longhand in longhands]
+            if None in positions:
+                continue
+            values = [declarations[idx][1] for idx in positions]
+            if not all(_single_value(value) for value in values):
+                continue
+            if shorthand == 'border' and len(set(values)) > 1:
+                # border takes one border for every side
+                continue
+            for idx in positions:
+                merged[idx] = None
+            # the shorthand takes the place of the last longhand, after anything they override
+            merged[max(positions)] = (shorthand, ' '.join(_box_values(values)))
+            self.shorthands_merged += 1
+        if not merged:
+            return [(prop, _compact(prop, value)) for prop, value in declarations]
+        result = []
+        for idx, (prop, value) in enumerate(declarations):
+            declaration = merged.get(idx, (prop, value))
+            if declaration is not None:
+                result.append((declaration[0], _compact(*declaration)))
+        return result
+
+
+def _single_value(value: str) -> bool:
+    return bool(value) and ' ' not in value and '!' not in value and value not in _KEYWORDS
+
+
+def _box_values(values: list[str]) -> list[str]:
+    """shortest values of a box shorthand for the values of the top, right, bottom and left sides"""
+    top, right, bottom, left = values
+    if right != left:
+        return values
+    if top != bottom:
+        return [top, right, bottom]
+    if top != right:
+        return [top, right]
+    return [top]
+
+
+def _compact(prop: str, value: str) -> str:
+    """shortest form of the value of a box shorthand"""
+    if prop not in BOX_SHORTHANDS or prop == 'border' or '(' in value:
+        return value
+    values = value.split()
+    if len(values) == 2:
+        # top and bottom, right and left
+        values *= 2
+    elif len(values) == 3:
+        # the left side is the right one
+        values.append(values[1])
+    elif len(values) != 4:
+        return value
+    return ' '.join(_box_values(values))
+
+
+def optimize_qss(qss: str) -> str:
+    """drop the redundant declarations of flat QSS, and merge longhands into shorthands"""
+    return QssOptimizer().optimize(qss)
@@ -0,0 +1,63 @@
+from pqss.lex.constants import properties
+
+SIDES = ('top', 'right', 'bottom', 'left')
+"""sides of a box, in the order of the values of a shorthand"""
+
+
+def _side_property(prop: str, side: str) -> str:
+    """margin -> margin-top, border-width -> border-top-width"""
+    head, _, tail = prop.partition('-')
+    return f'{head}-{side}-{tail}' if tail else f'{head}-{side}'
+
+
+def _box_shorthands() -> dict[str, tuple[str, ...]]:
+    known = set(properties)
+    shorthands = {}
+    for prop in properties:
+        longhands = tuple(_side_property(prop, side) for side in SIDES)
+        if all(longhand in known for longhand in longhands):
+            shorthands[prop] = longhands
+    return shorthands
+
+
+BOX_SHORTHANDS = _box_shorthands()
+"""
+shorthands of the QSS properties taking a value for each side, by their
+longhands: margin, padding, border, border-color, border-style, border-width
+"""
+
+
+def _atoms() -> dict[str, frozenset[str]]:
+    atoms = {}
+
+    def atoms_of(prop: str) -> frozenset[str]:
+        if prop not in atoms:
+            longhands = BOX_SHORTHANDS.get(prop, ())
+            if prop.startswith('border-') and prop.count('-') == 1 and prop[7:] in SIDES:
+                # border-top sets the width, style and color of the top border
+                longhands = tuple(f'{prop}-{part}' for part in ('width', 'style', 'color'))
+            atoms[prop] = frozenset().union(*map(atoms_of, longhands)) if longhands else frozenset((prop,))
+        return atoms[prop]
+
+    for prop in properties:
+        atoms_of(prop)
+    return atoms
+
+
+_ATOMS = _atoms()
+"""longhands each property of pqss.lex.constants.properties sets"""
+
+
+def longhands_of(prop: str) -> frozenset[str]:
+    """longhands a QSS property sets, the property itself when it is no shorthand"""
+    atoms = _ATOMS.get(prop)
+    return frozenset((prop,)) if atoms is None else atoms
+
+
+def family_of(prop: str) -> str:
+    """
+    family of a QSS property, the word it starts with: background for
+    background-color, font for font-size, border for border-top-left-radius.
+    Shorthands only ever set properties of their family.
+    """
+    return prop.lstrip('-').partition('-')[0]
@@ -0,0 +1,143 @@
+import heapq
+import json
+import os
+import re
+
+from pqss.util.path_util import write_if_changed
+from .optimizer import QssOptimizer
+from .properties import family_of
+from .sheet import QssRuleset, parse_qss, write_qss
+
+MANIFEST = 'manifest.json'
+"""file name of the manifest in a directory of shards"""
+
+CORE = 'core.qss'
+"""file name of the global core in a directory of shards"""
+
+_COMPOUND_RE = re.compile(r'(?:[^\s>\["\']|\[[^\]]*\]|"[^"]*"|\'[^\']*\')+')
+"""first compound selector of a selector, up to a combinator"""
+_ATTRIBUTE_RE = re.compile(r'\[[^\]]*\]')
+_CLASS_RE = re.compile(r'\.?([A-Za-z_][\w-]*)')
+_ID_RE = re.compile(r'#([\w-]+)')
+
+
+def selector_root(selector: str) -> str | None:
+    """
+    what the first compound of a selector is rooted at: '#name' for an object
+    name, the widget class for a type or class selector, None for anything
+    else, such as * or [flat="true"]
+    """
+    compound = _COMPOUND_RE.match(selector.strip())
+    if compound is None:
+        return None
+    compound = _ATTRIBUTE_RE.sub('', compound.group())
+    object_name = _ID_RE.search(compound)
+    if object_name is not None:
+        return '#' + object_name.group(1)
+    widget_class = _CLASS_RE.match(compound)
+    return widget_class.group(1) if widget_class is not None else None
+
+
+class QssShards:
+    """Compiled QSS partitioned by the widget each ruleset is rooted at
+
+    A ruleset whose selectors start at a widget class, e.g. QFrame QLabel or
+    QFrame:hover, goes to the shard of that class, to set on the QFrame
+    widgets; one starting at an object name, e.g. QPushButton#ok, goes to the
+    shard of the name. A group of selectors of several roots is split into a
+    ruleset for each root. Selectors of no root, such as * or [flat="true"],
+    go to the core, to set on the application. A shard keeps the order of its
+    rulesets in the whole sheet.
+
+    A style sheet set on a widget takes precedence over the style sheet of the
+    application, so a core ruleset would never override a shard, even when
+    more specific, e.g. [flat="true"] against QPushButton. A core ruleset
+    setting a property of the same family as a ruleset of a shard is
+    therefore copied into the shard too, in its place in the sheet, where the
+    cascade between them is the same as in the whole sheet.
+    """
+
+    def __init__(self):
+        self.core: list[QssRuleset] = []
+        self.classes: dict[str, list[QssRuleset]] = {}
+        """rulesets by widget class"""
+        self.object_names: dict[str, list[QssRuleset]] = {}
+        """rulesets by object name, without #"""
+        self._positions: dict[int, int] = {}
+        """position in the sheet of every ruleset added, by id"""
+
+    def add(self, ruleset: QssRuleset):
+        position = len(self._positions)
+        groups = {}
+        """selectors of the ruleset by root"""
+        for selector in ruleset.selectors():
+            groups.setdefault(selector_root(selector), []).append(selector)
+        if len(groups) == 1:
+            self._add(next(iter(groups)), ruleset, position)
+            return
+        for root, selectors in groups.items():
+            self._add(root, QssRuleset(', '.join(selectors), list(ruleset.declarations)), position)
+
+    def _add(self, root: str | None, ruleset: QssRuleset, position: int):
+        self._positions[id(ruleset)] = position
+        if root is None:
+            self.core.append(ruleset)
+        elif root.startswith('#'):
+            self.object_names.setdefault(root[1:], []).append(ruleset)
+        else:
+            self.classes.setdefault(root, []).append(ruleset)
+
+    def files(self) -> dict[str, str]:
+        """QSS of the core and of every shard, by file name"""
+        manifest = self.manifest()
+        files = {CORE: write_qss(self.core)}
+        for widget_class, name in manifest['classes'].items():
+            files[name] = write_qss(self.shard(self.classes[widget_class]))
+        for object_name, name in manifest['object_names'].items():
+            files[name] = write_qss(self.shard(self.object_names[object_name]))
+        return files
+
+    def shard(self, rulesets: list[QssRuleset]) -> list[QssRuleset]:
+        """the rulesets of a shard, with the core rulesets competing with them in their place"""
+        families = {family_of(prop) for ruleset in rulesets for prop, _ in ruleset.declarations}
+        competing = [ruleset for ruleset in self.core
+                     if any(family_of(prop) in families for prop, _ in ruleset.declarations)]
+        if not competing:
+            return rulesets
+        return list(heapq.merge(rulesets, competing, key=lambda ruleset: self._positions[id(ruleset)]))
+
+    def manifest(self) -> dict:
+        """the file of the core, and of the shard of every widget class and object name"""
+        return {
+            'version': 1,
+            'core': CORE,
+            'classes': {widget_class: f'class-{widget_class}.qss' for widget_class in self.classes},
+            'object_names': {object_name: f'id-{object_name}.qss' for object_name in self.object_names},
+        }
+
+    def write(self, directory: str, optimizer: QssOptimizer | None = None) -> dict:
+        """
+        write the core, the shards and the manifest into a directory, created if
+        missing. Files holding the same QSS already are left untouched
+        :param optimizer: optimizer of the QSS of each file
+        :return: the manifest
+        """
+        os.makedirs(directory, exist_ok=True)
+        for name, qss in self.files().items():
+            if optimizer is not None:
+                qss = optimizer.optimize(qss)
+            write_if_changed(os.path.join(directory, name), qss)
+        manifest = self.manifest()
+        write_if_changed(os.path.join(directory, MANIFEST), json.dumps(manifest, indent=2))
+        return manifest
+
+
+def shard_qss(qss: str | list[QssRuleset]) -> QssShards:
+    """
+    partition flat QSS, or its rulesets, by the widget each ruleset is rooted at
+    :raise QssSyntaxException: qss has nested or unbalanced braces
+    """
+    shards = QssShards()
+    for ruleset in parse_qss(qss) if isinstance(qss, str) else qss:
+        shards.add(ruleset)
+    return shards
@@ -0,0 +1,135 @@
+import re
+from typing import Iterable
+
+from .exceptions import QssSyntaxException
+
+_SPECIAL_RE = re.compile('["\'({};]')
+"""characters a scan of QSS stops at"""
+_COMMENT_RE = re.compile(r'("[^"]*"|\'[^\']*\')|/\*.*?\*/', re.S)
+
+
+class QssRuleset:
+    """A ruleset of compiled QSS: a selector and its declarations, in order"""
+
+    __slots__ = ('selector', 'declarations')
+
+    def __init__(self, selector: str, declarations: list[tuple[str, str]] | None = None):
+        self.selector = selector
+        """selector text, comma-separated selectors included"""
+        self.declarations: list[tuple[str, str]] = [] if declarations is None else declarations
+        """(property, value) pairs"""
+
+    def selectors(self) -> list[str]:
+        """the selectors of the group the selector of the ruleset is"""
+        if ',' not in self.selector:
+            return [self.selector]
+        selectors = []
+        start = 0
+        quote = None
+        depth = 0
+        for idx, char in enumerate(self.selector):
+            if quote is not None:
+                if char == quote:
+                    quote = None
+            elif char == '"' or char == "'":
+                quote = char
+            elif char == '[' or char == '(':
+                depth += 1
+            elif char == ']' or char == ')':
+                depth -= 1
+            elif char == ',' and depth == 0:
+                selectors.append(self.selector[start:idx].strip())
+                start = idx + 1
+        selectors.append(self.selector[start:].strip())
+        return selectors
+
+    def block(self) -> str:
+        """declarations of the ruleset as written between its braces"""
+        return ''.join(f'{prop}:{value};' for prop, value in self.declarations)
+
+    def __repr__(self):
+        return f'QssRuleset({self.selector!r}, {self.declarations!r})'
+
+
+def parse_qss(qss: str) -> list[QssRuleset]:
+    """
+    split flat QSS, as the compiler writes it, into its rulesets. Comments and
+    empty declarations are dropped; strings and parentheses are kept whole.
+    :raise QssSyntaxException: qss has nested or unbalanced braces
+    """
+    if '/*' in qss:
+        # comments are blanked out where they stand, the offsets of the rest are kept
+        qss = _COMMENT_RE.sub(lambda m: m.group(1) or ' ' * len(m.group()), qss)
+    rulesets = []
+    ruleset = None
+    start = 0
+    search = _SPECIAL_RE.search
+    match = search(qss)
+    while match is not None:
+        idx = match.start()
+        char = qss[idx]
+        if char == '"' or char == "'":
+            close = qss.find(char, idx + 1)
+            if close == -1:
+                raise QssSyntaxException('Unterminated string in QSS', idx)
+            match = search(qss, close + 1)
+            continue
+        if char == '(':
+            close = _find_closing(qss, idx)
+            if close == -1:
+                raise QssSyntaxException('Unbalanced parentheses in QSS', idx)
+            match = search(qss, close + 1)
+            continue
+        if char == '{':
+            if ruleset is not None:
+                raise QssSyntaxException('Nested ruleset in QSS', idx)
+            ruleset = QssRuleset(qss[start:idx].strip())
+            start = idx + 1
+        elif char == ';' or char == '}':
+            if ruleset is None:
+                raise QssSyntaxException(f'Unexpected {char} in QSS', idx)
+            _add_declaration(ruleset, qss, start, idx)
+            start = idx + 1
+            if char == '}':
+                rulesets.append(ruleset)
+                ruleset = None
+        match = search(qss, idx + 1)
+    if ruleset is not None:
+        raise QssSyntaxException('Unclosed ruleset in QSS', len(qss))
+    return rulesets
+
+
+def write_qss(rulesets: Iterable[QssRuleset]) -> str:
+    """QSS of rulesets, in the layout the compiler writes"""
+    return ''.join(f'{ruleset.selector}{{{ruleset.block()}}}' for ruleset in rulesets)
+
+
+def _add_declaration(ruleset: QssRuleset, qss: str, start: int, end: int):
+    text = qss[start:end].strip()
+    if not text:
+        return
+    prop, colon, value = text.partition(':')
+    if not colon:
+        raise QssSyntaxException(f'Declaration without value in QSS: {text}', start)
+    ruleset.declarations.append((prop.strip(), value.strip()))
+
+
+def _find_closing(qss: str, idx: int) -> int:
+    """offset of the parenthesis closing the one at idx, -1 if there is none"""
+    depth = 0
+    end = len(qss)
+    while idx < end:
+        char = qss[idx]
+        if char == '(':
+            depth += 1
+        elif char == ')':
+            depth -= 1
+            if depth == 0:
+                return idx
+        elif char == '"' or char == "'":
+            close = qss.find(char, idx + 1)
+            if close == -1:
+                return -1
+            idx = close
+        idx += 1
+    return -1
@@ -0,0 +1,39 @@
+from pqss.qss import QssRuleset, merge_rulesets, optimize_qss, parse_qss, write_qss
+
+
+def merge(qss: str) -> str:
+    return write_qss(merge_rulesets(parse_qss(qss)))
+
+
+def test_identical_blocks_are_grouped():
+    qss = 'QLabel{color:red;width:1;}QDial{height:2;}QFrame{width:1;color:red;}QLabel{color:red;width:1;}'
+    assert merge(qss) == 'QLabel, QFrame{color:red;width:1;}QDial{height:2;}'
+
+
+def test_cascade_order_is_kept():
+    # QFrame would move before the QWidget declaring its color, which may match the same widgets
+    qss = 'QLabel{color:red;}QWidget{color:blue;}QFrame{color:red;}'
+    assert merge(qss) == qss
+    # a longhand conflicts with its shorthand
+    qss = 'QLabel{margin:1;}QWidget{margin-top:2;}QFrame{margin:1;}'
+    assert merge(qss) == qss
+    # the first group is cut off, later rulesets group after the conflict
+    assert merge(qss + 'QDial{margin:1;}') == 'QLabel{margin:1;}QWidget{margin-top:2;}QFrame, QDial{margin:1;}'
+
+
+
+def test_shorthands_outside_of_the_box_families():
+    # background sets background-color, font sets font-size
+    qss = 'QLabel{background-color:red;}QWidget{background:blue;}QFrame{background-color:red;}'
+    assert optimize_qss(qss) == qss
+    qss = 'QLabel{font-size:12px;}QWidget{font:10px;}QFrame{font-size:12px;}'
+    assert optimize_qss(qss) == qss
+    # the order within a block counts too
+    qss = 'QLabel{background:blue;background-color:red;}QFrame{background-color:red;background:blue;}'
+    assert merge(qss) == qss
+
+
+def test_optimizer_merges():
+    assert optimize_qss('QLabel{width:1;width:2;}QFrame{width:2;}') == 'QLabel, QFrame{width:2;}'
+    rulesets = merge_rulesets([QssRuleset('QLabel', [('width', '1')]), QssRuleset('QFrame', [])])
+    assert [ruleset.selector for ruleset in rulesets] == ['QLabel', 'QFrame']
@@ -0,0 +1,40 @@
+import pytest
+
+from pqss.cli import main
+from pqss.qss import QssOptimizer, QssSyntaxException, optimize_qss, parse_qss
+
+
+def test_parse_qss():
+    rulesets = parse_qss('QLabel:hover, QFrame{color:rgba(1,2,3,4);;image:"a;b}";}/* c{} */QDial{}')
+    assert [ruleset.selector for ruleset in rulesets] == ['QLabel:hover, QFrame', 'QDial']
+    assert rulesets[0].declarations == [('color', 'rgba(1,2,3,4)'), ('image', '"a;b}"')]
+    with pytest.raises(QssSyntaxException):
+        parse_qss('QFrame{QLabel{width:1;}}')
+
+
+def test_overridden_and_duplicate_declarations():
+    assert optimize_qss('QLabel{width:1;color:red;width:1;margin-top:2;margin:3;}') == 'QLabel{color:red;width:1;margin:3;}'
+    # a longhand after its shorthand overrides one side only
+    assert optimize_qss('QLabel{margin:3;margin-top:2;}') == 'QLabel{margin:3;margin-top:2;}'
+    # background is not split into its longhands, nothing is assumed of it
+    assert optimize_qss('QLabel{background-color:red;background:blue;}') == 'QLabel{background-color:red;background:blue;}'
+
+
+def test_shorthands():
+    optimizer = QssOptimizer()
+    qss = ('QLabel{padding-top:1;padding-right:2;padding-bottom:1;padding-left:2;'
+           'border-top-width:1px;border-right-width:2px;border-bottom-width:3px;border-left-width:2px;}'
+           'QFrame{border-top:1px;border-right:1px;border-bottom:1px;border-left:2px;margin:1 2 1 2;}QDial{}')
+    assert optimizer.optimize(qss) == ('QLabel{padding:1 2;border-width:1px 2px 3px;}'
+                                       'QFrame{border-top:1px;border-right:1px;border-bottom:1px;border-left:2px;margin:1 2;}')
+    assert (optimizer.shorthands_merged, optimizer.rulesets_dropped) == (2, 1)
+    assert optimizer.bytes_saved == len(qss) - optimizer.bytes_after
+
+
+def test_cli_optimize(tmp_path, capsys):
+    source = tmp_path / 'main.pqss'
+    source.write_text('QLabel { margin-top: 1; margin-right: 1; margin-bottom: 1; margin-left: 1; }\nQDial { }\n')
+    output = tmp_path / 'main.qss'
+    assert main(['-f', str(source), '-o', str(output), '--optimize']) == 0
+    assert output.read_text() == 'QLabel{margin:1.0;}'
+    assert 'saved' in capsys.readouterr().err
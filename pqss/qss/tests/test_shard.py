@@ -0,0 +1,60 @@
+import json
+
+from pqss.cli import main
+from pqss.qss import selector_root, shard_qss
+
+
+def test_selector_root():
+    assert selector_root('QFrame > QLabel:hover') == 'QFrame'
+    assert selector_root('QPushButton#ok::menu-indicator') == '#ok'
+    assert selector_root('.QPushButton') == 'QPushButton'
+    assert selector_root('QLabel[text="#a b"] QDial') == 'QLabel'
+    assert selector_root('*') is None
+    assert selector_root('[flat="true"]') is None
+
+
+def test_shards():
+    shards = shard_qss('QFrame QLabel{width:1;}*{color:red;}QLabel, QFrame{height:1;}'
+                       '#ok{width:2;}QFrame:hover, QFrame QDial{color:blue;}')
+    assert shards.files() == {
+        'core.qss': '*{color:red;}',
+        # the core ruleset setting color competes with QFrame:hover
+        'class-QFrame.qss': 'QFrame QLabel{width:1;}*{color:red;}QFrame{height:1;}QFrame:hover, QFrame QDial{color:blue;}',
+        'class-QLabel.qss': 'QLabel{height:1;}',
+        'id-ok.qss': '#ok{width:2;}',
+    }
+    assert shards.manifest()['object_names'] == {'ok': 'id-ok.qss'}
+
+
+def test_groups_are_split_by_root():
+    # a group later in the sheet still overrides the rulesets of each of its roots
+    shards = shard_qss('QLabel{color:blue;}QLabel, QFrame, *{color:red;}')
+    assert shards.files() == {
+        'core.qss': '*{color:red;}',
+        'class-QLabel.qss': 'QLabel{color:blue;}QLabel{color:red;}*{color:red;}',
+        'class-QFrame.qss': 'QFrame{color:red;}*{color:red;}',
+    }
+
+
+def test_core_rulesets_competing_in_shards():
+    # [flat="true"] is more specific than QPushButton, in the shard as in the whole sheet
+    shards = shard_qss('[flat="true"]{background:none;}QPushButton{background-color:gray;width:1;}'
+                       '*{width:2;}QLabel{color:red;}*{font-size:10px;}')
+    assert shards.files() == {
+        'core.qss': '[flat="true"]{background:none;}*{width:2;}*{font-size:10px;}',
+        'class-QPushButton.qss': '[flat="true"]{background:none;}QPushButton{background-color:gray;width:1;}'
+                                 '*{width:2;}',
+        'class-QLabel.qss': 'QLabel{color:red;}',
+    }
+
+
+def test_cli_shard(tmp_path, capsys):
+    source = tmp_path / 'main.pqss'
+    source.write_text('QLabel { width: 1; }\nQFrame { width: 1; }\nQLabel { height: 2; width: 1; }\nQDial { }\n')
+    directory = tmp_path / 'shards'
+    assert main(['-f', str(source), '--shard', str(directory), '--optimize']) == 0
+    manifest = json.loads((directory / 'manifest.json').read_text())
+    assert manifest['classes'] == {'QLabel': 'class-QLabel.qss', 'QFrame': 'class-QFrame.qss', 'QDial': 'class-QDial.qss'}
+    assert (directory / 'class-QLabel.qss').read_text() == 'QLabel{width:1.0;}QLabel{height:2.0;width:1.0;}'
+    assert (directory / 'class-QDial.qss').read_text() == ''
+    assert capsys.readouterr().out == ''
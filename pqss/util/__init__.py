@@ -1,2 +1,3 @@
 from .tok_util import *
 from .char_util import *
+from .path_util import *
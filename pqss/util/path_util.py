@@ -0,0 +1,39 @@
+import os
+
+SOURCE_SUFFIXES = ('.pqss', '.sqss')
+"""suffixes of the PQSS files found in a directory"""
+
+
+def find_sources(directory: str) -> list[str]:
+    """the PQSS files under a directory, relative to it, in a stable order"""
+    sources = []
+    for parent, subdirectories, files in os.walk(directory):
+        subdirectories.sort()
+        for name in sorted(files):
+            if name.endswith(SOURCE_SUFFIXES):
+                sources.append(os.path.relpath(os.path.join(parent, name), directory))
+    return sources
+
+
+def output_stem(relative: str) -> str:
+    """relative path of the output of a PQSS file, without suffix"""
+    stem, suffix = os.path.splitext(relative)
+    return stem if suffix in SOURCE_SUFFIXES else relative
+
+
+def write_if_changed(path: str, text: str) -> bool:
+    """
+    write a text file, as open(path, 'w', encoding='utf-8') would, unless it
+    already holds the same bytes, so that its mtime only moves when it changes
+    :return: whether the file was written
+    """
+    data = text.replace('\n', os.linesep).encode('utf-8')
+    try:
+        with open(path, 'rb') as f:
+            if f.read(len(data) + 1) == data:
+                return False
+    except FileNotFoundError:
+        pass
+    with open(path, 'wb') as f:
+        f.write(data)
+    return True
@@ -0,0 +1,288 @@
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import threading
+import time
+from io import StringIO
+from typing import Callable, Iterable
+
+from pqss.env import Environment
+from pqss.lex import LineIndex, PQSSException, as_source
+from pqss.parse import ImportResolver, StyleSheetCache, optimize
+from pqss.qss import QssOptimizer
+from pqss.util.path_util import SOURCE_SUFFIXES, find_sources, output_stem, write_if_changed
+
+
+class Watcher:
+    """Recompile the PQSS files of a directory as they change
+
+    Every PQSS file under the directory is compiled into the output directory,
+    mirroring the tree. The parsed StyleSheets of the files and of everything
+    they import are kept between compiles, along with the files every output
+    depends on, its own file and the ones it imports transitively, and the
+    paths searched for these before the ones found, where a new file would be
+    imported instead. A change recompiles only the outputs depending on a
+    changed file, and the new files;
+    outputs that failed are retried on every change, since a missing import
+    may have been created.
+
+    Changes are noticed with inotify on Linux, by polling the modification
+    times of the files otherwise.
+    """
+
+    def __init__(self, directory: str, output: str, include_paths: list[str] | None = None,
+                 engine: str = 'scanner', optimize_qss: bool = False, poll: bool = False,
+                 interval: float = 0.5, log: Callable[[str], None] | None = None):
+        """
+        :param directory: directory of the PQSS files, watched recursively
+        :param output: directory to write the QSS into
+        :param include_paths: directories to search imported files in
+        :param optimize_qss: optimize the QSS written, as QssOptimizer does
+        :param poll: poll the files even when inotify is available
+        :param interval: seconds between polls, and the longest wait for a change
+        :param log: called with a line for every file compiled or failing, print to stderr by default
+        """
+        self.directory = os.path.realpath(directory)
+        self.output = output
+        self.include_paths = include_paths
+        self.engine = engine
+        self.optimize_qss = optimize_qss
+        self.poll = poll
+        self.interval = interval
+        self.log = log if log is not None else (lambda line: print(line, file=sys.stderr))
+        self.cache = StyleSheetCache()
+        """parsed StyleSheets of the watched files and their imports"""
+        self.dependencies: dict[str, set[str]] = {}
+        """real paths of the files each watched file compiles from, itself included, and of the files
+        that would shadow its imports, see ImportResolver.shadows"""
+        self.failed: set[str] = set()
+        """watched files whose last compile failed"""
+
+    def build(self) -> int:
+        """
+        compile every PQSS file of the directory
+        :return: number of files failing
+        """
+        self.dependencies.clear()
+        self.failed.clear()
+        for relative in find_sources(self.directory):
+            self.compile(os.path.join(self.directory, relative))
+        return len(self.failed)
+
+    def affected(self, paths: Iterable[str]) -> list[str]:
+        """the watched files depending on any of paths, new PQSS files and failed files, in order"""
+        changed = {os.path.realpath(path) for path in paths}
+        files = set(self.failed)
+        for path in changed:
+            if path in self.dependencies or self._is_source(path) and os.path.isfile(path):
+                files.add(path)
+        for path, dependencies in self.dependencies.items():
+            if not changed.isdisjoint(dependencies):
+                files.add(path)
+        return sorted(files)
+
+    def update(self, paths: Iterable[str]) -> list[str]:
+        """
+        recompile the watched files depending on any of paths
+        :return: the files recompiled, or dropped because they no longer exist
+        """
+        files = self.affected(paths)
+        for path in files:
+            if os.path.isfile(path):
+                self.compile(path)
+            else:
+                self.dependencies.pop(path, None)
+                self.failed.discard(path)
+        return files
+
+    def compile(self, path: str) -> bool:
+        """
+        compile a watched file into its output, recording what it depends on
+        :param path: real path of the file
+        :return: whether it compiled
+        """
+        resolver = ImportResolver(self.include_paths, self.cache, self.engine)
+        try:
+            style_sheet = resolver.load(path)
+        except (PQSSException, OSError) as e:
+            return self._fail(path, e)
+        finally:
+            self.dependencies[path] = {path, *resolver.shadows, *(imported for imports in resolver.graph.values()
+                                                                  for imported in imports)}
+
+        out = StringIO()
+        try:
+            optimize(style_sheet)
+            style_sheet.emit(Environment(), out)
+        except PQSSException as e:
+            with open(path, 'rb') as f:
+                e.locate(LineIndex(as_source(f.read())), path)
+            return self._fail(path, e)
+
+        qss = out.getvalue()
+        if self.optimize_qss:
+            qss = QssOptimizer().optimize(qss)
+        destination = self.destination(path)
+        try:
+            os.makedirs(os.path.dirname(destination), exist_ok=True)
+            write_if_changed(destination, qss)
+        except OSError as e:
+            return self._fail(path, e)
+        self.failed.discard(path)
+        self.log(f'{os.path.relpath(path, self.directory)} -> {destination}')
+        return True
+
+    def _fail(self, path: str, error: Exception) -> bool:
+        self.failed.add(path)
+        self.log(f'pqss: {error}')
+        return False
+
+    def destination(self, path: str) -> str:
+        """the QSS file a watched file compiles to"""
+        return os.path.join(self.output, output_stem(os.path.relpath(path, self.directory)) + '.qss')
+
+    def _is_source(self, path: str) -> bool:
+        return path.endswith(SOURCE_SUFFIXES) and path.startswith(self.directory + os.sep)
+
+    def run(self, stop: threading.Event | None = None):
+        """build, then recompile on every change until stop is set"""
+        monitor = _Polling() if self.poll or not _Inotify.available() else _Inotify()
+        try:
+            # watched first, so that no change made while building is missed
+            monitor.add(self.directory, True)
+            self.build()
+            while stop is None or not stop.is_set():
+                for directory in {os.path.dirname(path) for paths in self.dependencies.values() for path in paths}:
+                    # imported files, or files that would be, outside of the directory
+                    if not directory.startswith(self.directory + os.sep) and directory != self.directory:
+                        monitor.add(directory, False)
+                changed = monitor.changes(self.interval)
+                if changed is None:
+                    # events were lost, anything may have changed
+                    self.build()
+                elif changed:
+                    self.update(changed)
+        finally:
+            monitor.close()
+
+
+class _Polling:
+    """Changes of the files of directories, from their modification times"""
+
+    def __init__(self):
+        self.directories: dict[str, bool] = {}
+        """whether each directory is watched recursively"""
+        self.mtimes: dict[str, int] = {}
+
+    def add(self, directory: str, recursive: bool):
+        if directory not in self.directories:
+            self.directories[directory] = recursive
+            self.mtimes.update(self._scan(directory, recursive))
+
+    def changes(self, timeout: float) -> set[str]:
+        """the files created, modified or deleted after waiting for timeout"""
+        time.sleep(timeout)
+        mtimes = {}
+        for directory, recursive in self.directories.items():
+            mtimes.update(self._scan(directory, recursive))
+        changed = {path for path, mtime in mtimes.items() if self.mtimes.get(path) != mtime}
+        changed.update(self.mtimes.keys() - mtimes.keys())
+        self.mtimes = mtimes
+        return changed
+
+    @staticmethod
+    def _scan(directory: str, recursive: bool) -> dict[str, int]:
+        mtimes = {}
+        for parent, subdirectories, files in os.walk(directory):
+            for name in files:
+                path = os.path.join(parent, name)
+                try:
+                    mtimes[path] = os.stat(path).st_mtime_ns
+                except OSError:
+                    pass
+            if not recursive:
+                break
+        return mtimes
+
+    def close(self):
+        pass
+
+
+class _Inotify:
+    """Changes of the files of directories, from inotify"""
+
+    _MASK = 0x2 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200
+    """IN_MODIFY | IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE"""
+    _Q_OVERFLOW = 0x4000
+    _ISDIR = 0x40000000
+    _EVENT = struct.Struct('iIII')
+    _SETTLE = 0.05
+    """seconds to wait for the events following one, e.g. of an editor saving through a temporary file"""
+
+    _libc = None
+
+    @classmethod
+    def available(cls) -> bool:
+        if cls._libc is None:
+            try:
+                libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+                cls._libc = libc if hasattr(libc, 'inotify_init1') else False
+            except OSError:
+                cls._libc = False
+        return cls._libc is not False
+
+    def __init__(self):
+        self.fd = self._libc.inotify_init1(os.O_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1 failed')
+        self.directories: dict[int, tuple[str, bool]] = {}
+        """directory and whether it is watched recursively, by watch descriptor"""
+        self.watched: set[str] = set()
+
+    def add(self, directory: str, recursive: bool):
+        if directory in self.watched:
+            return
+        wd = self._libc.inotify_add_watch(self.fd, os.fsencode(directory), self._MASK)
+        if wd < 0:
+            # e.g. removed since, or out of watches
+            return
+        self.watched.add(directory)
+        self.directories[wd] = directory, recursive
+        if recursive:
+            for name in sorted(os.listdir(directory)):
+                path = os.path.join(directory, name)
+                if os.path.isdir(path):
+                    self.add(path, True)
+
+    def changes(self, timeout: float) -> set[str] | None:
+        """the files created, modified or deleted within timeout, None when events were lost"""
+        changed = set()
+        while select.select([self.fd], [], [], timeout)[0]:
+            data = os.read(self.fd, 65536)
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, size = self._EVENT.unpack_from(data, offset)
+                name = data[offset + self._EVENT.size:offset + self._EVENT.size + size].rstrip(b'\0')
+                offset += self._EVENT.size + size
+                if mask & self._Q_OVERFLOW:
+                    return None
+                directory, recursive = self.directories.get(wd, (None, False))
+                if directory is None or not name:
+                    continue
+                path = os.path.join(directory, os.fsdecode(name))
+                if mask & self._ISDIR:
+                    if recursive and os.path.isdir(path):
+                        self.add(path, True)
+                        # files may have been written before the watch was added
+                        changed.update(os.path.join(parent, file) for parent, _, files in os.walk(path)
+                                       for file in files)
+                else:
+                    changed.add(path)
+            timeout = self._SETTLE
+        return changed
+
+    def close(self):
+        os.close(self.fd)
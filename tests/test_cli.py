@@ -0,0 +1,81 @@
+import os
+
+from pqss.cli import main
+
+SOURCE = '$a : 5; QPushButton { width: $a; height: $a + 1; }'
+QSS = 'QPushButton{width:5.0;height:6.0;}'
+
+
+def test_cli_file(tmp_path, capsys):
+    source = tmp_path / 'style.pqss'
+    source.write_text(SOURCE)
+    assert main(['-f', str(source)]) == 0
+    assert capsys.readouterr().out == QSS
+    assert main([str(source), '-o', str(tmp_path / 'style.qss')]) == 0
+    assert (tmp_path / 'style.qss').read_text() == QSS
+
+
+def test_cli_directories(tmp_path, capsys):
+    tree = tmp_path / 'styles'
+    (tree / 'dialogs').mkdir(parents=True)
+    (tree / 'main.pqss').write_text(SOURCE)
+    (tree / 'dialogs' / 'about.pqss').write_text(SOURCE)
+    (tree / 'notes.txt').write_text('not PQSS')
+    extra = tmp_path / 'extra.pqss'
+    extra.write_text(SOURCE)
+    build = tmp_path / 'build'
+
+    for jobs in ('1', '2'):
+        assert main(['-j', jobs, str(tree), str(extra), '-o', str(build)]) == 0
+        assert sorted(str(p.relative_to(build)) for p in build.rglob('*.qss')) == \
+               ['dialogs/about.qss', 'extra.qss', 'main.qss']
+        assert (build / 'dialogs' / 'about.qss').read_text() == QSS
+
+
+def test_cli_errors(tmp_path, capsys):
+    tree = tmp_path / 'styles'
+    tree.mkdir()
+    (tree / 'good.pqss').write_text(SOURCE)
+    (tree / 'bad.pqss').write_text('QPushButton {\n    @include missing(5)\n}')
+    build = tmp_path / 'build'
+
+    assert main(['-j', '2', str(tree), '-o', str(build)]) == 1
+    err = capsys.readouterr().err
+    assert 'bad.pqss:2:5: Mixin missing' in err and '1 of 2 files failed' in err
+    # the other files are still compiled
+    assert (build / 'good.qss').read_text() == QSS
+
+    other = tmp_path / 'good.pqss'
+    other.write_text(SOURCE)
+    assert main([str(tree), str(other), '-o', str(build)]) == 1
+    assert 'both compile to' in capsys.readouterr().err
+
+
+def test_cli_undecodable(tmp_path, capsys):
+    tree = tmp_path / 'styles'
+    tree.mkdir()
+    (tree / 'good.pqss').write_text(SOURCE)
+    (tree / 'latin1.pqss').write_bytes(b'QLabel { font-family: \xe9; }')
+    build = tmp_path / 'build'
+
+    for jobs in ('1', '2'):
+        assert main(['-j', jobs, str(tree), '-o', str(build)]) == 1
+        err = capsys.readouterr().err
+        assert f'pqss: {tree / "latin1.pqss"}: ' in err and '1 of 2 files failed' in err
+        assert (build / 'good.qss').read_text() == QSS
+
+
+def test_cli_cache(tmp_path, capsys):
+    source = tmp_path / 'style.pqss'
+    source.write_text(SOURCE)
+    output = tmp_path / 'style.qss'
+    args = [str(source), '-o', str(output), '--cache', str(tmp_path / 'cache')]
+    assert main(args) == 0
+    os.utime(output, ns=(0, 0))
+
+    # an unchanged output is not rewritten, keeping its mtime
+    assert main(args) == 0
+    assert output.read_text() == QSS and os.stat(output).st_mtime_ns == 0
+    source.write_text(SOURCE.replace('5', '6'))
+    assert main(args) == 0
+    assert output.read_text() == 'QPushButton{width:6.0;height:7.0;}' and os.stat(output).st_mtime_ns != 0
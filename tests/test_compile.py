@@ -0,0 +1,103 @@
+import io
+
+import pytest
+
+import pqss
+from pqss.lex import TokenUnKnownException
+from pqss.parse import MixinNotExistsException
+
+SOURCE = '$a : 5; QPushButton { width: $a; height: $a + 1; }'
+
+
+def test_compile_string():
+    assert pqss.compile_string(SOURCE) == 'QPushButton{width:5.0;height:6.0;}'
+
+
+def test_compile_file(tmp_path):
+    p = tmp_path / 'style.pqss'
+    p.write_text(SOURCE)
+    assert pqss.compile_file(str(p)) == pqss.compile_string(SOURCE)
+    assert pqss.compile_file(str(p), 'classic') == pqss.compile_string(SOURCE)
+    assert pqss.parse(str(p)) == pqss.compile_string(SOURCE)
+
+
+def test_compile_file_not_ascii(tmp_path):
+    p = tmp_path / 'style.pqss'
+    p.write_text('// 注释\n' + SOURCE, encoding='utf-8')
+    assert pqss.compile_file(str(p)) == pqss.compile_string(SOURCE)
+
+
+def test_compile_empty_file(tmp_path):
+    p = tmp_path / 'empty.pqss'
+    p.write_text('')
+    assert pqss.compile_file(str(p)) == ''
+
+
+def test_error_location(tmp_path):
+    p = tmp_path / 'style.pqss'
+    p.write_text('$a : 5;\nQPushButton {\n    @include missing(5)\n}')
+    with pytest.raises(MixinNotExistsException) as e:
+        pqss.compile_file(str(p))
+    assert (e.value.line, e.value.column) == (3, 5)
+    assert str(e.value) == f'{p}:3:5: Mixin missing does not exist!!!'
+
+
+def test_lex_error_location():
+    with pytest.raises(TokenUnKnownException) as e:
+        pqss.compile_string('$a : 5;\n  ~')
+    assert (e.value.line, e.value.column) == (2, 3)
+
+
+def test_compile_to(tmp_path):
+    main = tmp_path / 'main.pqss'
+    main.write_text(SOURCE)
+    out = tmp_path / 'main.qss'
+    with open(out, 'w') as stream:
+        pqss.compile_to(str(main), stream)
+    assert out.read_text() == pqss.compile_file(str(main))
+
+    stream = io.StringIO()
+    pqss.compile_to(SOURCE, stream)
+    assert stream.getvalue() == pqss.compile_string(SOURCE)
+
+
+def test_iter_compile(tmp_path):
+    source = '$a : 5;\n@mixin m($b) { height: $b; }\nQLabel { width: $a; }\nQFrame { @include m(2) }'
+    assert list(pqss.iter_compile(source)) == ['QLabel{width:5.0;}', 'QFrame{height:2.0;}']
+
+    p = tmp_path / 'style.pqss'
+    p.write_text(source + '\nQWidget {\n    @include missing(5)\n}')
+    chunks = pqss.iter_compile(str(p))
+    assert ''.join([next(chunks), next(chunks)]) == pqss.compile_string(source)
+    with pytest.raises(MixinNotExistsException) as e:
+        next(chunks)
+    assert (e.value.line, e.value.path) == (6, str(p))
+
+
+def test_compile_render(tmp_path):
+    source = '$accent : #FF0000;\n$w : 5;\nQLabel { width: $w; }\nQFrame { color: $accent; }'
+    render = pqss.compile_render(source, ['accent'])
+    assert render() == pqss.compile_string(source)
+    assert render(accent='#00FF00') == pqss.compile_string(source.replace('#FF0000', '#00FF00'))
+    with pytest.raises(TypeError):
+        render(w=7)
+
+    (tmp_path / 'vars.pqss').write_text('$accent : #FF0000;\n@mixin m($b) {\n    color: $accent + $b;\n}\n')
+    p = tmp_path / 'style.pqss'
+    p.write_text('@import "vars.pqss"\nQFrame { @include m(1) }\nQLabel { width: 5; }\n')
+    render = pqss.compile_render(str(p))
+    assert render(accent=2) == 'QFrame{color:3.0;}QLabel{width:5.0;}'
+
+    p.write_text('@import "vars.pqss"\nQWidget {\n    @include missing(5)\n}\n')
+    with pytest.raises(MixinNotExistsException) as e:
+        pqss.compile_render(str(p), ['accent'])
+    assert (e.value.line, e.value.path) == (3, str(p))
+
+
+def test_compile_variants():
+    source = '$bg : #FFFFFF;\n$w : 5;\n$pad : $w * 2;\nQLabel { width: $pad; }\nQFrame { color: $bg; }\nQDial { }'
+    variants = [{'bg': '#202020'}, {'w': 7}, {}, {'bg': '#202020', 'w': 7}]
+    render = pqss.compile_render(source, ['bg', 'w'])
+    assert pqss.compile_variants(source, variants) == [render(**variables) for variables in variants]
+    assert pqss.compile_variants(source, [{'bg': 1}, {'bg': True}]) == [
+        'QLabel{width:10.0;}QFrame{color:1.0;}QDial{}', 'QLabel{width:10.0;}QFrame{color:True;}QDial{}']
@@ -0,0 +1,70 @@
+import os
+
+from pqss.watch import Watcher
+
+
+def make_tree(tmp_path):
+    src = tmp_path / 'src'
+    (src / 'dialogs').mkdir(parents=True)
+    (src / 'vars.pqss').write_text('$a : 5;\nQDial { width: $a; }\n')
+    (src / 'main.pqss').write_text('@import "vars.pqss"\nQLabel { width: $a; }\n')
+    (src / 'dialogs' / 'about.pqss').write_text('QFrame { height: 2; }\n')
+    return src
+
+
+def touch(path, text):
+    path.write_text(text)
+    # a new mtime, even on file systems with a coarse clock
+    os.utime(path, ns=(os.stat(path).st_atime_ns, os.stat(path).st_mtime_ns + 10 ** 9))
+
+
+def test_watch_dependencies(tmp_path):
+    src = make_tree(tmp_path)
+    out = tmp_path / 'out'
+    logs = []
+    watcher = Watcher(str(src), str(out), log=logs.append)
+    assert watcher.build() == 0
+    assert (out / 'main.qss').read_text() == 'QDial{width:5.0;}QLabel{width:5.0;}'
+    assert (out / 'dialogs' / 'about.qss').read_text() == 'QFrame{height:2.0;}'
+
+    main, variables, about = (os.path.realpath(src / name) for name in ('main.pqss', 'vars.pqss', 'dialogs/about.pqss'))
+    assert watcher.dependencies[main] == {main, variables}
+    # only the files importing a changed file are recompiled
+    touch(src / 'vars.pqss', '$a : 7;\nQDial { width: $a; }\n')
+    assert watcher.update([str(src / 'vars.pqss')]) == sorted([main, variables])
+    assert (out / 'main.qss').read_text() == 'QDial{width:7.0;}QLabel{width:7.0;}'
+    assert watcher.affected([about]) == [about]
+
+
+def test_watch_errors(tmp_path):
+    src = make_tree(tmp_path)
+    logs = []
+    watcher = Watcher(str(src), str(tmp_path / 'out'), log=logs.append)
+    (src / 'broken.pqss').write_text('@import "missing.pqss"\nQLabel { width: $a; }\n')
+    assert watcher.build() == 1
+    assert any('missing.pqss does not exist' in line for line in logs)
+
+    # a failed file is retried on any change, e.g. its import being created
+    (src / 'missing.pqss').write_text('$a : 3;\nQDial { }\n')
+    broken = os.path.realpath(src / 'broken.pqss')
+    assert broken in watcher.update([str(src / 'missing.pqss')])
+    assert not watcher.failed
+    assert (tmp_path / 'out' / 'broken.qss').read_text() == 'QDial{}QLabel{width:3.0;}'
+
+
+def test_watch_shadowed_import(tmp_path):
+    src = make_tree(tmp_path)
+    include = tmp_path / 'include'
+    include.mkdir()
+    (include / 'theme.pqss').write_text('$t : 1;\n')
+    (src / 'dialogs' / 'about.pqss').write_text('@import "theme.pqss"\nQFrame { height: $t; }\n')
+    out = tmp_path / 'out'
+    watcher = Watcher(str(src), str(out), [str(include)], log=[].append)
+    assert watcher.build() == 0
+    assert (out / 'dialogs' / 'about.qss').read_text() == 'QFrame{height:1.0;}'
+
+    # found next to about.pqss first, before the include path
+    (src / 'dialogs' / 'theme.pqss').write_text('$t : 2;\n')
+    about = os.path.realpath(src / 'dialogs' / 'about.pqss')
+    assert about in watcher.update([str(src / 'dialogs' / 'theme.pqss')])
+    assert (out / 'dialogs' / 'about.qss').read_text() == 'QFrame{height:2.0;}'